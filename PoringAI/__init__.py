@@ -6,6 +6,8 @@ def create_app(test_config = None):
   app.config.from_mapping(
     SECRET_KEY = 'dev',
     DATABASE = os.path.join(app.instance_path, 'flask.db'),
+    INTENT_MODEL_PATH = os.path.join(app.instance_path, 'intent_model'),
+    SENTENCE_CACHE_PATH = os.path.join(app.instance_path, 'sentence_cache.db'),
   )
 
   if test_config is None:
@@ -27,6 +29,27 @@ def create_app(test_config = None):
   from . import db
   db.init_app(app)
 
+  from . import llm
+  llm.init_app(app)
+
+  from . import hub_resolver
+  hub_resolver.init_app(app)
+
+  from . import intent_model
+  intent_model.init_app(app)
+
+  from . import seed
+  seed.init_app(app)
+
+  from . import rollup
+  rollup.init_app(app)
+
+  from . import availability_snapshot
+  availability_snapshot.init_app(app)
+
+  from . import geo_index
+  geo_index.init_app(app)
+
   from . import (menu1, menu2, menu3, menu4,)
   app.register_blueprint(menu1.bp)
   app.register_blueprint(menu2.bp)
@@ -1,5 +1,9 @@
-from flask import Blueprint, render_template, request, url_for, session
-import os, json, requests
+from flask import Blueprint, session
+import functools
+
+from ..config import Config
+from ..db import get_read_db
+from ..db_writer import run_write
 
 bp = Blueprint("api", __name__)
 
@@ -10,301 +14,117 @@ from . import rent
 from . import rent_recommand
 from . import bike_return
 from . import missions
+from . import sentences
+from . import debug
+from . import loopback
+from .services import availability, bike_return as return_service, missions as mission_service, recommend, rental, sentence
 
-def fetch_available_bikes(hub_name: str, lat=None, lon=None):
-  """내부 API(/available-bikes) 호출"""
-  api_url = url_for("api.available_bikes", _external=True)
-  params = {"hub_name": hub_name}
-  if lat is not None and lon is not None:
-      params["lat"] = lat
-      params["lon"] = lon
-  try:
-    res = requests.get(api_url, params=params, timeout=5)
-    return res.json(), res.status_code
-  except Exception as e:
-    return {
-          "hub_name": hub_name,
-          "found": False,
-          "available_bikes": 0,
-          "error": str(e)
-        }, 500
 
-    
-def fetch_available_nearby_bikes(lat: float, lon: float):
+def _transport(func):
   """
-  내부 API /api/available-nearby-bikes를 호출해 가까운 허브 목록을 그대로 받아온다.
-  서버 내부에서 거리 계산은 하지 않는다(요청만 전달).
+  Config.API_TRANSPORT가 "http"면 같은 이름의 loopback.fetch_*(HTTP 재호출)로,
+  아니면(기본 "inprocess") 서비스 함수를 바로 호출한다. (읽기는 get_read_db, 쓰기는 run_write)
   """
-  api_url = url_for("api.available_nearby_bikes", _external=True)
-  params = {"lat": lat, "lon": lon}
+  http_func = getattr(loopback, func.__name__)
 
-  try:
-    res = requests.get(api_url, params=params, timeout=5)
-    return res.json(), res.status_code
-  except Exception as e:
-    return {
-        "hub_name" : None,
-        "query": {"lat": lat, "lon": lon},
-        "found": False,
-        "available_bikes": 0,
-        "error": str(e)
-    }, 500
+  @functools.wraps(func)
+  def wrapper(*args, **kwargs):
+    if Config.API_TRANSPORT == "http":
+      return http_func(*args, **kwargs)
+    return func(*args, **kwargs)
+  return wrapper
 
+
+@_transport
+def fetch_available_bikes(hub_name: str, lat=None, lon=None):
+  """허브의 대여 가능 자전거 수 + 안내 문장"""
+  data, status = availability.available_bikes(get_read_db(), hub_name, lat, lon)
+  if status >= 400 or not data.get("found"):
+    return data, status
+  data, _ = sentence.describe_availability(data)
+  return data, 200
+
+@_transport
+def fetch_available_nearby_bikes(lat: float, lon: float):
+  """
+  가장 가까운 허브의 대여 가능 자전거 수 + 안내 문장
+  """
+  data, status = availability.available_nearby_bikes(get_read_db(), lat, lon)
+  if status >= 400 or not data.get("found"):
+    return data, status
+  data, _ = sentence.describe_availability(data, "available_nearby_bikes")
+  return data, 200
+
+@_transport
 def fetch_rent_bike_normal(bike_id=None):
   if not bike_id:
-    try:
-      # 바이크 내가 고르기!
-      return {
-                "success": False,
-                "error": "대여할 자전거(bike_id)가 선택되지 않았습니다."
-            }, 400
-    except Exception as e:
-      return {
-                "success": False,
-                "error": f"bike_id 처리 중 오류: {e}"
-            }, 500
-
-  api_url = url_for("api.rent_bike_normal", _external=True)
-  try:
-    res = requests.post(api_url, json={"bike_id": bike_id, "user_id" : session.get('user_id')}, timeout=5)
-    rent_json, rent_status = res.json(), res.status_code
-  except Exception as e:
+    # 바이크 내가 고르기!
     return {
-            "success": False,
-            "error": f"rent-normal API 요청 중 오류가 발생했습니다: {e}"
-        }, 500
+              "success": False,
+              "error": "대여할 자전거(bike_id)가 선택되지 않았습니다."
+          }, 400
 
+  rent_json, rent_status = run_write(rental.rent_bike, session.get('user_id'), bike_id)
   if rent_status >= 400:
     return rent_json, rent_status
 
-  gen_url = url_for("api.generate_sentence", _external=True)
-
-  try:
-    gen_res = requests.post(gen_url,
-                          json={
-                              "messages_for_model": [{
-                                "role": "system",
-                                "content": (
-                                    "너는 자전거 공유 서비스 안내 챗봇이야. "
-                                    "주어진 API 응답(JSON)을 읽고, 사용자가 이해하기 쉬운 "
-                                    "한국어 한두 문장으로 결과를 자연스럽게 설명해줘."
-                                )
-                                },
-                                {
-                                    "role": "user",
-                                    "content": f"다음은 rent-normal API 응답이야:\n{json.dumps(rent_json, ensure_ascii=False)}"
-                                }],
-                              "data": {
-                                "type": "rent_normal",
-                                "api_response": rent_json
-                              }
-                          })  
-    return gen_res.json(), gen_res.status_code
-  except Exception as e:
-    return {
-            "success": False,
-            "error": f"문장 생성 중 오류가 발생했습니다: {e}",
-            "fallback": rent_json
-        }, 500
+  return sentence.describe_api_response("rent_normal", "rent-normal", rent_json)
 
+@_transport
 def fetch_rent_recommand(hub_name=None):
-    """
-    내부 API /api/rent-recommand 호출
-    추천 bike_id 목록을 받아온다.
-    """
-    api_url = url_for("api.rent_recommand", _external=True)
-
-    params = {}
-    if hub_name is not None:
-        params['hub_name'] = hub_name
-    
-
-    try:
-        res = requests.get(api_url, params=params, timeout=5)
-        return res.json(), res.status_code
-    except Exception as e:
-        return {
-            "success": False,
-            "bike_ids": [],
-            "error": f"rent_recommand API 요청 실패: {e}"
-        }, 500
+  """
+  추천 bike_id / 미션을 받아온다.
+  """
+  return recommend.recommend_rent(get_read_db(), hub_name)
 
+@_transport
 def fetch_bike_return_zone(hub_name=None, lat=None, lon=None):
-    """
-    hub_name만 받아서
-    - bike-return-zone 호출
-    - generate-sentence 호출
-    """
-
-    if not hub_name:
-      return {"success": False, "error": "허브 이름이 필요합니다."}, 400
-
-    api_url = url_for("api.bike_return_zone", _external=True)
-
-    payload = {
-      "user_id": session.get("user_id"),
-      "hub_name": hub_name,
-      "lat": lat,
-      "lon": lon
-    }
-
-    try:
-      res = requests.post(api_url, json=payload, timeout=5)
-      ret_json, ret_status = res.json(), res.status_code
-    except Exception as e:
-      return {"success": False, "error": f"bike-return-zone 호출 실패: {e}"}, 500
+  """
+  Zone 반납 처리 + 안내 문장
+  """
+  if not hub_name:
+    return {"success": False, "error": "허브 이름이 필요합니다."}, 400
 
-    if ret_status >= 400:
-      return ret_json, ret_status
+  ret_json, ret_status = run_write(return_service.return_bike_zone, session.get("user_id"), hub_name)
+  if ret_status >= 400:
+    return ret_json, ret_status
 
-    # 자연어 문장 생성
-    gen_url = url_for("api.generate_sentence", _external=True)
-    try:
-      gen_res = requests.post(
-        gen_url,
-        json={
-          "messages_for_model": [
-            {
-              "role": "system",
-              "content": (
-                "너는 자전거 공유 서비스 안내 챗봇이야. "
-                "주어진 API 응답(JSON)을 읽고, "
-                "사용자가 이해하기 쉬운 한국어 한두 문장으로 설명해."
-              )
-            },
-            {
-              "role": "user",
-              "content": f"다음은 bike-return-zone API 응답이야:\n{json.dumps(ret_json, ensure_ascii=False)}"
-            }
-          ],
-          "data": {
-            "type": "bike_return_zone",
-            "api_response": ret_json
-          }
-        },
-        timeout=10
-      )
-      return gen_res.json(), gen_res.status_code
+  return sentence.describe_api_response("bike_return_zone", "bike-return-zone", ret_json)
 
-    except Exception as e:
-      return {
-        "success": False,
-        "error": f"문장 생성 실패: {e}",
-        "fallback": ret_json
-      }, 500
-    
+@_transport
 def fetch_bike_return_station(hub_name=None, lat=None, lon=None):
   """
-  hub_name만 받아서
-  - bike-return-station 호출
-  - generate-sentence 호출
+  Station 반납 처리 + 안내 문장
   """
-
   if not hub_name:
     return {"success": False, "error": "허브 이름이 필요합니다."}, 400
 
-  api_url = url_for("api.bike_return_station", _external=True)
-
-  payload = {
-    "user_id": session.get("user_id"),
-    "hub_name": hub_name,
-    "lat": lat,
-    "lon": lon
-  }
-
-  try:
-    res = requests.post(api_url, json=payload, timeout=5)
-    ret_json, ret_status = res.json(), res.status_code
-  except Exception as e:
-    return {"success": False, "error": f"bike-return-station 호출 실패: {e}"}, 500
-
+  ret_json, ret_status = run_write(return_service.return_bike_station, session.get("user_id"), hub_name)
   if ret_status >= 400:
     return ret_json, ret_status
 
-  # 자연어 문장 생성
-  gen_url = url_for("api.generate_sentence", _external=True)
-  try:
-    gen_res = requests.post(
-      gen_url,
-      json={
-        "messages_for_model": [
-            {
-              "role": "system",
-              "content": (
-                "너는 자전거 공유 서비스 안내 챗봇이야. "
-                "주어진 API 응답(JSON)을 읽고, "
-                "사용자가 이해하기 쉬운 한국어 한두 문장으로 설명해."
-              )
-            },
-            {
-              "role": "user",
-              "content": f"다음은 bike-return-station API 응답이야:\n{json.dumps(ret_json, ensure_ascii=False)}"
-            }
-        ],
-        "data": {
-          "type": "bike_return_station",
-          "api_response": ret_json
-        }
-      },
-      timeout=10
-    )
-    return gen_res.json(), gen_res.status_code
+  return sentence.describe_api_response("bike_return_station", "bike-return-station", ret_json)
 
-  except Exception as e:
-    return {
-      "success": False,
-      "error": f"문장 생성 실패: {e}",
-      "fallback": ret_json
-    }, 500
-  
+@_transport
 def fetch_mission_prepare(mission: dict):
   """
-  내부 API /api/missions/prepare 호출
+  추천된 미션을 생성한다.
   """
-  api_url = url_for("api.missions_prepare", _external=True)
-
-  payload = {
-    "user_id": session.get("user_id"),
-    "low_battery_bike_id": mission.get("low_battery_bike_id"),
-    "target_station_id": mission.get("target_station_id"),
-    "reward": (mission.get("incentive") or {}).get("amount"),
-  }
-
-  try:
-    res = requests.post(api_url, json=payload, timeout=5)
-    return res.json(), res.status_code
-  except Exception as e:
-    return {"success": False, "error": f"missions/prepare 요청 실패: {e}"}, 500
-
+  return run_write(
+    mission_service.prepare_mission,
+    session.get("user_id"),
+    mission.get("low_battery_bike_id"),
+    mission.get("target_station_id"),
+    (mission.get("incentive") or {}).get("amount"),
+  )
+
+@_transport
 def fetch_mission_plug(bike_id, station_id, latitude, longitude):
   """
-  내부 API /api/missions/plug 호출
+  저배터리 자전거를 목표 station에 꽂는다.
   """
-  api_url = url_for("api.missions_plug", _external=True)
+  return run_write(mission_service.plug_mission, session.get("user_id"), bike_id, station_id, latitude, longitude)
 
-  payload = {
-    "user_id": session.get("user_id"),
-    "bike_id": bike_id,
-    "station_id": station_id,
-    "latitude" : latitude,
-    "longitude" : longitude
-  }
-
-  try:
-    res = requests.post(api_url, json=payload, timeout=5)
-    return res.json(), res.status_code
-  except Exception as e:
-    return {"success": False, "error": str(e)}, 500
-  
+@_transport
 def fetch_active_mission():
-  api_url = url_for("api.missions_active", _external=True)
-
-  try:
-    res = requests.get(
-      api_url,
-      params={"user_id": session.get("user_id")},
-      timeout=5
-    )
-    return res.json(), res.status_code
-  except Exception as e:
-    return {"success": False, "error": str(e)}, 500
\ No newline at end of file
+  return mission_service.active_mission(get_read_db(), session.get("user_id"))
@@ -0,0 +1,45 @@
+from flask import abort, current_app, jsonify, request
+from . import bp
+from .transport import transport_stats
+from .services.sentence import sentence_cache_stats
+from ..config import Config
+from .. import availability_snapshot, classify_intent, db, db_writer, geo_index, llm, sql_profile
+
+
+def _check_enabled():
+  if not (current_app.debug or Config.DEBUG_METRICS):
+    abort(404)
+
+
+@bp.get("/debug/metrics")
+def debug_metrics():
+  """
+  LLM 호출(call site별 토큰/지연, 턴 합계, singleflight)과 캐시/transport/DB 연결 지표
+  디버그 모드이거나 Config.DEBUG_METRICS일 때만 열린다.
+  """
+  _check_enabled()
+  return jsonify({
+    "llm": {**llm.llm_stats(), "usage": llm.usage_stats()},
+    "intent_cache": classify_intent.intent_cache_stats(),
+    "yes_no": classify_intent.yes_no_stats(),
+    "sentence_cache": sentence_cache_stats(),
+    "transport": transport_stats(),
+    "db": db.pool_stats(),
+    "writer": db_writer.writer_stats(),
+    "availability_snapshot": availability_snapshot.snapshot_stats(),
+    "geo_index": geo_index.index_stats(),
+  })
+
+
+@bp.get("/debug/queries")
+def debug_queries():
+  """
+  정규화한 SQL별 누적 상위 N개 (?n=20&sort=total_ms|count|avg_ms|max_ms|rows, ?reset=1이면 보여준 뒤 초기화)
+  """
+  _check_enabled()
+  n = request.args.get("n", 20, type=int)
+  sort = request.args.get("sort", "total_ms")
+  queries = sql_profile.top_queries(n, sort)
+  if request.args.get("reset"):
+    sql_profile.reset()
+  return jsonify({"queries": queries})
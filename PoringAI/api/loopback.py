@@ -0,0 +1,288 @@
+"""
+HTTP transport: fetch_*가 /api 엔드포인트를 transport.ApiTransport(공용 연결 풀)로 호출한다.
+Config.API_TRANSPORT = "http"일 때만 쓰이고, 기본은 api/__init__.py의 in-process 서비스 호출이다.
+API_BASE_URL이 없으면 같은 Flask 앱으로 다시 요청한다(loopback).
+"""
+from flask import session
+import json
+
+from .transport import get_transport
+
+def fetch_available_bikes(hub_name: str, lat=None, lon=None):
+  """내부 API(/available-bikes) 호출"""
+  params = {"hub_name": hub_name}
+  if lat is not None and lon is not None:
+      params["lat"] = lat
+      params["lon"] = lon
+  try:
+    res = get_transport().get("api.available_bikes", params=params)
+    return res.json(), res.status_code
+  except Exception as e:
+    return {
+          "hub_name": hub_name,
+          "found": False,
+          "available_bikes": 0,
+          "error": str(e)
+        }, 500
+
+    
+def fetch_available_nearby_bikes(lat: float, lon: float):
+  """
+  내부 API /api/available-nearby-bikes를 호출해 가까운 허브 목록을 그대로 받아온다.
+  서버 내부에서 거리 계산은 하지 않는다(요청만 전달).
+  """
+  params = {"lat": lat, "lon": lon}
+
+  try:
+    res = get_transport().get("api.available_nearby_bikes", params=params)
+    return res.json(), res.status_code
+  except Exception as e:
+    return {
+        "hub_name" : None,
+        "query": {"lat": lat, "lon": lon},
+        "found": False,
+        "available_bikes": 0,
+        "error": str(e)
+    }, 500
+
+def fetch_rent_bike_normal(bike_id=None):
+  if not bike_id:
+    try:
+      # 바이크 내가 고르기!
+      return {
+                "success": False,
+                "error": "대여할 자전거(bike_id)가 선택되지 않았습니다."
+            }, 400
+    except Exception as e:
+      return {
+                "success": False,
+                "error": f"bike_id 처리 중 오류: {e}"
+            }, 500
+
+  try:
+    res = get_transport().post("api.rent_bike_normal", json={"bike_id": bike_id, "user_id" : session.get('user_id')})
+    rent_json, rent_status = res.json(), res.status_code
+  except Exception as e:
+    return {
+            "success": False,
+            "error": f"rent-normal API 요청 중 오류가 발생했습니다: {e}"
+        }, 500
+
+  if rent_status >= 400:
+    return rent_json, rent_status
+
+  try:
+    gen_res = get_transport().post("api.generate_sentence",
+                          json={
+                              "messages_for_model": [{
+                                "role": "system",
+                                "content": (
+                                    "너는 자전거 공유 서비스 안내 챗봇이야. "
+                                    "주어진 API 응답(JSON)을 읽고, 사용자가 이해하기 쉬운 "
+                                    "한국어 한두 문장으로 결과를 자연스럽게 설명해줘."
+                                )
+                                },
+                                {
+                                    "role": "user",
+                                    "content": f"다음은 rent-normal API 응답이야:\n{json.dumps(rent_json, ensure_ascii=False)}"
+                                }],
+                              "data": {
+                                "type": "rent_normal",
+                                "api_response": rent_json
+                              }
+                          })  
+    return gen_res.json(), gen_res.status_code
+  except Exception as e:
+    return {
+            "success": False,
+            "error": f"문장 생성 중 오류가 발생했습니다: {e}",
+            "fallback": rent_json
+        }, 500
+
+def fetch_rent_recommand(hub_name=None):
+    """
+    내부 API /api/rent-recommand 호출
+    추천 bike_id 목록을 받아온다.
+    """
+    params = {}
+    if hub_name is not None:
+        params['hub_name'] = hub_name
+    
+
+    try:
+        res = get_transport().get("api.rent_recommand", params=params)
+        return res.json(), res.status_code
+    except Exception as e:
+        return {
+            "success": False,
+            "bike_ids": [],
+            "error": f"rent_recommand API 요청 실패: {e}"
+        }, 500
+
+def fetch_bike_return_zone(hub_name=None, lat=None, lon=None):
+    """
+    hub_name만 받아서
+    - bike-return-zone 호출
+    - generate-sentence 호출
+    """
+
+    if not hub_name:
+      return {"success": False, "error": "허브 이름이 필요합니다."}, 400
+
+    payload = {
+      "user_id": session.get("user_id"),
+      "hub_name": hub_name,
+      "lat": lat,
+      "lon": lon
+    }
+
+    try:
+      res = get_transport().post("api.bike_return_zone", json=payload)
+      ret_json, ret_status = res.json(), res.status_code
+    except Exception as e:
+      return {"success": False, "error": f"bike-return-zone 호출 실패: {e}"}, 500
+
+    if ret_status >= 400:
+      return ret_json, ret_status
+
+    # 자연어 문장 생성
+    try:
+      gen_res = get_transport().post(
+        "api.generate_sentence",
+        json={
+          "messages_for_model": [
+            {
+              "role": "system",
+              "content": (
+                "너는 자전거 공유 서비스 안내 챗봇이야. "
+                "주어진 API 응답(JSON)을 읽고, "
+                "사용자가 이해하기 쉬운 한국어 한두 문장으로 설명해."
+              )
+            },
+            {
+              "role": "user",
+              "content": f"다음은 bike-return-zone API 응답이야:\n{json.dumps(ret_json, ensure_ascii=False)}"
+            }
+          ],
+          "data": {
+            "type": "bike_return_zone",
+            "api_response": ret_json
+          }
+        }
+      )
+      return gen_res.json(), gen_res.status_code
+
+    except Exception as e:
+      return {
+        "success": False,
+        "error": f"문장 생성 실패: {e}",
+        "fallback": ret_json
+      }, 500
+    
+def fetch_bike_return_station(hub_name=None, lat=None, lon=None):
+  """
+  hub_name만 받아서
+  - bike-return-station 호출
+  - generate-sentence 호출
+  """
+
+  if not hub_name:
+    return {"success": False, "error": "허브 이름이 필요합니다."}, 400
+
+  payload = {
+    "user_id": session.get("user_id"),
+    "hub_name": hub_name,
+    "lat": lat,
+    "lon": lon
+  }
+
+  try:
+    res = get_transport().post("api.bike_return_station", json=payload)
+    ret_json, ret_status = res.json(), res.status_code
+  except Exception as e:
+    return {"success": False, "error": f"bike-return-station 호출 실패: {e}"}, 500
+
+  if ret_status >= 400:
+    return ret_json, ret_status
+
+  # 자연어 문장 생성
+  try:
+    gen_res = get_transport().post(
+      "api.generate_sentence",
+      json={
+        "messages_for_model": [
+            {
+              "role": "system",
+              "content": (
+                "너는 자전거 공유 서비스 안내 챗봇이야. "
+                "주어진 API 응답(JSON)을 읽고, "
+                "사용자가 이해하기 쉬운 한국어 한두 문장으로 설명해."
+              )
+            },
+            {
+              "role": "user",
+              "content": f"다음은 bike-return-station API 응답이야:\n{json.dumps(ret_json, ensure_ascii=False)}"
+            }
+        ],
+        "data": {
+          "type": "bike_return_station",
+          "api_response": ret_json
+        }
+      }
+    )
+    return gen_res.json(), gen_res.status_code
+
+  except Exception as e:
+    return {
+      "success": False,
+      "error": f"문장 생성 실패: {e}",
+      "fallback": ret_json
+    }, 500
+  
+def fetch_mission_prepare(mission: dict):
+  """
+  내부 API /api/missions/prepare 호출
+  """
+
+  payload = {
+    "user_id": session.get("user_id"),
+    "low_battery_bike_id": mission.get("low_battery_bike_id"),
+    "target_station_id": mission.get("target_station_id"),
+    "reward": (mission.get("incentive") or {}).get("amount"),
+  }
+
+  try:
+    res = get_transport().post("api.missions_prepare", json=payload)
+    return res.json(), res.status_code
+  except Exception as e:
+    return {"success": False, "error": f"missions/prepare 요청 실패: {e}"}, 500
+
+def fetch_mission_plug(bike_id, station_id, latitude, longitude):
+  """
+  내부 API /api/missions/plug 호출
+  """
+
+  payload = {
+    "user_id": session.get("user_id"),
+    "bike_id": bike_id,
+    "station_id": station_id,
+    "latitude" : latitude,
+    "longitude" : longitude
+  }
+
+  try:
+    res = get_transport().post("api.missions_plug", json=payload)
+    return res.json(), res.status_code
+  except Exception as e:
+    return {"success": False, "error": str(e)}, 500
+  
+def fetch_active_mission():
+
+  try:
+    res = get_transport().get(
+      "api.missions_active",
+      params={"user_id": session.get("user_id")}
+    )
+    return res.json(), res.status_code
+  except Exception as e:
+    return {"success": False, "error": str(e)}, 500
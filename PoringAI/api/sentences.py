@@ -0,0 +1,31 @@
+import json
+from flask import request, jsonify, Response
+from . import bp
+from .services.sentence import sentence_status
+
+MAX_WAIT_SEC = 10
+
+
+@bp.get("/sentences/<sentence_id>")
+def sentence_poll(sentence_id):
+  """
+  NLG_DEFERRED로 나중에 만들어지는 문장 조회 (?wait=초 만큼 완료를 기다림, 최대 10초)
+  """
+  try:
+    wait = min(float(request.args.get("wait", 0)), MAX_WAIT_SEC)
+  except ValueError:
+    wait = 0
+  data = sentence_status(sentence_id, wait=wait)
+  return jsonify(data), (404 if data["status"] == "unknown" else 200)
+
+
+@bp.get("/sentences/<sentence_id>/stream")
+def sentence_stream(sentence_id):
+  """
+  같은 내용을 SSE로: 완료(또는 실패/시간 초과)되면 done 이벤트 하나를 보내고 끝낸다.
+  """
+  def generate():
+    data = sentence_status(sentence_id, wait=MAX_WAIT_SEC * 3)
+    yield f"event: done\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+  return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,176 @@
+from ...config import Config
+from ... import availability_snapshot, hub_resolver
+from .geo import haversine_m, find_nearest_hub
+
+AVAILABLE_COUNT_SQL = '''
+    SELECT COUNT(*) AS cnt
+    FROM bikes
+    WHERE assigned_hub_id = ?
+      AND is_active = 1
+      AND is_under_repair = 0
+      AND is_retired = 0
+      AND status = 'Returned'
+'''
+
+# hub_availability: bikes 트리거가 유지하는 허브별 rollup (migrations/0003)
+ROLLUP_COUNT_SQL = '''
+    SELECT available AS cnt
+    FROM hub_availability
+    WHERE hub_id = ?
+'''
+
+
+def count_available_bikes(db, hub_id):
+    sql = ROLLUP_COUNT_SQL if Config.AVAILABILITY_ROLLUP else AVAILABLE_COUNT_SQL
+    row = db.execute(sql, (hub_id,)).fetchone()
+    return int(row["cnt"]) if row else 0
+
+
+def _count_region_bikes(db, match, placeholders):
+    return db.execute(
+        f"""
+        SELECT h.hub_name, COUNT(b.bike_id) AS cnt
+        FROM hubs h
+        LEFT JOIN bikes b
+          ON b.assigned_hub_id = h.hub_id
+         AND b.is_active = 1
+         AND b.is_under_repair = 0
+         AND b.is_retired = 0
+         AND b.status = 'Returned'
+        WHERE h.hub_name IN ({placeholders})
+        GROUP BY h.hub_id
+        ORDER BY cnt DESC
+        """,
+        match.hub_names,
+    ).fetchall()
+
+
+def available_bikes_in_region(db, match):
+    """
+    지역 이름(예: 생활관지역)이면 소속 허브별 대수와 합계를 돌려준다.
+    """
+    entries = availability_snapshot.hubs(db, match.hub_names)
+    if all(entries):
+        rows = sorted(
+            ({"hub_name": entry.hub_name, "cnt": entry.available} for entry in entries),
+            key=lambda row: row["cnt"],
+            reverse=True,
+        )
+        return _region_result(match, rows)
+
+    placeholders = ",".join("?" for _ in match.hub_names)
+    if Config.AVAILABILITY_ROLLUP:
+        rows = db.execute(
+            f"""
+            SELECT h.hub_name, COALESCE(a.available, 0) AS cnt
+            FROM hubs h
+            LEFT JOIN hub_availability a ON a.hub_id = h.hub_id
+            WHERE h.hub_name IN ({placeholders})
+            ORDER BY cnt DESC
+            """,
+            match.hub_names,
+        ).fetchall()
+    else:
+        rows = _count_region_bikes(db, match, placeholders)
+    return _region_result(match, rows)
+
+
+def _region_result(match, rows):
+    return {
+        "hub_name": match.name,
+        "found": bool(rows),
+        "is_region": True,
+        "available_bikes": sum(int(row["cnt"]) for row in rows),
+        "hubs": [{"hub_name": row["hub_name"], "available_bikes": int(row["cnt"])} for row in rows],
+    }, 200
+
+
+def available_bikes(db, hub_name, lat=None, lon=None):
+    """
+    허브(또는 지역)의 대여 가능 자전거 수
+    반환: (data, status) - lat/lon이 있으면 허브까지 거리(m)도 넣는다.
+    """
+    if not hub_name:
+        return {"error": "hub_name 쿼리 파라미터가 필요합니다."}, 400
+
+    match = hub_resolver.resolve(hub_name)
+    if match and match.kind == "region":
+        return available_bikes_in_region(db, match)
+    if match:
+        hub_name = match.name
+
+    # snapshot에 있으면 DB를 거치지 않는다.
+    entry = availability_snapshot.hub(db, hub_name)
+    if entry is not None:
+        hub, count = entry._asdict(), entry.available
+    else:
+        hub = db.execute(
+            """
+            SELECT hub_id, latitude, longitude
+            FROM hubs
+            WHERE hub_name = ?
+            """,
+            (hub_name,)
+        ).fetchone()
+        if not hub:
+            return {"hub_name": hub_name, "found": False, "available_bikes": 0, "error": f"{hub_name} 허브를 찾을 수 없습니다."}, 200
+        count = count_available_bikes(db, hub["hub_id"])
+
+    data = {
+        "hub_name": hub_name,
+        "found": True,
+        "available_bikes": count
+    }
+
+    # 거리 계산 (lat/lon이 들어온 경우만)
+    if lat is not None and lon is not None and hub["latitude"] and hub["longitude"]:
+        try:
+            dist = haversine_m(
+                float(lat), float(lon),
+                hub["latitude"], hub["longitude"]
+            )
+            data["distance"] = int(dist)  # meter
+        except Exception:
+            data["distance"] = None
+
+    return data, 200
+
+
+def available_nearby_bikes(db, lat, lon):
+    """
+    사용자 위치에서 가장 가까운 허브의 대여 가능 자전거 수
+    반환: (data, status)
+    """
+    if lat is None or lon is None:
+        return {
+            "hub_name": None,
+            "found": False,
+            "available_bikes": 0,
+            "error": "lat, lon 쿼리 파라미터가 필요합니다 (float)"
+        }, 400
+
+    nearest_hub, dist_m = find_nearest_hub(db, lat, lon)
+    print(f'nearest_hub : {nearest_hub}')
+    if nearest_hub is None:
+        return {
+            "hub_name": None,
+            "found": False,
+            "available_bikes": 0,
+            "error": "근처 허브를 찾을 수 없습니다."
+        }, 400
+
+    entry = availability_snapshot.hub(db, nearest_hub)
+    if entry is not None:
+        count = entry.available
+    else:
+        hub = db.execute("SELECT hub_id FROM hubs WHERE hub_name = ?", (nearest_hub,)).fetchone()
+        if not hub:
+            return {"hub_name": nearest_hub, "found": False, "available_bikes": 0, "error": f"{nearest_hub} 허브를 찾을 수 없습니다."}, 200
+        count = count_available_bikes(db, hub["hub_id"])
+
+    return {
+        "hub_name": nearest_hub,
+        "found": True,
+        "available_bikes": count,
+        "distance": int(dist_m)
+    }, 200
@@ -0,0 +1,64 @@
+from math import radians, sin, cos, sqrt, atan2
+
+from ...config import Config
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    '''
+    위도 차이를 meter로 바꿔주는 함수
+    '''
+    R = 6371000  # 지구 반지름 (meter)
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return R * c
+
+
+def find_nearest_hub(db, user_lat, user_lon):
+    """
+    사용자의 위도/경도를 기반으로 DB에서 가장 가까운 허브 이름을 찾습니다.
+    반환: (hub_name, 거리(m)) - 못 찾으면 (None, None)
+    """
+    if user_lat is None or user_lon is None:
+        print('user_lat, user_lon is None')
+        return None, None
+
+    try:
+        user_lat = float(user_lat)
+        user_lon = float(user_lon)
+    except ValueError as e:
+        print(e)
+        return None, None
+
+    if Config.GEO_INDEX:
+        from ... import geo_index
+        hits = geo_index.nearest(db, user_lat, user_lon)
+        if not hits:
+            return None, None
+        return hits[0].point.hub_name, hits[0].distance
+
+    rows = db.execute("SELECT hub_name, latitude, longitude FROM hubs").fetchall()
+
+    min_dist_m = float('inf')
+    nearest_hub = None
+
+    for hub in rows:
+        if not hub['latitude'] or not hub['longitude']:
+            continue
+
+        dist_m = haversine_m(
+            user_lat, user_lon,
+            hub['latitude'], hub['longitude']
+        )
+
+        if dist_m < min_dist_m:
+            min_dist_m = dist_m
+            nearest_hub = hub['hub_name']
+
+    if nearest_hub is None:
+        return None, None
+    return nearest_hub, min_dist_m
@@ -0,0 +1,339 @@
+import copy
+import hashlib
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+
+from ...cache import LRUCache, SqliteCache
+from ...config import Config
+from ... import llm
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.1
+
+AVAILABILITY_SYSTEM_PROMPT = "You are Poring-AI, a chatbot for a bike rental service. You will engage in natural conversation with the user to tell them the number of available bikes at a specified location. If there are no bikes at that location, recommend the nearest alternative station. Rules: 1) Always maintain a friendly and warm tone. 2) Keep answers concise, limited to 1-2 sentences. 3) Do not provide unnecessary explanations, background information, or verbose descriptions. 4) Avoid an overly humorous or casual tone. 5) Always respond in short, clear Korean sentences."
+
+API_RESPONSE_SYSTEM_PROMPT = (
+    "너는 자전거 공유 서비스 안내 챗봇이야. "
+    "주어진 API 응답(JSON)을 읽고, "
+    "사용자가 이해하기 쉬운 한국어 한두 문장으로 설명해."
+)
+
+
+# ---- 템플릿 문장 (data["type"]별) ----
+
+def _won(amount):
+    return f"{int(amount or 0):,}원"
+
+
+def _render_available_bikes(data):
+    hub_name = data.get("hub_name")
+    count = int(data.get("available_bikes") or 0)
+    if data.get("is_region"):
+        detail = ", ".join(f"{h['hub_name']} {h['available_bikes']}대" for h in data.get("hubs") or [])
+        return f"{hub_name}에는 지금 대여 가능한 자전거가 총 {count}대 있어요. ({detail})"
+    distance = f" (약 {data['distance']}m 거리)" if data.get("distance") is not None else ""
+    if count == 0:
+        return f"{hub_name}{distance}에는 지금 대여 가능한 자전거가 없어요. 다른 허브를 확인해 보시겠어요?"
+    return f"{hub_name}{distance}에는 지금 대여 가능한 자전거가 {count}대 있어요."
+
+
+def _render_available_nearby_bikes(data):
+    hub_name = data.get("hub_name")
+    count = int(data.get("available_bikes") or 0)
+    where = f"약 {data['distance']}m 떨어진 {hub_name}" if data.get("distance") is not None else hub_name
+    if count == 0:
+        return f"가장 가까운 허브는 {where}인데, 지금은 대여 가능한 자전거가 없어요."
+    return f"가장 가까운 허브는 {where}이고, 대여 가능한 자전거가 {count}대 있어요."
+
+
+def _render_rent_normal(data):
+    res = data.get("api_response") or {}
+    if not res.get("success"):
+        return f"대여하지 못했어요. {res.get('error') or ''}".strip()
+    return f"{res.get('bike_id')}번 자전거 대여가 시작되었어요. 안전하게 이용하세요!"
+
+
+def _render_bike_return(place):
+    def render(data):
+        res = data.get("api_response") or {}
+        if not res.get("success"):
+            return f"반납하지 못했어요. {res.get('error') or ''}".strip()
+        return (
+            f"{res.get('hub_name')} {place}에 {res.get('bike_id')}번 자전거 반납이 완료되었어요. "
+            f"이용 시간 {res.get('duration_minutes')}분, 결제 금액은 {_won(res.get('final_paid_amount'))}이에요."
+        )
+    return render
+
+
+# data["type"] -> 문장 함수. 여기 없는 type이나 Config.NLG_LLM_TYPES에 넣은 type은 LLM으로 만든다.
+TEMPLATES = {
+    "available_bikes": _render_available_bikes,
+    "available_nearby_bikes": _render_available_nearby_bikes,
+    "rent_normal": _render_rent_normal,
+    "bike_return_zone": _render_bike_return("Zone"),
+    "bike_return_station": _render_bike_return("Station"),
+}
+
+
+def render_template(data):
+    """
+    템플릿으로 만든 문장, 템플릿이 없거나 값이 모자라 실패하면 None
+    """
+    render = TEMPLATES.get((data or {}).get("type"))
+    if render is None:
+        return None
+    try:
+        return render(data)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# ---- LLM 응답 캐시 (messages + model + temperature 해시 -> content) ----
+
+sentence_cache = LRUCache(maxsize=Config.SENTENCE_CACHE_SIZE, ttl=Config.SENTENCE_CACHE_TTL_SEC)
+_persistent_cache = None
+_persistent_lock = threading.Lock()
+
+
+def sentence_cache_key(messages_for_model, model=MODEL, temperature=TEMPERATURE):
+    """
+    같은 프롬프트면 같은 키가 나오도록 정렬된 JSON의 sha256
+    """
+    canonical = json.dumps(
+        {"messages": messages_for_model, "model": model, "temperature": temperature},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _get_persistent_cache():
+    """
+    SENTENCE_CACHE_PERSIST이면 instance/의 SQLite 계층, 아니면 None
+    """
+    global _persistent_cache
+    if not Config.SENTENCE_CACHE_PERSIST or not has_app_context():
+        return None
+    if _persistent_cache is None:
+        with _persistent_lock:
+            if _persistent_cache is None:
+                _persistent_cache = SqliteCache(
+                    current_app.config["SENTENCE_CACHE_PATH"],
+                    table="sentence_cache",
+                    maxrows=Config.SENTENCE_CACHE_DB_MAX_ROWS,
+                    ttl=Config.SENTENCE_CACHE_TTL_SEC,
+                )
+    return _persistent_cache
+
+
+def _cached_content(key):
+    """
+    (content, 계층) - 메모리 -> SQLite 순서로 찾고, SQLite에서 찾으면 메모리에도 올린다.
+    """
+    content = sentence_cache.get(key)
+    if content is not None:
+        return content, "memory"
+    persistent = _get_persistent_cache()
+    if persistent is not None:
+        content = persistent.get(key)
+        if content is not None:
+            sentence_cache.set(key, content)
+            return content, "sqlite"
+    return None, None
+
+
+def _store_content(key, content):
+    sentence_cache.set(key, content)
+    persistent = _get_persistent_cache()
+    if persistent is not None:
+        persistent.set(key, content)
+
+
+def sentence_cache_stats():
+    stats = {"memory": sentence_cache.stats()}
+    if _persistent_cache is not None:
+        stats["sqlite"] = _persistent_cache.stats()
+    return stats
+
+
+# ---- 지연 문장 생성 (NLG_DEFERRED) ----
+# sentence_id -> {"status": pending|done|error, "summary", "content", "error", "event"}
+
+deferred_sentences = LRUCache(maxsize=Config.NLG_DEFERRED_CACHE_SIZE, ttl=Config.NLG_DEFERRED_TTL_SEC)
+_deferred_executor = None
+_deferred_lock = threading.Lock()
+
+
+def _get_deferred_executor():
+    global _deferred_executor
+    if _deferred_executor is None:
+        with _deferred_lock:
+            if _deferred_executor is None:
+                _deferred_executor = ThreadPoolExecutor(
+                    max_workers=Config.NLG_DEFERRED_WORKERS,
+                    thread_name_prefix="sentence",
+                )
+    return _deferred_executor
+
+
+def _defer_sentence(messages_for_model, data, summary):
+    """
+    템플릿 요약을 바로 돌려주고, LLM 문장은 백그라운드에서 만들어 deferred_sentences에 둔다.
+    """
+    sentence_id = uuid.uuid4().hex
+    job = {"status": "pending", "summary": summary, "content": None, "error": None, "event": threading.Event()}
+    deferred_sentences.set(sentence_id, job)
+
+    app = current_app._get_current_object()
+    payload = copy.deepcopy(data)
+
+    def run():
+        try:
+            with app.app_context():
+                result, status = _generate_with_llm(messages_for_model, payload, defer=False)
+            if status < 400 and result.get("content"):
+                job["content"] = result["content"]
+                job["status"] = "done"
+            else:
+                job["error"] = result.get("error")
+                job["status"] = "error"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "error"
+        finally:
+            job["event"].set()
+
+    _get_deferred_executor().submit(run)
+
+    data["content"] = summary
+    data["nlg"] = "template"
+    data["sentence_id"] = sentence_id
+    return data, 200
+
+
+def sentence_status(sentence_id, wait=0):
+    """
+    지연 생성 중인 문장의 상태. wait초까지 끝나기를 기다린다.
+    반환: {"status": pending|done|error|unknown, "summary", "content", "error"}
+    """
+    job = deferred_sentences.get(sentence_id)
+    if job is None:
+        return {"sentence_id": sentence_id, "status": "unknown"}
+    if wait > 0:
+        job["event"].wait(wait)
+    return {
+        "sentence_id": sentence_id,
+        "status": job["status"],
+        "summary": job["summary"],
+        "content": job["content"],
+        "error": job["error"],
+    }
+
+
+def generate_sentence(messages_for_model, data):
+    """
+    data["type"]에 템플릿이 있으면 바로 문장을 만들고, 없거나 NLG_LLM_TYPES면 LLM으로 만든다.
+    LLM 호출이 실패하면 템플릿 문장으로 대신한다.
+    NLG_DEFERRED이고 NLG_DEFERRED_TYPES이면 (NLG_LLM_TYPES와 상관없이) 템플릿 요약 + sentence_id를 바로 돌려주고 LLM 문장은 나중에 만든다.
+    반환: (data, status) - data["content"]에 문장, data["nlg"]에 "template" | "llm"
+    """
+    if data is None:
+        data = {}
+
+    use_llm = data.get("type") in Config.NLG_LLM_TYPES or \
+        (Config.NLG_DEFERRED and data.get("type") in Config.NLG_DEFERRED_TYPES)
+    if not use_llm:
+        content = render_template(data)
+        if content is not None:
+            data["content"] = content
+            data["nlg"] = "template"
+            return data, 200
+
+    return _generate_with_llm(messages_for_model, data, fallback=use_llm)
+
+
+def _generate_with_llm(messages_for_model, data, fallback=False, defer=True):
+    try:
+        if not isinstance(messages_for_model, list):
+            return {"error": "messages_for_model must be a list of messages"}, 400
+
+        # 같은 프롬프트에 답한 적이 있으면 바로 반환
+        # (대여 / 반납은 프롬프트에 rental_id, 시각 등이 그대로 들어가 같은 키가 다시 나오지 않으므로 캐시하지 않음)
+        key = sentence_cache_key(messages_for_model) if data.get("type") not in Config.SENTENCE_CACHE_SKIP_TYPES else None
+        content, tier = _cached_content(key) if key is not None else (None, None)
+        if content is not None:
+            data["content"] = content
+            data["nlg"] = "llm"
+            data["cache"] = tier
+            return data, 200
+
+        if defer and Config.NLG_DEFERRED and data.get("type") in Config.NLG_DEFERRED_TYPES and has_app_context():
+            summary = render_template(data)
+            if summary is not None:
+                return _defer_sentence(messages_for_model, data, summary)
+
+        client = llm.get_client()
+        if client is None:
+            raise RuntimeError("LLM 클라이언트가 없습니다. (OPENAI_API_KEY 확인)")
+
+        # GPT에게 질문 보내기
+        with llm.call_site("sentence"):
+            resp = client.chat.completions.create(
+                model=MODEL,
+                messages=messages_for_model,
+                temperature=TEMPERATURE
+            )
+
+        # output 추출
+        data["content"] = resp.choices[0].message.content
+        data["nlg"] = "llm"
+        if data["content"] and key is not None:
+            _store_content(key, data["content"])
+        return data, 200
+
+    except Exception as e:
+        content = render_template(data) if fallback else None
+        if content is not None:
+            data["content"] = content
+            data["nlg"] = "template"
+            return data, 200
+        data["error"] = str(e)
+        return data, 400
+
+
+def availability_messages(data):
+    return [
+        {"role": "system", "content": AVAILABILITY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"다음 값을 자연스럽게 한문장으로 바꿔줘 허브이름 : {data['hub_name']}, 자전거 개수 : {data['available_bikes']}"},
+    ]
+
+
+def api_response_messages(api_name, api_response):
+    return [
+        {"role": "system", "content": API_RESPONSE_SYSTEM_PROMPT},
+        {"role": "user", "content": f"다음은 {api_name} API 응답이야:\n{json.dumps(api_response, ensure_ascii=False)}"},
+    ]
+
+
+def describe_availability(data, data_type="available_bikes"):
+    """
+    available_bikes / available_nearby_bikes 결과를 한 문장으로
+    """
+    data["type"] = data_type
+    return generate_sentence(availability_messages(data), data)
+
+
+def describe_api_response(data_type, api_name, api_response):
+    """
+    rent-normal / bike-return-* 결과를 한두 문장으로
+    반환 data: {"type", "api_response", "content"}
+    """
+    return generate_sentence(
+        api_response_messages(api_name, api_response),
+        {"type": data_type, "api_response": api_response},
+    )
@@ -0,0 +1,235 @@
+"""
+fetch_* (loopback.py)가 /api 엔드포인트를 HTTP로 부를 때 쓰는 공용 클라이언트.
+
+- 프로세스 전역 requests.Session 하나를 연결 풀(keep-alive)로 재사용
+- 엔드포인트별 (connect, read) 타임아웃 (Config.API_TIMEOUTS)
+- GET만 제한된 횟수로 재시도 (POST는 대여/반납처럼 멱등이 아니므로 재시도하지 않음)
+- 엔드포인트별 circuit breaker: 연속 실패가 쌓이면 열려서 API_BREAKER_RESET_SEC 동안 그 엔드포인트만 바로 실패
+- 엔드포인트별 호출 수 / 오류 수 / 지연(ms) 기록
+
+Config.API_BASE_URL이 있으면 분리된 API 서버로, 없으면 같은 앱(url_for _external)으로 보낸다.
+"""
+import threading
+import time
+from collections import deque
+
+import requests
+from flask import url_for
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import Config
+
+
+class TransportError(Exception):
+  pass
+
+
+class CircuitOpenError(TransportError):
+  pass
+
+
+class CircuitBreaker:
+  """
+  closed -> (연속 실패 failure_threshold회) -> open -> (reset_sec 경과) -> half_open
+  half_open에서는 probe 한 건만 보내고 나머지는 거절한다. probe가 성공하면 closed, 실패하면 다시 open
+  open 상태에서 들어온 성공(열리기 전에 보낸 요청)은 무시한다.
+  (probe가 결과를 남기지 못하고 reset_sec이 지나면 다음 호출을 새 probe로 보낸다)
+  """
+
+  def __init__(self, failure_threshold=5, reset_sec=30):
+    self.failure_threshold = failure_threshold
+    self.reset_sec = reset_sec
+    self.state = "closed"
+    self.failures = 0
+    self.opened_at = 0.0
+    self.probe_started = None
+    self.rejected = 0
+    self._lock = threading.Lock()
+
+  def allow(self):
+    with self._lock:
+      if self.state == "closed":
+        return True
+      now = time.monotonic()
+      if self.state == "open" and now - self.opened_at < self.reset_sec:
+        self.rejected += 1
+        return False
+      if self.state == "half_open" and now - self.probe_started < self.reset_sec:
+        self.rejected += 1
+        return False
+      self.state = "half_open"
+      self.probe_started = now
+      return True
+
+  def record_success(self):
+    with self._lock:
+      # open 중에 끝난 성공은 열리기 전에 보낸 느린 요청이므로 무시 (reset_sec / probe를 건너뛰지 않도록)
+      if self.state == "open":
+        return
+      self.state = "closed"
+      self.failures = 0
+      self.probe_started = None
+
+  def record_failure(self):
+    with self._lock:
+      self.failures += 1
+      self.probe_started = None
+      if self.state == "half_open" or self.failures >= self.failure_threshold:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+
+  def stats(self):
+    return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+class LatencyStats:
+  """
+  엔드포인트별 호출 수 / 오류 수 / 지연(ms). 백분위는 최근 window개 기준
+  """
+
+  def __init__(self, window=512):
+    self.window = window
+    self._data = {}
+    self._lock = threading.Lock()
+
+  def record(self, endpoint, elapsed_ms, ok):
+    with self._lock:
+      item = self._data.get(endpoint)
+      if item is None:
+        item = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "recent": deque(maxlen=self.window)}
+        self._data[endpoint] = item
+      item["count"] += 1
+      item["errors"] += 0 if ok else 1
+      item["total_ms"] += elapsed_ms
+      item["max_ms"] = max(item["max_ms"], elapsed_ms)
+      item["recent"].append(elapsed_ms)
+
+  def stats(self):
+    out = {}
+    with self._lock:
+      for endpoint, item in self._data.items():
+        recent = sorted(item["recent"])
+        out[endpoint] = {
+          "count": item["count"],
+          "errors": item["errors"],
+          "avg_ms": round(item["total_ms"] / item["count"], 2),
+          "p50_ms": round(recent[len(recent) // 2], 2),
+          "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2),
+          "max_ms": round(item["max_ms"], 2),
+        }
+    return out
+
+
+class ApiTransport:
+
+  def __init__(self, base_url=None, timeouts=None, get_retries=2, pool_size=10,
+               breaker_failures=5, breaker_reset_sec=30):
+    self.base_url = base_url.rstrip("/") if base_url else None
+    self.timeouts = dict(timeouts or {})
+    self.breaker_failures = breaker_failures
+    self.breaker_reset_sec = breaker_reset_sec
+    self._breakers = {}  # endpoint -> CircuitBreaker
+    self._breakers_lock = threading.Lock()
+    self.latency = LatencyStats()
+
+    retry = Retry(
+      total=get_retries,
+      connect=get_retries,
+      read=get_retries,
+      status=get_retries,
+      backoff_factor=0.1,
+      status_forcelist=(502, 503, 504),
+      allowed_methods=frozenset(["GET"]),
+      raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    self.session = requests.Session()
+    self.session.mount("http://", adapter)
+    self.session.mount("https://", adapter)
+
+  @classmethod
+  def from_config(cls):
+    return cls(
+      base_url=Config.API_BASE_URL,
+      timeouts=Config.API_TIMEOUTS,
+      get_retries=Config.API_GET_RETRIES,
+      pool_size=Config.API_POOL_SIZE,
+      breaker_failures=Config.API_BREAKER_FAILURES,
+      breaker_reset_sec=Config.API_BREAKER_RESET_SEC,
+    )
+
+  def url_for(self, endpoint):
+    if self.base_url:
+      return self.base_url + url_for(endpoint)
+    return url_for(endpoint, _external=True)
+
+  def timeout_for(self, endpoint):
+    return self.timeouts.get(endpoint) or self.timeouts.get("default") or (1.0, 5.0)
+
+  def breaker_for(self, endpoint):
+    with self._breakers_lock:
+      breaker = self._breakers.get(endpoint)
+      if breaker is None:
+        breaker = self._breakers[endpoint] = CircuitBreaker(self.breaker_failures, self.breaker_reset_sec)
+      return breaker
+
+  def request(self, method, endpoint, **kwargs):
+    """
+    endpoint: Flask 엔드포인트 이름 (예: "api.available_bikes")
+    반환: requests.Response - 5xx / 연결 실패는 breaker 실패로 센다.
+    """
+    breaker = self.breaker_for(endpoint)
+    if not breaker.allow():
+      raise CircuitOpenError(f"{endpoint}: API circuit open (최근 연속 실패로 잠시 호출하지 않습니다)")
+
+    kwargs.setdefault("timeout", self.timeout_for(endpoint))
+    started = time.perf_counter()
+    try:
+      res = self.session.request(method, self.url_for(endpoint), **kwargs)
+    except requests.RequestException:
+      self.latency.record(endpoint, (time.perf_counter() - started) * 1000, ok=False)
+      breaker.record_failure()
+      raise
+
+    ok = res.status_code < 500
+    self.latency.record(endpoint, (time.perf_counter() - started) * 1000, ok=ok)
+    if ok:
+      breaker.record_success()
+    else:
+      breaker.record_failure()
+    return res
+
+  def get(self, endpoint, params=None, **kwargs):
+    return self.request("GET", endpoint, params=params, **kwargs)
+
+  def post(self, endpoint, json=None, **kwargs):
+    return self.request("POST", endpoint, json=json, **kwargs)
+
+  def stats(self):
+    with self._breakers_lock:
+      breakers = {endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()}
+    return {"breakers": breakers, "endpoints": self.latency.stats()}
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+  global _transport
+  if _transport is None:
+    with _transport_lock:
+      if _transport is None:
+        _transport = ApiTransport.from_config()
+  return _transport
+
+def reset_transport():
+  """설정을 바꾼 뒤 새 세션/브레이커로 다시 만든다."""
+  global _transport
+  with _transport_lock:
+    if _transport is not None:
+      _transport.session.close()
+    _transport = None
+
+def transport_stats():
+  return _transport.stats() if _transport is not None else {}
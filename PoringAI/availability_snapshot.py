@@ -0,0 +1,256 @@
+"""
+허브별 대여 가능 현황을 프로세스 메모리에 들고 있는 snapshot. (Config.AVAILABILITY_SNAPSHOT)
+
+"학생회관에 자전거 몇 대 있어?"처럼 자주 오는 질문은 DB를 거치지 않고 여기서 답한다.
+- 앱 시작 때 한 번 전부 읽는다. (허브 정보 + hub_availability + 허브별 추천 자전거 top N, menu2와 같은 순서)
+- rent / return / mission 쓰기가 커밋되면 db_writer.on_commit으로 바뀐 허브만 dirty 표시 -> 다음 조회 때 그 허브만 다시 읽는다.
+- writer를 거치지 않은 변경(다른 프로세스, CLI)은 AVAILABILITY_SNAPSHOT_TTL_SEC 안에 반영된다. (허브마다 이 시간이 지나면 다시 읽음)
+- 모르는 허브 이름이면 None -> 호출한 쪽이 원래대로 DB에서 찾는다.
+"""
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+
+from .config import Config
+from .db import get_read_db
+from . import db_writer
+
+HubAvailability = namedtuple(
+  "HubAvailability",
+  "hub_id hub_name latitude longitude total_slots "
+  "available station_available zone_available low_battery top_bikes loaded_at",
+)
+
+HUBS_SQL = '''
+  SELECT
+    h.hub_id,
+    h.hub_name,
+    h.latitude,
+    h.longitude,
+    COALESCE((SELECT SUM(s.total_slots) FROM stations s WHERE s.hub_id = h.hub_id), 0) AS total_slots,
+    COALESCE(a.available, 0) AS available,
+    COALESCE(a.station_available, 0) AS station_available,
+    COALESCE(a.zone_available, 0) AS zone_available,
+    COALESCE(a.low_battery, 0) AS low_battery
+  FROM hubs h
+  LEFT JOIN hub_availability a ON a.hub_id = h.hub_id
+'''
+
+# menu2의 허브별 top5와 같은 category / 정렬
+TOP_BIKES_SQL = '''
+  SELECT *
+  FROM (
+    SELECT
+      b.assigned_hub_id AS hub_id,
+      b.bike_id,
+      b.serial_number,
+      b.where_parked,
+      b.battery_level_int,
+      CASE
+        WHEN b.where_parked='Station' AND b.battery_level_int >= :full THEN 1
+        WHEN b.where_parked='Zone'    AND b.battery_level_int >= :full THEN 3
+        WHEN b.where_parked='Station' AND b.battery_level_int <  :full THEN 2
+        ELSE 4
+      END AS category,
+      ROW_NUMBER() OVER (
+        PARTITION BY b.assigned_hub_id
+        ORDER BY
+          CASE
+            WHEN b.where_parked='Station' AND b.battery_level_int >= :full THEN 1
+            WHEN b.where_parked='Zone'    AND b.battery_level_int >= :full THEN 2
+            WHEN b.where_parked='Station' AND b.battery_level_int <  :full THEN 3
+            ELSE 4
+          END ASC,
+          b.battery_level_int DESC,
+          (b.last_rental_time IS NOT NULL) ASC,
+          b.last_rental_time ASC,
+          b.bike_id ASC
+      ) AS pos
+    FROM bikes b
+    WHERE b.assigned_hub_id IS NOT NULL
+      AND b.status = 'Returned'
+      AND b.is_active = 1
+      AND b.is_under_repair = 0
+      AND b.is_retired = 0
+      {hub_filter}
+  )
+  WHERE pos <= :top_n
+  ORDER BY hub_id, pos
+'''
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+class AvailabilitySnapshot:
+
+  def __init__(self, path):
+    self.path = path
+    self._hubs = {}      # hub_id -> HubAvailability
+    self._by_name = {}   # hub_name -> hub_id
+    self._dirty = set()
+    self._version = 0    # invalidate마다 +1 (읽는 도중 들어온 invalidate를 지우지 않도록)
+    self._lock = threading.Lock()
+    self.loaded_at = None
+    self.hits = 0
+    self.reloads = 0
+    self.invalidations = 0
+
+  def _read(self, db, hub_ids=None):
+    """
+    hub_ids가 None이면 전체
+    """
+    params = {"full": Config.FULL_BATTERY, "top_n": Config.AVAILABILITY_SNAPSHOT_TOP_N}
+    if hub_ids is None:
+      hub_where, hub_filter = "", ""
+    else:
+      names = [f":h{i}" for i in range(len(hub_ids))]
+      params.update({f"h{i}": hub_id for i, hub_id in enumerate(hub_ids)})
+      hub_where = f"WHERE h.hub_id IN ({', '.join(names)})"
+      hub_filter = f"AND b.assigned_hub_id IN ({', '.join(names)})"
+
+    top = {}
+    for row in db.execute(TOP_BIKES_SQL.format(hub_filter=hub_filter), params):
+      bike = dict(row)
+      del bike["hub_id"], bike["pos"]
+      top.setdefault(row["hub_id"], []).append(bike)
+
+    now = time.monotonic()
+    return [
+      HubAvailability(**dict(row), top_bikes=top.get(row["hub_id"], []), loaded_at=now)
+      for row in db.execute(HUBS_SQL + hub_where, params)
+    ]
+
+  def load(self, db):
+    version = self._version
+    entries = self._read(db)
+    with self._lock:
+      self._hubs = {entry.hub_id: entry for entry in entries}
+      self._by_name = {entry.hub_name: entry.hub_id for entry in entries}
+      if version == self._version:
+        self._dirty.clear()
+      self.loaded_at = time.monotonic()
+      self.reloads += 1
+
+  def _refresh(self, db, hub_ids):
+    version = self._version
+    entries = self._read(db, hub_ids)
+    with self._lock:
+      for hub_id in hub_ids:
+        old = self._hubs.pop(hub_id, None)
+        if old is not None and self._by_name.get(old.hub_name) == hub_id:
+          del self._by_name[old.hub_name]
+        if version == self._version:
+          self._dirty.discard(hub_id)
+      for entry in entries:
+        self._hubs[entry.hub_id] = entry
+        self._by_name[entry.hub_name] = entry.hub_id
+      self.reloads += 1
+
+  def invalidate(self, hub_ids):
+    with self._lock:
+      self._dirty.update(hub_ids)
+      self._version += 1
+      self.invalidations += len(hub_ids)
+
+  def _stale(self, hub_id, now):
+    entry = self._hubs.get(hub_id)
+    return entry is None or entry.hub_id in self._dirty or \
+      now - entry.loaded_at >= Config.AVAILABILITY_SNAPSHOT_TTL_SEC
+
+  def get_many(self, db, hub_names):
+    """
+    [HubAvailability 또는 None] - 오래됐거나 dirty인 허브만 한 번에 다시 읽는다.
+    """
+    if self.loaded_at is None or time.monotonic() - self.loaded_at >= Config.AVAILABILITY_SNAPSHOT_TTL_SEC * 10:
+      self.load(db)  # 새로 생긴 허브도 들어오도록 가끔(TTL x 10) 전체를 다시 읽음
+
+    now = time.monotonic()
+    hub_ids = [self._by_name.get(name) for name in hub_names]
+    stale = [hub_id for hub_id in hub_ids if hub_id is not None and self._stale(hub_id, now)]
+    if stale:
+      self._refresh(db, stale)
+    else:
+      with self._lock:
+        self.hits += 1
+    return [self._hubs.get(hub_id) if hub_id is not None else None for hub_id in hub_ids]
+
+  def all(self, db):
+    """
+    전체 허브 (hub_id 순서)
+    """
+    with self._lock:
+      names = [self._hubs[hub_id].hub_name for hub_id in sorted(self._hubs)]
+    if self.loaded_at is None:
+      self.load(db)
+      return self.all(db)
+    return [entry for entry in self.get_many(db, names) if entry is not None]
+
+  def stats(self):
+    with self._lock:
+      return {
+        "hubs": len(self._hubs),
+        "dirty": len(self._dirty),
+        "hits": self.hits,
+        "reloads": self.reloads,
+        "invalidations": self.invalidations,
+        "age_sec": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+      }
+
+
+def get_snapshot():
+  path = current_app.config["DATABASE"]
+  with _snapshots_lock:
+    snapshot = _snapshots.get(path)
+    if snapshot is None:
+      snapshot = _snapshots[path] = AvailabilitySnapshot(path)
+  return snapshot
+
+@db_writer.on_commit
+def _invalidate(path, hub_ids):
+  snapshot = _snapshots.get(path)
+  if snapshot is not None:
+    snapshot.invalidate(hub_ids)
+
+def hub(db, hub_name):
+  """
+  허브 하나의 HubAvailability (AVAILABILITY_SNAPSHOT이 꺼져 있거나 모르는 허브면 None)
+  """
+  return hubs(db, [hub_name])[0]
+
+def hubs(db, hub_names):
+  if not Config.AVAILABILITY_SNAPSHOT:
+    return [None] * len(hub_names)
+  try:
+    return get_snapshot().get_many(db, hub_names)
+  except sqlite3.Error as e:
+    current_app.logger.warning("availability snapshot을 읽지 못했습니다: %s", e)
+    return [None] * len(hub_names)
+
+def all_hubs(db):
+  """
+  전체 허브 목록 (꺼져 있으면 None)
+  """
+  if not Config.AVAILABILITY_SNAPSHOT:
+    return None
+  try:
+    return get_snapshot().all(db)
+  except sqlite3.Error as e:
+    current_app.logger.warning("availability snapshot을 읽지 못했습니다: %s", e)
+    return None
+
+def snapshot_stats():
+  with _snapshots_lock:
+    return {path: snapshot.stats() for path, snapshot in _snapshots.items()}
+
+def init_app(app):
+  if not Config.AVAILABILITY_SNAPSHOT:
+    return
+  with app.app_context():
+    try:
+      get_snapshot().load(get_read_db())
+    except sqlite3.Error as e:
+      app.logger.warning("availability snapshot을 만들지 못했습니다: %s", e)
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+  """
+  프로세스 전역에서 공유하는 LRU + TTL 캐시
+  - maxsize: 최대 항목 수 (0이면 캐시 비활성)
+  - ttl: 항목 유효 시간(초), 0이면 만료 없음
+  """
+
+  def __init__(self, maxsize=1024, ttl=0):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self._data = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+    self.invalidations = 0
+
+  def get(self, key, default=None):
+    with self._lock:
+      item = self._data.get(key)
+      if item is None:
+        self.misses += 1
+        return default
+
+      value, expires_at = item
+      if expires_at and expires_at < time.monotonic():
+        del self._data[key]
+        self.expirations += 1
+        self.misses += 1
+        return default
+
+      self._data.move_to_end(key)
+      self.hits += 1
+      return value
+
+  def set(self, key, value):
+    if self.maxsize <= 0:
+      return
+    expires_at = (time.monotonic() + self.ttl) if self.ttl > 0 else 0
+    with self._lock:
+      self._data[key] = (value, expires_at)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+        self.evictions += 1
+
+  def pop(self, key, default=None):
+    with self._lock:
+      item = self._data.pop(key, None)
+    if item is None:
+      return default
+    value, expires_at = item
+    if expires_at and expires_at < time.monotonic():
+      return default
+    return value
+
+  def invalidate(self):
+    with self._lock:
+      self._data.clear()
+      self.invalidations += 1
+
+  def __len__(self):
+    return len(self._data)
+
+  def stats(self):
+    lookups = self.hits + self.misses
+    return {
+      "size": len(self._data),
+      "maxsize": self.maxsize,
+      "ttl": self.ttl,
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": (self.hits / lookups) if lookups else 0.0,
+      "evictions": self.evictions,
+      "expirations": self.expirations,
+      "invalidations": self.invalidations,
+    }
+
+
+class SqliteCache:
+  """
+  재시작 후에도 남는 key -> JSON value 저장소 (LRUCache 뒤의 2차 계층)
+  - maxrows: 넘으면 오래된 항목부터 지움
+  - ttl: 항목 유효 시간(초), 0이면 만료 없음
+  """
+
+  def __init__(self, path, table="cache", maxrows=10000, ttl=0):
+    self.path = path
+    self.table = table
+    self.maxrows = maxrows
+    self.ttl = ttl
+    self._lock = threading.Lock()
+    self._writes = 0
+    self.hits = 0
+    self.misses = 0
+    self.errors = 0
+    self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute(
+      f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+    )
+    self._conn.commit()
+
+  def get(self, key, default=None):
+    try:
+      with self._lock:
+        row = self._conn.execute(
+          f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+    except sqlite3.Error:
+      self.errors += 1
+      return default
+    if row is None or (self.ttl > 0 and row[1] + self.ttl < time.time()):
+      self.misses += 1
+      return default
+    self.hits += 1
+    return json.loads(row[0])
+
+  def set(self, key, value):
+    try:
+      with self._lock:
+        self._conn.execute(
+          f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+          (key, json.dumps(value, ensure_ascii=False), time.time()),
+        )
+        self._writes += 1
+        # 매번 세지 않고 가끔 크기를 맞춘다
+        if self.maxrows > 0 and self._writes % 100 == 0:
+          self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxrows,),
+          )
+        self._conn.commit()
+    except sqlite3.Error:
+      self.errors += 1
+
+  def invalidate(self):
+    with self._lock:
+      self._conn.execute(f"DELETE FROM {self.table}")
+      self._conn.commit()
+
+  def __len__(self):
+    with self._lock:
+      return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+  def stats(self):
+    lookups = self.hits + self.misses
+    return {
+      "path": self.path,
+      "size": len(self),
+      "maxrows": self.maxrows,
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": (self.hits / lookups) if lookups else 0.0,
+      "errors": self.errors,
+    }
@@ -1,10 +1,144 @@
+import contextvars
+import copy
+import functools
+import hashlib
 import json
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from . import hub_resolver, intent_model, llm
+from .cache import LRUCache
 from .config import Config
 
-HUB_DESCRIPTION = Config.HUB_DESCRIPTION
+# 로컬 긍정 / 부정 사전 (classify_yes_no 프롬프트의 예시 + 자주 쓰는 축약형)
+YES_WORDS = {
+  "네", "넵", "넹", "녜", "예", "옙", "응", "웅", "엉", "ㅇ", "ㅇㅇ", "ㅇㅋ", "ㅇㅋㅇㅋ",
+  "오케이", "오키", "ok", "okay", "yes", "y", "ㄱㄱ", "ㄱ", "고고", "가자", "콜", "좋아", "좋습니다",
+  "그래", "당연", "당연하지", "물론", "진행", "진행해", "진행해줘", "수락", "할게", "할래",
+  "빌릴게", "빌릴래", "대여", "대여할게", "해줘", "부탁해",
+}
+NO_WORDS = {
+  "아니", "아니요", "아뇨", "아니오", "놉", "노", "ㄴ", "ㄴㄴ", "no", "n", "nope", "싫어", "싫다",
+  "안할래", "안해", "안", "안할게", "취소", "취소해", "취소해줘", "됐어", "됐다", "그만", "거절", "다음에",
+}
+# "좋아요", "할게요" 처럼 끝에 붙는 존댓말/말꼬리
+_ENDINGS = ("요", "용", "여", "욤", "염", "yo")
 
-# 답변 긍정 / 부정 판단
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+# "ㅋㅋ", "ㅎㅎ", "ㅠㅠ" 같은 감정 표현은 판단에서 제외
+_FILLER_RE = re.compile(r"^[ㅋㅎㅠㅜ]+$")
+
+
+def _normalize_utterance(text):
+  """
+  NFC 정규화 + 소문자 + 문장부호/이모지 제거 + 공백 정리
+  """
+  text = unicodedata.normalize("NFC", text or "").lower()
+  text = _PUNCT_RE.sub(" ", text).replace("_", " ")
+  return " ".join(text.split())
+
+# 정규화된 발화 + classifier 이름 기준 의도 캐시 (temperature=0 이라 같은 입력이면 같은 결과)
+intent_cache = LRUCache(maxsize=Config.INTENT_CACHE_SIZE, ttl=Config.INTENT_CACHE_TTL_SEC)
+_cached_hub_fingerprint = None
+
+def _hub_fingerprint():
+  return hashlib.sha1(Config.HUB_DESCRIPTION.encode("utf-8")).hexdigest()
+
+def _check_hub_description():
+  """
+  허브 목록(HUB_DESCRIPTION)이 바뀌면 hub_name이 들어간 결과가 틀려지므로 캐시를 비운다.
+  """
+  global _cached_hub_fingerprint
+  fingerprint = _hub_fingerprint()
+  if fingerprint != _cached_hub_fingerprint:
+    if _cached_hub_fingerprint is not None:
+      intent_cache.invalidate()
+    _cached_hub_fingerprint = fingerprint
+
+def cached_intent(func):
+  @functools.wraps(func)
+  def wrapper(text, client):
+    _check_hub_description()
+    key = (func.__name__, _normalize_utterance(text))
+    cached = intent_cache.get(key)
+    if cached is not None:
+      return copy.deepcopy(cached)
+
+    result = func(text, client)
+    intent_cache.set(key, copy.deepcopy(result))
+    return result
+  return wrapper
+
+def intent_cache_stats():
+  return intent_cache.stats()
+
+def _yes_no_token(token):
+  for cand in (token, _collapse_repeat(token)):
+    if cand in YES_WORDS:
+      return "YES"
+    if cand in NO_WORDS:
+      return "NO"
+    for ending in _ENDINGS:
+      if cand.endswith(ending) and cand[:-len(ending)]:
+        stem = cand[:-len(ending)]
+        if stem in YES_WORDS:
+          return "YES"
+        if stem in NO_WORDS:
+          return "NO"
+  return None
+
+def _collapse_repeat(token):
+  """
+  "ㅇㅇㅇㅇ" -> "ㅇㅇ", "네네네" -> "네", "ㄴㄴㄴ" -> "ㄴㄴ" 처럼 반복을 줄인다.
+  """
+  for size in (1, 2):
+    unit = token[:size]
+    if unit and len(token) > size and unit * (len(token) // size) == token:
+      return unit * 2 if unit in ("ㅇ", "ㄴ", "ㄱ") else unit
+  return token
+
+def classify_yes_no_local(text):
+  """
+  사전 기반으로 긍정/부정을 판단한다. 애매하면 UNKNOWN
+  - 모든 토큰이 같은 쪽(YES 또는 NO)으로 판단될 때만 결론을 낸다. ("네 아니요", "안 빌릴게" -> UNKNOWN)
+  - "?"로 끝나면 되묻는 말("응?", "어?")일 수 있으므로 UNKNOWN (LLM이 판단)
+  """
+  if (text or "").rstrip().endswith(("?", "？")):
+    return "UNKNOWN"
+  tokens = [t for t in _normalize_utterance(text).split() if not _FILLER_RE.match(t)]
+  if not tokens or len(tokens) > 4:
+    return "UNKNOWN"
+
+  labels = {_yes_no_token(t) for t in tokens}
+  if len(labels) == 1 and None not in labels:
+    return labels.pop()
+  return "UNKNOWN"
+
+# classify_yes_no가 로컬 / LLM 중 어디서 답했는지 기록
+YES_NO_STATS = {"local": 0, "llm": 0}
+
+def yes_no_stats():
+  total = YES_NO_STATS["local"] + YES_NO_STATS["llm"]
+  return {
+    **YES_NO_STATS,
+    "total": total,
+    "local_ratio": (YES_NO_STATS["local"] / total) if total else 0.0,
+  }
+
+# 답변 긍정 / 부정 판단 (로컬 사전 우선, 애매하면 LLM)
 def classify_yes_no(text, client):
+  intent = classify_yes_no_local(text)
+  if intent != "UNKNOWN":
+    YES_NO_STATS["local"] += 1
+    return intent
+
+  YES_NO_STATS["llm"] += 1
+  return _classify_yes_no_llm(text, client)
+
+@cached_intent
+@llm.call_site("classify.yes_no")
+def _classify_yes_no_llm(text, client):
   resp = client.chat.completions.create(
     model="gpt-4o-mini",
     messages=[
@@ -30,6 +164,20 @@ def classify_yes_no(text, client):
   )
   return resp.choices[0].message.content.strip()
 
+# 반납 방식 판단 (classify_return_intent 프롬프트의 ZONE / STATION 규칙)
+ZONE_WORDS = ("임시", "바깥", "정식아님", "정식 아님", "잠깐", "존", "zone")
+STATION_WORDS = ("정식", "거치대", "스테이션", "station")
+
+def classify_return_type_local(text):
+  text = _normalize_utterance(text)
+  if any(w in text for w in ZONE_WORDS):
+    return "ZONE"
+  if any(w in text for w in STATION_WORDS):
+    return "STATION"
+  return "UNKNOWN"
+
+@cached_intent
+@llm.call_site("classify.return")
 def classify_return_intent(text, client):
   resp = client.chat.completions.create(
     model="gpt-4o-mini",
@@ -46,7 +194,7 @@ def classify_return_intent(text, client):
           "}\n\n"
           "ZONE: 임시/바깥/정식아님/잠깐/존\n"
           "STATION: 정식/거치대/스테이션\n"
-          f'{HUB_DESCRIPTION}'
+          f'{Config.HUB_DESCRIPTION}'
         )
       },
       {"role": "user", "content": text}
@@ -55,6 +203,8 @@ def classify_return_intent(text, client):
   )
   return json.loads(resp.choices[0].message.content)
 
+@cached_intent
+@llm.call_site("classify.rent")
 def classify_rent_intent(text, client):
     resp = client.chat.completions.create(
         model="gpt-4o-mini",
@@ -72,7 +222,7 @@ def classify_rent_intent(text, client):
                     "- is_rent=true: 대여/빌리다/타다/렌트/자전거 대여/자전거 빌릴래/탈래 등\n"
                     "- hub_name은 아래 허브 목록 중 하나와 정확히 일치해야 한다.\n"
                     "- 허브가 언급되지 않았으면 hub_name은 null로 둔다.\n\n"
-                    f"{HUB_DESCRIPTION}"
+                    f"{Config.HUB_DESCRIPTION}"
                 )
             },
             {"role": "user", "content": text}
@@ -81,6 +231,8 @@ def classify_rent_intent(text, client):
     )
     return json.loads(resp.choices[0].message.content)
 
+@cached_intent
+@llm.call_site("classify.mission")
 def classify_mission_intent(text, client):
   resp = client.chat.completions.create(
     model="gpt-4o-mini",
@@ -107,4 +259,267 @@ def classify_mission_intent(text, client):
     ],
     temperature=0
   )
-  return json.loads(resp.choices[0].message.content)
\ No newline at end of file
+  return json.loads(resp.choices[0].message.content)
+
+TOOL_NAMES = ("get_available_bikes", "get_available_nearby_bikes")
+MISSION_TYPES = ("MISSION_PLUG", "MISSION_CHECK")
+# intent_model(n-gram) 라벨 중 TurnIntents가 LLM 없이 그대로 쓰는 것
+# 쓰기로 이어지는 의도(MISSION_PLUG / RETURN / RENT)는 확신도가 높아도 LLM이 판단한다. (엉뚱한 발화로 반납/대여가 시작되지 않도록)
+LOCAL_LABELS = ("MISSION_CHECK", "CHAT") + TOOL_NAMES
+
+# 미션 / 반납 / 대여 / tool 의도를 한 번에 판단
+@cached_intent
+@llm.call_site("classify.turn")
+def classify_turn_intent(text, client):
+  resp = client.chat.completions.create(
+    model="gpt-4o-mini",
+    messages=[
+      {
+        "role": "system",
+        "content": (
+          "사용자 발화를 보고 자전거 공유 챗봇의 의도를 한 번에 판단해라.\n"
+          "반드시 JSON만 출력한다.\n\n"
+          "{\n"
+          '  "mission": "MISSION_PLUG|MISSION_CHECK|NONE",\n'
+          '  "is_return": true|false,\n'
+          '  "return_type": "ZONE|STATION|UNKNOWN",\n'
+          '  "is_rent": true|false,\n'
+          '  "tool": "get_available_bikes|get_available_nearby_bikes|NONE",\n'
+          '  "hub_name": string|null\n'
+          "}\n\n"
+          "mission 규칙:\n"
+          "- MISSION_PLUG: 미션 자전거 꽂았어, 저배터리 자전거 스테이션에 넣었어, 미션 완료했어\n"
+          "- MISSION_CHECK: 내 미션 뭐야?, 진행 중인 미션 있어?\n"
+          "- 반납할게, 자전거 반납 같은 일반 반납은 NONE\n\n"
+          "반납 규칙:\n"
+          "- is_return=true: 반납할게, 자전거 반납, 다 탔어 등\n"
+          "- ZONE: 임시/바깥/정식아님/잠깐/존\n"
+          "- STATION: 정식/거치대/스테이션\n\n"
+          "대여 규칙:\n"
+          "- is_rent=true: 대여/빌리다/타다/렌트/자전거 대여/자전거 빌릴래/탈래 등\n\n"
+          "tool 규칙 (대여/반납/미션이 아닌 자전거 대수 질문일 때만):\n"
+          "- get_available_nearby_bikes: '내', '나', '지금', '현재', '여기'처럼 사용자의 현재 위치를 기준으로 한 질문\n"
+          "- get_available_bikes: 특정 허브나 지역 이름을 기준으로 한 질문\n"
+          "- 그 외 일반 대화는 NONE\n\n"
+          "hub_name 규칙:\n"
+          "- hub_name은 아래 허브 목록 중 하나와 정확히 일치해야 한다.\n"
+          "- 허브가 언급되지 않았으면 hub_name은 null로 둔다.\n\n"
+          f"{Config.HUB_DESCRIPTION}"
+        )
+      },
+      {"role": "user", "content": text}
+    ],
+    response_format={"type": "json_object"},
+    temperature=0
+  )
+  return _normalize_turn_intent(json.loads(resp.choices[0].message.content))
+
+def _normalize_turn_intent(raw):
+  """
+  통합 라우터 결과를 classify_mission/return/rent_intent와 같은 모양으로 나눠서 돌려준다.
+  """
+  hub_name = raw.get("hub_name") or None
+
+  mission_type = raw.get("mission")
+  if mission_type not in MISSION_TYPES:
+    mission_type = "NONE"
+
+  return_type = raw.get("return_type")
+  if return_type not in ("ZONE", "STATION"):
+    return_type = "UNKNOWN"
+
+  tool_name = raw.get("tool")
+  if tool_name not in TOOL_NAMES:
+    tool_name = None
+
+  return {
+    "mission": {"type": mission_type},
+    "return": {
+      "is_return": bool(raw.get("is_return")),
+      "return_type": return_type,
+      "hub_name": hub_name,
+    },
+    "rent": {"is_rent": bool(raw.get("is_rent")), "hub_name": hub_name},
+    "tool": {"name": tool_name, "hub_name": hub_name},
+  }
+
+
+# speculative 모드에서 classifier들을 동시에 돌리는 프로세스 공용 스레드 풀
+_intent_executor = None
+_intent_executor_lock = threading.Lock()
+
+def _get_intent_executor():
+  global _intent_executor
+  with _intent_executor_lock:
+    if _intent_executor is None:
+      _intent_executor = ThreadPoolExecutor(
+        max_workers=Config.INTENT_POOL_SIZE,
+        thread_name_prefix="intent",
+      )
+  return _intent_executor
+
+
+class TurnIntents:
+  """
+  menu1의 한 턴에 필요한 의도 판단 결과를 INTENT_MODE에 맞게 제공한다.
+  - sequential: 기존처럼 필요한 classify_* 만 순서대로 호출
+  - unified: classify_turn_intent 한 번으로 미션/반납/대여/tool 의도를 모두 판단
+  - speculative: 미션/반납/대여 classifier를 스레드 풀에서 동시에 시작하고 결과만 순서대로 꺼냄
+    (벽시계 시간은 가장 느린 호출 하나로 줄고, 쓰이지 않은 결과는 close()에서 취소/폐기)
+  우선순위(미션 > 반납 > 대여 > tool)는 호출하는 쪽(menu1)이 그대로 적용한다.
+
+  학습된 intent_model이 INTENT_MODEL_THRESHOLD 이상으로 확신하면 LLM 없이 그 라벨로 답한다.
+  hub_name은 hub_resolver로 발화에서 직접 뽑고, LLM이 돌려준 hub_name도 정식 이름으로 고친다.
+  """
+
+  MODES = ("sequential", "unified", "speculative")
+
+  def __init__(self, text, client, mode=None):
+    self.text = text
+    self.client = client
+    self.mode = mode or Config.INTENT_MODE
+    if self.mode not in self.MODES:
+      raise ValueError(f"알 수 없는 INTENT_MODE: {self.mode}")
+    self._routed = None
+    self._futures = {}
+    self.label = None  # 이번 턴에 고른 의도 (chat_log.inferred_intent)
+    self.local_label = self._predict_local(text)
+
+    if self.mode == "speculative":
+      executor = _get_intent_executor()
+      classifiers = {
+        "mission": classify_mission_intent,
+        "return": classify_return_intent,
+        "rent": classify_rent_intent,
+      }
+      if self.local_label is None:
+        self._futures = {
+          kind: executor.submit(contextvars.copy_context().run, func, text, client)
+          for kind, func in classifiers.items()
+        }
+
+  @staticmethod
+  def _predict_local(text):
+    predicted = intent_model.predict(text)
+    if predicted is None:
+      return None
+    label, prob = predicted
+    if label in LOCAL_LABELS and prob >= Config.INTENT_MODEL_THRESHOLD:
+      return label
+    return None
+
+  def _hub_from_text(self):
+    match = hub_resolver.extract(self.text)
+    return match.name if match else None
+
+  def _with_hub(self, result):
+    """
+    LLM이 돌려준 hub_name을 정식 이름으로 고치고, 없으면 발화에서 직접 찾는다.
+    """
+    if "hub_name" not in result:
+      return result
+    if result.get("hub_name"):
+      match = hub_resolver.resolve(result["hub_name"])
+      if match:
+        result["hub_name"] = match.name
+    elif result.get("is_rent") or result.get("is_return") or result.get("name"):
+      result["hub_name"] = self._hub_from_text()
+    return result
+
+  def _local_answer(self, kind):
+    label = self.local_label
+    if kind == "mission":
+      return {"type": label if label in MISSION_TYPES else "NONE"}
+    if kind == "return":
+      if label == "RETURN":
+        return {
+          "is_return": True,
+          "return_type": classify_return_type_local(self.text),
+          "hub_name": self._hub_from_text(),
+        }
+      return {"is_return": False, "return_type": "UNKNOWN", "hub_name": None}
+    if label == "RENT":
+      return {"is_rent": True, "hub_name": self._hub_from_text()}
+    return {"is_rent": False, "hub_name": None}
+
+  def _route(self):
+    if self._routed is None:
+      self._routed = classify_turn_intent(self.text, self.client)
+    return self._routed
+
+  def mission(self):
+    result = self._mission()
+    if result.get("type") in MISSION_TYPES:
+      self.label = result["type"]
+    return result
+
+  def _mission(self):
+    if self.local_label is not None:
+      return self._local_answer("mission")
+    if self.mode == "unified":
+      return self._route()["mission"]
+    if self.mode == "speculative":
+      return self._futures["mission"].result()
+    return classify_mission_intent(self.text, self.client)
+
+  def ret(self):
+    result = self._ret()
+    if result.get("is_return"):
+      self.label = "RETURN"
+    return result
+
+  def _ret(self):
+    if self.local_label is not None:
+      return self._local_answer("return")
+    if self.mode == "unified":
+      return self._with_hub(self._route()["return"])
+    if self.mode == "speculative":
+      return self._with_hub(self._futures["return"].result())
+    return self._with_hub(classify_return_intent(self.text, self.client))
+
+  def rent(self):
+    result = self._rent()
+    if result.get("is_rent"):
+      self.label = "RENT"
+    return result
+
+  def _rent(self):
+    if self.local_label is not None:
+      return self._local_answer("rent")
+    if self.mode == "unified":
+      return self._with_hub(self._route()["rent"])
+    if self.mode == "speculative":
+      return self._with_hub(self._futures["rent"].result())
+    return self._with_hub(classify_rent_intent(self.text, self.client))
+
+  def tool(self):
+    """
+    unified 모드에서만 {"name", "hub_name"}을 돌려준다.
+    None이면 호출하는 쪽에서 tool calling으로 직접 판단해야 한다. (그 결과는 label에 직접 넣음)
+    """
+    result = self._tool()
+    if result is not None:
+      self.label = result["name"] or "CHAT"
+    return result
+
+  def _tool(self):
+    label = self.local_label
+    if label == "CHAT":
+      return {"name": None, "hub_name": None}
+    if label == "get_available_nearby_bikes":
+      return {"name": label, "hub_name": None}
+    if label == "get_available_bikes":
+      hub_name = self._hub_from_text()
+      if hub_name:
+        return {"name": label, "hub_name": hub_name}
+    if self.mode == "unified":
+      return self._with_hub(self._route()["tool"])
+    return None
+
+  def close(self):
+    """
+    아직 시작하지 않은 speculative 호출은 취소하고, 실행 중인 호출의 결과는 버린다.
+    """
+    for future in self._futures.values():
+      future.cancel()
+    self._futures = {}
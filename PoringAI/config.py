@@ -1,5 +1,5 @@
 class Config:
-    FULL_BATTERY = 50 # 완충 기준
+    FULL_BATTERY = 50 # 완충 기준 (hub_availability 트리거 기준은 앱 시작 때 이 값으로 맞춤 - rollup.sync_full_battery)
     HUB_DESCRIPTION = '''
     허브 이름에는 무은재기념관, 학생회관, 환경공학동, 생활관21동, 생활관3동, 생활관12동, 생활관15동, 박태준학술정보관, 친환경소재대학원, 제1실험동, 기계실험동, 가속기IBS가 있어. 지역에는 교사지역, 생활관지역, 인화지역, 가속기&연구실험동이 있어. 교사지역에 있는 허브로는 무은재기념관, 학생회관, 환경공학동이 있어. 생활관지역에는 생활관21동, 생활관3동, 생활관12동, 생활관15동이 있어. 인화지역에 있는 허브는 박태준학술정보관, 친환경소재대학원이 있어. 가속기&연구실험동에 있는 허브는 제1실험동, 기계실험동, 가속기IBS가 있어.
     '''
@@ -13,4 +13,97 @@ class Config:
     RETURN_CTX_KEY = "return_ctx"
     LOW_BATTERY_INCENTIVE = 1000
     WAITING_MISSION_CONFIRM = "waiting_mission_confirm"
-    PENDING_MISSION = "pending_mission"
\ No newline at end of file
+    PENDING_MISSION = "pending_mission"
+    PENDING_STREAM = "pending_stream_id"
+    INTENT_MODE = "unified"  # 의도 판단 방식: "sequential"(classify_* 순차 호출) | "unified"(통합 라우터 1회 호출) | "speculative"(classify_* 동시 호출)
+    INTENT_POOL_SIZE = 8     # speculative 모드에서 classifier를 동시에 돌릴 최대 스레드 수
+    INTENT_CACHE_SIZE = 1024      # 의도 캐시 최대 항목 수, 0이면 비활성
+    INTENT_CACHE_TTL_SEC = 60 * 60  # 의도 캐시 TTL, 0이면 만료 없음
+    INTENT_MODEL_THRESHOLD = 0.9  # n-gram 의도 모델 결과를 LLM 없이 그대로 쓸 최소 확률
+    CHAT_LOG = True               # menu1에서 LLM이 고른 의도를 chat_log에 남김 (flask train-intents 학습 데이터)
+    HUB_REGIONS = {              # 지역 이름 -> 소속 허브 (HUB_DESCRIPTION과 같은 내용)
+        "교사지역": ["무은재기념관", "학생회관", "환경공학동"],
+        "생활관지역": ["생활관21동", "생활관3동", "생활관12동", "생활관15동"],
+        "인화지역": ["박태준학술정보관", "친환경소재대학원"],
+        "가속기&연구실험동": ["제1실험동", "기계실험동", "가속기IBS"],
+    }
+    HUB_ALIASES = {              # 별칭 -> 허브 또는 지역 이름
+        "무은재": "무은재기념관",
+        "학관": "학생회관",
+        "환공": "환경공학동",
+        "환경공학관": "환경공학동",
+        "도서관": "박태준학술정보관",
+        "박태준": "박태준학술정보관",
+        "친환경": "친환경소재대학원",
+        "21동": "생활관21동",
+        "3동": "생활관3동",
+        "12동": "생활관12동",
+        "15동": "생활관15동",
+        "1실험동": "제1실험동",
+        "기계동": "기계실험동",
+        "가속기": "가속기IBS",
+        "IBS": "가속기IBS",
+        "교사": "교사지역",
+        "생활관": "생활관지역",
+        "기숙사": "생활관지역",
+        "인화": "인화지역",
+        "연구실험동": "가속기&연구실험동",
+    }
+    HUB_FUZZY_MAX_DISTANCE = 2   # 허브 이름 오타 허용 자모 편집 거리
+    HUB_RESOLVER_CHECK_SEC = 60  # hubs 테이블 변경 여부 확인 주기(초)
+    API_TRANSPORT = "inprocess"  # menu에서 api 호출 방식: inprocess(서비스 함수 직접 호출) | http(HTTP 요청)
+    API_BASE_URL = None          # http일 때 분리된 API 서버 주소 (예: "http://api:5001"), None이면 같은 앱
+    API_TIMEOUTS = {             # 엔드포인트별 (connect, read) 타임아웃(초)
+        "default": (1.0, 5.0),
+        "api.generate_sentence": (1.0, 10.0),
+    }
+    API_GET_RETRIES = 2          # GET 재시도 횟수 (POST는 재시도하지 않음)
+    API_POOL_SIZE = 10           # keep-alive 연결 풀 크기
+    API_BREAKER_FAILURES = 5     # 연속 실패가 이만큼이면 circuit open
+    API_BREAKER_RESET_SEC = 30   # open 후 다시 시도하기까지(초)
+    NLG_LLM_TYPES = set()        # generate-sentence에서 템플릿 대신 LLM으로 문장을 만들 data["type"] (예: {"rent_normal"})
+    NLG_DEFERRED = False         # True면 NLG_DEFERRED_TYPES는 LLM 문장을 기다리지 않고 템플릿 요약 + sentence_id를 먼저 반환 (NLG_LLM_TYPES에 없어도 됨)
+    NLG_DEFERRED_TYPES = {"rent_normal", "bike_return_zone", "bike_return_station"}
+    NLG_DEFERRED_WORKERS = 4     # 지연 문장을 만드는 백그라운드 스레드 수
+    NLG_DEFERRED_CACHE_SIZE = 1024  # 결과를 가져가기 전까지 들고 있는 지연 문장 수 (넘으면 오래된 것부터 버림)
+    NLG_DEFERRED_TTL_SEC = 600      # 지연 문장을 들고 있는 시간(초)
+    SENTENCE_CACHE_SIZE = 2048          # generate-sentence LLM 응답 메모리 캐시 크기 (0이면 비활성)
+    SENTENCE_CACHE_TTL_SEC = 24 * 3600  # 캐시 유효 시간(초), 0이면 만료 없음
+    SENTENCE_CACHE_PERSIST = False      # True면 instance/sentence_cache.db에도 저장 (재시작 후에도 유지)
+    SENTENCE_CACHE_DB_MAX_ROWS = 50000
+    SENTENCE_CACHE_SKIP_TYPES = {"rent_normal", "bike_return_zone", "bike_return_station"}  # 프롬프트에 매번 다른 값(rental_id, 시각)이 들어가 캐시해도 맞지 않는 data["type"]
+    LLM_BACKEND = "openai"        # "openai" | "stub" (OPENAI_MOCK=1이면 stub)
+    LLM_BASE_URL = None           # OpenAI 호환 서버 주소, None이면 기본 api.openai.com
+    LLM_MAX_CONNECTIONS = 20      # httpx 연결 풀 크기
+    LLM_MAX_KEEPALIVE = 10        # 유지할 keep-alive 연결 수
+    LLM_KEEPALIVE_SEC = 60        # 쉬는 연결을 닫기까지(초)
+    LLM_CONNECT_TIMEOUT_SEC = 3.0
+    LLM_TIMEOUT_SEC = 30.0        # 응답 전체 타임아웃(초)
+    LLM_MAX_RETRIES = 1
+    LLM_MAX_CONCURRENCY = 16      # 동시에 진행할 최대 LLM 호출 수
+    LLM_SINGLEFLIGHT = True       # 인자가 같은 LLM 호출이 동시에 들어오면 한 번만 보내고 결과를 공유
+    LLM_STUB_LATENCY_MS = 0       # stub 백엔드 응답 지연(ms)
+    LLM_STUB_LATENCY_PROFILE = None  # stub 지연 분포, 있으면 LLM_STUB_LATENCY_MS 대신 사용 (예: "lognormal:300,0.5")
+    LLM_STUB_ERROR_RATE = 0.0     # stub 백엔드가 429/500을 낼 확률
+    SQLITE_PERSISTENT = True      # 스레드마다 DB 연결을 유지 (False면 요청마다 연결/종료)
+    SQLITE_PRAGMAS = {            # 연결을 만들 때 실행할 PRAGMA
+        "journal_mode": "WAL",    # 읽기와 쓰기가 서로 막지 않도록
+        "synchronous": "NORMAL",  # WAL에서는 NORMAL이어도 DB가 깨지지 않음 (정전 시 마지막 커밋만 잃을 수 있음)
+        "busy_timeout": 5000,     # 잠금 대기(ms)
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -16000,     # 음수는 KiB 단위 (약 16MB)
+        "temp_store": "MEMORY",
+    }
+    AVAILABILITY_ROLLUP = True    # 대여 가능 대수를 bikes COUNT(*) 대신 hub_availability(트리거로 유지)에서 읽음
+    AVAILABILITY_SNAPSHOT = True  # 허브별 대수 / 추천 자전거를 메모리에 두고 쓰기 커밋 때 바뀐 허브만 다시 읽음 (False면 매번 DB)
+    AVAILABILITY_SNAPSHOT_TTL_SEC = 30  # writer를 거치지 않은 변경(다른 프로세스 등)이 snapshot에 반영되기까지 최대 시간
+    AVAILABILITY_SNAPSHOT_TOP_N = 5     # 허브마다 들고 있는 추천 자전거 수 (menu2 top5)
+    GEO_INDEX = True              # 가까운 허브 / 반경 검색을 hubs 전체 haversine 대신 격자 인덱스로 (hubs/stations/zones가 바뀌면 HUB_RESOLVER_CHECK_SEC 안에 다시 만듦)
+    GEO_GRID_CELL_M = 200         # 격자 한 칸 크기(m)
+    SQLITE_SPLIT_RW = True        # 읽기는 mode=ro 연결(get_read_db), 쓰기는 writer 스레드 한 곳(db_writer.run_write)으로
+    SQLITE_WRITE_BATCH_MAX = 32   # writer가 한 트랜잭션(COMMIT 한 번)으로 묶는 최대 쓰기 작업 수
+    SQLITE_WRITE_BATCH_WAIT_MS = 0  # 첫 작업을 받은 뒤 더 모으려고 기다리는 시간 (0이면 이미 쌓인 것만 묶음)
+    SQL_PROFILE = False           # get_db 연결의 SQL 시간을 재서 /api/debug/queries, Server-Timing 헤더(디버그 모드 / DEBUG_METRICS만)로 보여줌 - 문장마다 전역 lock이 걸리므로 측정할 때만
+    SQL_SLOW_MS = 50              # 이 시간(ms) 이상 걸린 SQL은 EXPLAIN QUERY PLAN과 함께 경고 로그
+    PROMPT_TOKEN_BUDGET = 3000    # menu1 LLM 호출 하나에 보낼 최대 prompt 토큰 (tools 포함, 넘으면 오래된 대화부터 뺌)
+    DEBUG_METRICS = False         # True면 디버그 모드가 아니어도 /api/debug/metrics 공개
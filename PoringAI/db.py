@@ -1,41 +1,235 @@
+import os
+import re
 import sqlite3
+import threading
 from datetime import datetime
 
 import click
+from urllib.parse import quote
 from flask import current_app, g
 
+from .config import Config
+from . import sql_profile
+
+
+def _connect(path, read_only=False, isolation_level=""):
+  """
+  read_only면 mode=ro로 열어서 실수로라도 쓰지 못하게 한다. (journal_mode는 쓰기 연결에서 정한 것을 따름)
+  """
+  if read_only:
+    path = "file:" + quote(os.path.abspath(path)) + "?mode=ro"
+  db = sqlite3.connect(
+    path,
+    detect_types = sqlite3.PARSE_DECLTYPES,
+    check_same_thread = False,  # 만든 스레드에서만 쓰지만, 죽은 스레드의 연결을 다른 스레드에서 닫기 위해
+    factory = sql_profile.ProfiledConnection if Config.SQL_PROFILE else sqlite3.Connection,
+    uri = read_only,
+    isolation_level = None if read_only else isolation_level,
+  )
+  db.row_factory = sqlite3.Row
+  for name, value in Config.SQLITE_PRAGMAS.items():
+    if read_only and name == "journal_mode":
+      continue
+    db.execute(f"PRAGMA {name}={value}")
+  return db
+
+
+class ConnectionPool:
+  """
+  DATABASE 경로별로 스레드마다 연결 하나를 만들어 두고 요청이 끝나도 닫지 않는다.
+  (연결 비용 + page cache / statement cache를 요청마다 버리지 않도록)
+  요청이 끝날 때 열린 트랜잭션이 남아 있으면 rollback해서 다음 요청에 넘기지 않는다.
+  """
+
+  def __init__(self):
+    self._local = threading.local()
+    self._conns = {}  # (thread ident, path, read_only) -> connection
+    self._lock = threading.Lock()
+    self.opened = 0
+    self.reused = 0
+    self.rollbacks = 0
+    self.reaped = 0
+
+  def acquire(self, path, read_only=False):
+    conns = getattr(self._local, "conns", None)
+    if conns is None:
+      conns = self._local.conns = {}
+    db = conns.get((path, read_only))
+    if db is not None:
+      with self._lock:
+        self.reused += 1
+      return db
+
+    db = conns[(path, read_only)] = _connect(path, read_only)
+    with self._lock:
+      self.opened += 1
+      self._conns[(threading.get_ident(), path, read_only)] = db
+      self._reap()
+    return db
+
+  def release(self, db):
+    if db.in_transaction:
+      db.rollback()
+      with self._lock:
+        self.rollbacks += 1
+
+  def _reap(self):
+    """
+    끝난 스레드가 남긴 연결을 닫는다. (lock 안에서 호출)
+    """
+    alive = {t.ident for t in threading.enumerate()}
+    for key in [key for key in self._conns if key[0] not in alive]:
+      try:
+        self._conns.pop(key).close()
+      except sqlite3.Error:
+        pass
+      self.reaped += 1
+
+  def close_all(self):
+    """
+    모든 스레드의 연결을 닫는다. (DB 파일을 바꾸거나 지우기 전에)
+    """
+    with self._lock:
+      for db in self._conns.values():
+        try:
+          db.close()
+        except sqlite3.Error:
+          pass
+      self._conns.clear()
+    self._local = threading.local()
+
+  def stats(self):
+    with self._lock:
+      return {
+        "persistent": Config.SQLITE_PERSISTENT,
+        "open": len(self._conns),
+        "open_read_only": sum(1 for key in self._conns if key[2]),
+        "opened": self.opened,
+        "reused": self.reused,
+        "rollbacks": self.rollbacks,
+        "reaped": self.reaped,
+        "pragmas": dict(Config.SQLITE_PRAGMAS),
+      }
+
+
+pool = ConnectionPool()
+
 def get_db():
   if 'db' not in g:
-    g.db = sqlite3.connect(
-      current_app.config['DATABASE'],
-      detect_types = sqlite3.PARSE_DECLTYPES
-    )
-    g.db.row_factory = sqlite3.Row
+    if Config.SQLITE_PERSISTENT:
+      g.db = pool.acquire(current_app.config['DATABASE'])
+    else:
+      g.db = _connect(current_app.config['DATABASE'])
 
   return g.db
 
+def get_read_db():
+  """
+  읽기 전용 연결 (SQLITE_SPLIT_RW가 아니면 get_db와 같음)
+  WAL에서는 쓰기 트랜잭션이 진행 중이어도 막히지 않고 마지막 커밋 기준으로 읽는다.
+  """
+  if not Config.SQLITE_SPLIT_RW:
+    return get_db()
+  if 'read_db' not in g:
+    if Config.SQLITE_PERSISTENT:
+      g.read_db = pool.acquire(current_app.config['DATABASE'], read_only=True)
+    else:
+      g.read_db = _connect(current_app.config['DATABASE'], read_only=True)
+
+  return g.read_db
+
 def close_db(e=None):
-  db = g.pop('db', None)
+  for key in ('db', 'read_db'):
+    db = g.pop(key, None)
 
-  if db is not None:
-    db.close()
+    if db is not None:
+      if Config.SQLITE_PERSISTENT:
+        pool.release(db)
+      else:
+        db.close()
 
+def pool_stats():
+  return pool.stats()
 
-def init_db():
+
+# ---- 마이그레이션 (PoringAI/migrations/NNNN_이름.sql) ----
+
+_MIGRATION_RE = re.compile(r"^(\d{4})_(.+)\.sql$")
+
+def migration_files():
+  """
+  [(version, 파일 이름, 경로)] version 순서
+  """
+  folder = os.path.join(current_app.root_path, 'migrations')
+  files = []
+  for name in os.listdir(folder):
+    m = _MIGRATION_RE.match(name)
+    if m:
+      files.append((int(m.group(1)), name, os.path.join(folder, name)))
+  return sorted(files)
+
+def applied_migrations(db):
+  db.execute(
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+      version     INTEGER PRIMARY KEY,
+      name        TEXT NOT NULL,
+      applied_at  TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """
+  )
+  db.commit()
+  return {row[0] for row in db.execute("SELECT version FROM schema_migrations")}
+
+def upgrade_db(target=None):
+  """
+  아직 적용하지 않은 마이그레이션을 version 순서로 하나씩(각각 한 트랜잭션) 적용한다.
+  반환: 이번에 적용한 파일 이름 목록
+  """
   db = get_db()
+  done = applied_migrations(db)
+  applied = []
+  for version, name, path in migration_files():
+    if version in done or (target is not None and version > target):
+      continue
+    with open(path, encoding='utf-8') as f:
+      sql = f.read()
+    try:
+      db.executescript(
+        "BEGIN;\n" + sql + "\n;"
+        f"INSERT INTO schema_migrations (version, name) VALUES ({version}, '{name}');\n"
+        "COMMIT;"
+      )
+    except sqlite3.Error:
+      if db.in_transaction:
+        db.rollback()
+      raise
+    applied.append(name)
+  return applied
 
-  with current_app.open_resource('schema.sql') as f:
-    db.executescript(f.read().decode('utf-8'))
+def init_db():
+  return upgrade_db()
 
 @click.command('init-db')
 def init_db_command():
   init_db()
   click.echo('Initialized the database.')
 
+@click.command('db-upgrade')
+@click.option('--to', 'target', type=int, default=None, help='이 version까지만 적용')
+def db_upgrade_command(target):
+  applied = upgrade_db(target)
+  for name in applied:
+    click.echo(f'applied {name}')
+  click.echo(f'{len(applied)} migration(s) applied.')
+
 sqlite3.register_converter(
   "timestampe", lambda v: datetime.fromisoformat(v.decode())
 )
 
 def init_app(app):
     app.teardown_appcontext(close_db)
-    app.cli.add_command(init_db_command)
\ No newline at end of file
+    if Config.SQL_PROFILE:
+      app.after_request(sql_profile.server_timing)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(db_upgrade_command)
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+SQLite 쓰기를 한 스레드(DB 파일마다 하나)에서 순서대로 처리한다. (Config.SQLITE_SPLIT_RW)
+
+요청 스레드마다 쓰면 동시에 몰릴 때 "database is locked"로 서로 부딪히므로,
+쓰기 함수(rent_bike, return_bike_*, prepare/plug_mission 등 db를 첫 인자로 받는 서비스 함수)를
+run_write(fn, ...)로 넘기면 writer 스레드가 받아서 실행하고 결과를 돌려준다.
+
+group commit: 큐에 쌓여 있는 작업을 한 번에 꺼내 BEGIN IMMEDIATE ... COMMIT 한 번으로 묶는다.
+작업마다 SAVEPOINT를 잡아 두고 서비스 함수에는 SavepointConnection을 넘기므로
+- db.commit()   -> 지금까지 한 일을 확정 (SAVEPOINT 해제 후 새로 잡음, 실제 COMMIT은 묶음 끝에 한 번)
+- db.rollback() -> 마지막 commit 이후 한 일만 되돌림
+- 함수가 commit하지 않고 끝나거나 예외가 나면 마지막 commit 이후 한 일은 되돌린다. (요청 끝 rollback과 같음)
+결과는 묶음이 실제로 COMMIT된 뒤에 돌려준다.
+
+on_commit(func)로 등록한 함수는 COMMIT 뒤에 func(path, hub_ids)로 불린다.
+hub_ids는 이번 커밋에서 hub_availability(migrations/0003)가 바뀐 허브 - writer 연결에만 건
+TEMP 트리거가 모아 둔다. (rollback된 작업의 허브는 같이 되돌려져서 들어가지 않음)
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from queue import Empty, Queue
+
+from flask import current_app, g, has_app_context
+
+from .config import Config
+from . import sql_profile
+
+logger = logging.getLogger(__name__)
+
+_writers = {}
+_writers_lock = threading.Lock()
+_listeners = []
+
+_CAPTURE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS changed_hubs (hub_id INTEGER PRIMARY KEY);
+CREATE TEMP TRIGGER IF NOT EXISTS trg_changed_hubs_insert AFTER INSERT ON main.hub_availability
+BEGIN INSERT OR IGNORE INTO changed_hubs VALUES (NEW.hub_id); END;
+CREATE TEMP TRIGGER IF NOT EXISTS trg_changed_hubs_update AFTER UPDATE ON main.hub_availability
+BEGIN INSERT OR IGNORE INTO changed_hubs VALUES (NEW.hub_id); END;
+CREATE TEMP TRIGGER IF NOT EXISTS trg_changed_hubs_delete AFTER DELETE ON main.hub_availability
+BEGIN INSERT OR IGNORE INTO changed_hubs VALUES (OLD.hub_id); END;
+"""
+
+
+def _install_capture(conn):
+  """
+  hub_availability가 아직 없으면(마이그레이션 전) False
+  """
+  try:
+    for statement in _CAPTURE_SQL.strip().split(";\n"):
+      conn.execute(statement)
+    return True
+  except sqlite3.OperationalError:
+    return False
+
+def _take_changed_hubs(conn):
+  hub_ids = [row[0] for row in conn.execute("SELECT hub_id FROM changed_hubs")]
+  if hub_ids:
+    conn.execute("DELETE FROM changed_hubs")
+  return hub_ids
+
+def on_commit(func):
+  """
+  func(path, hub_ids) - 쓰기가 커밋되고 바뀐 허브가 있을 때 (writer 스레드에서 호출되므로 가볍게)
+  """
+  _listeners.append(func)
+  return func
+
+def _notify(path, hub_ids):
+  if not hub_ids:
+    return
+  for func in _listeners:
+    try:
+      func(path, hub_ids)
+    except Exception:
+      logger.exception("on_commit listener failed")
+
+
+class SavepointConnection:
+  """
+  writer 연결을 감싸서 commit / rollback을 이 작업의 SAVEPOINT 단위로 바꾼다.
+  """
+
+  def __init__(self, conn, name):
+    self._conn = conn
+    self._name = name
+    self.dirty = False
+    conn.execute(f"SAVEPOINT {name}")
+
+  def execute(self, sql, parameters=()):
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+      self.dirty = True
+    return self._conn.execute(sql, parameters)
+
+  def executemany(self, sql, seq_of_parameters):
+    self.dirty = True
+    return self._conn.executemany(sql, seq_of_parameters)
+
+  def commit(self):
+    self._conn.execute(f"RELEASE {self._name}")
+    self._conn.execute(f"SAVEPOINT {self._name}")
+    self.dirty = False
+
+  def rollback(self):
+    self._conn.execute(f"ROLLBACK TO {self._name}")
+    self.dirty = False
+
+  def close(self, ok):
+    if self.dirty or not ok:
+      self._conn.execute(f"ROLLBACK TO {self._name}")
+    self._conn.execute(f"RELEASE {self._name}")
+
+  @property
+  def in_transaction(self):
+    return True
+
+  def __getattr__(self, name):
+    return getattr(self._conn, name)
+
+
+class _Job:
+  __slots__ = ("fn", "args", "kwargs", "future", "submitted", "profile")
+
+  def __init__(self, fn, args, kwargs):
+    self.fn = fn
+    self.args = args
+    self.kwargs = kwargs
+    self.future = Future()
+    self.submitted = time.perf_counter()
+    # 요청한 쪽의 SQL 합계 (SQL_PROFILE) - writer 스레드에서 실행한 시간도 그 요청의 Server-Timing에 들어가도록
+    self.profile = sql_profile.request_totals() if Config.SQL_PROFILE and has_app_context() else None
+
+
+class Writer:
+  """
+  DB 파일 하나에 대한 writer 스레드 + 작업 큐
+  """
+
+  def __init__(self, app, path):
+    from .db import _connect
+    self.app = app
+    self.path = path
+    self._queue = Queue()
+    self._conn = _connect(path, isolation_level=None)  # BEGIN / SAVEPOINT를 직접 관리
+    self._capture = _install_capture(self._conn)
+    self._stats_lock = threading.Lock()
+    self.jobs = 0
+    self.batches = 0
+    self.failed_commits = 0
+    self.max_batch = 0
+    self._wait_ms = deque(maxlen=512)
+    self._commit_ms = deque(maxlen=512)
+    self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+    self._thread.start()
+
+  def submit(self, fn, *args, **kwargs):
+    job = _Job(fn, args, kwargs)
+    self._queue.put(job)
+    return job.future
+
+  def _take_batch(self):
+    batch = [self._queue.get()]
+    deadline = time.perf_counter() + Config.SQLITE_WRITE_BATCH_WAIT_MS / 1000
+    while len(batch) < Config.SQLITE_WRITE_BATCH_MAX:
+      try:
+        remaining = deadline - time.perf_counter()
+        batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+      except Empty:
+        break
+    return batch
+
+  def _run(self):
+    while True:
+      batch = self._take_batch()
+      try:
+        with self.app.app_context():
+          self._apply(batch)
+      except Exception as e:
+        # SAVEPOINT 정리 등에서 난 예외로 스레드가 죽지 않도록
+        if self._conn.in_transaction:
+          self._conn.execute("ROLLBACK")
+        for job in batch:
+          if not job.future.done():
+            job.future.set_exception(e)
+
+  def _apply(self, batch):
+    conn = self._conn
+    started = time.perf_counter()
+    results = []
+    if not self._capture:
+      self._capture = _install_capture(conn)
+    try:
+      conn.execute("BEGIN IMMEDIATE")
+    except Exception as e:
+      for job in batch:
+        job.future.set_exception(e)
+      return
+
+    for i, job in enumerate(batch):
+      self._wait_ms.append((started - job.submitted) * 1000)
+      proxy = SavepointConnection(conn, f"job_{i}")
+      g.sql_profile = job.profile  # 요청 스레드는 future.result()에서 기다리는 중이라 같이 고치지 않음
+      try:
+        result = job.fn(proxy, *job.args, **job.kwargs)
+        proxy.close(ok=True)
+        results.append((job, result, None))
+      except Exception as e:
+        proxy.close(ok=False)
+        results.append((job, None, e))
+
+    g.pop("sql_profile", None)  # BEGIN / COMMIT은 여러 요청이 나눠 쓰므로 어느 요청에도 넣지 않음
+
+    hub_ids = _take_changed_hubs(conn) if self._capture else []
+    commit_started = time.perf_counter()
+    try:
+      conn.execute("COMMIT")
+    except Exception as e:
+      if conn.in_transaction:
+        conn.execute("ROLLBACK")
+      with self._stats_lock:
+        self.failed_commits += 1
+      for job in batch:
+        job.future.set_exception(e)
+      return
+
+    with self._stats_lock:
+      self.jobs += len(batch)
+      self.batches += 1
+      self.max_batch = max(self.max_batch, len(batch))
+      self._commit_ms.append((time.perf_counter() - commit_started) * 1000)
+    _notify(self.path, hub_ids)
+    for job, result, error in results:
+      if error is not None:
+        job.future.set_exception(error)
+      else:
+        job.future.set_result(result)
+
+  @staticmethod
+  def _pct(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+      return 0.0
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+  def stats(self):
+    with self._stats_lock:
+      return {
+        "queued": self._queue.qsize(),
+        "jobs": self.jobs,
+        "batches": self.batches,
+        "avg_batch": round(self.jobs / self.batches, 2) if self.batches else 0.0,
+        "max_batch": self.max_batch,
+        "failed_commits": self.failed_commits,
+        "wait_p50_ms": self._pct(self._wait_ms, 0.5),
+        "wait_p95_ms": self._pct(self._wait_ms, 0.95),
+        "commit_p95_ms": self._pct(self._commit_ms, 0.95),
+      }
+
+
+def get_writer():
+  path = current_app.config["DATABASE"]
+  with _writers_lock:
+    writer = _writers.get(path)
+    if writer is None:
+      writer = _writers[path] = Writer(current_app._get_current_object(), path)
+  return writer
+
+def run_write(fn, *args, **kwargs):
+  """
+  fn(db, *args, **kwargs)를 쓰기 트랜잭션 안에서 실행하고 결과를 돌려준다.
+  SQLITE_SPLIT_RW가 아니면 요청 스레드의 get_db()로 바로 실행한다.
+  """
+  if not Config.SQLITE_SPLIT_RW:
+    from .db import get_db
+    db = get_db()
+    capture = _install_capture(db)
+    result = fn(db, *args, **kwargs)
+    if capture and not db.in_transaction:  # commit하지 않고 끝났으면 요청 끝에 rollback됨
+      hub_ids = _take_changed_hubs(db)
+      db.commit()
+      _notify(current_app.config["DATABASE"], hub_ids)
+    return result
+  return get_writer().submit(fn, *args, **kwargs).result()
+
+def writer_stats():
+  with _writers_lock:
+    return {path: writer.stats() for path, writer in _writers.items()}
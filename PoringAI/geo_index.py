@@ -0,0 +1,175 @@
+"""
+허브 위치로 만든 격자(grid) 공간 인덱스. (Config.GEO_INDEX)
+
+find_nearest_hub가 요청마다 hubs 전체를 읽어 haversine을 도는 대신,
+위경도를 평면(m)으로 펴서 GEO_GRID_CELL_M 크기 칸에 나눠 두고 사용자 주변 칸부터 바깥으로 넓혀 가며 찾는다.
+- nearest(lat, lon, k): 가까운 k개 (거리는 haversine으로 다시 잰 값)
+- hubs 지문을 HUB_RESOLVER_CHECK_SEC마다 확인해서 바뀌었으면 다시 만든다.
+- 같은 프로세스에서 hubs를 바꾸면 invalidate()를 부른다. (seed-synthetic)
+
+반납 / mission plug의 거리 확인은 station.is_active를 봐야 하는 쓰기 경로라 여기를 거치지 않고 DB에서 한다.
+"""
+import hashlib
+import heapq
+import math
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+
+from .api.services.geo import haversine_m
+from .config import Config
+
+EARTH_R = 6371000  # meter (geo.haversine_m과 같은 값)
+
+GeoPoint = namedtuple("GeoPoint", "hub_id hub_name latitude longitude x y")
+GeoHit = namedtuple("GeoHit", "point distance")
+
+POINTS_SQL = "SELECT hub_id, hub_name, latitude, longitude FROM hubs"
+
+# (hub_id, 이름, 좌표) 전체 - 값을 바꿔도 합이 같은 경우까지 잡도록 내용을 해싱
+FINGERPRINT_SQL = '''
+  SELECT COALESCE(group_concat(hub_id || ':' || hub_name || ':' || latitude || ':' || longitude, '|'), '')
+  FROM (SELECT hub_id, hub_name, latitude, longitude FROM hubs ORDER BY hub_id)
+'''
+
+def _fingerprint(db):
+  return hashlib.sha256(db.execute(FINGERPRINT_SQL).fetchone()[0].encode("utf-8")).hexdigest()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class GeoGrid:
+
+  def __init__(self, rows, cell_m=None, fingerprint=None):
+    self.cell_m = cell_m or Config.GEO_GRID_CELL_M
+    self.fingerprint = fingerprint
+    self.built_at = time.monotonic()
+
+    rows = [row for row in rows if row["latitude"] is not None and row["longitude"] is not None]
+    # 평균 위도 기준 등장방형(equirectangular) 투영 - 캠퍼스 크기에서는 오차가 1% 미만
+    self.lat0 = math.radians(sum(row["latitude"] for row in rows) / len(rows)) if rows else 0.0
+    self._cells = {}   # (cx, cy) -> [GeoPoint]
+    self._points = []
+    self._bounds = None  # (min_cx, min_cy, max_cx, max_cy)
+
+    for row in rows:
+      x, y = self.project(row["latitude"], row["longitude"])
+      point = GeoPoint(row["hub_id"], row["hub_name"], row["latitude"], row["longitude"], x, y)
+      cx, cy = self._cell(x, y)
+      self._cells.setdefault((cx, cy), []).append(point)
+      self._points.append(point)
+      b = self._bounds
+      self._bounds = (cx, cy, cx, cy) if b is None else \
+        (min(b[0], cx), min(b[1], cy), max(b[2], cx), max(b[3], cy))
+
+  @classmethod
+  def from_db(cls, db):
+    return cls(db.execute(POINTS_SQL).fetchall(), fingerprint=_fingerprint(db))
+
+  def project(self, lat, lon):
+    return EARTH_R * math.radians(lon) * math.cos(self.lat0), EARTH_R * math.radians(lat)
+
+  def _cell(self, x, y):
+    return int(math.floor(x / self.cell_m)), int(math.floor(y / self.cell_m))
+
+  def _ring(self, cx, cy, r):
+    """
+    (cx, cy)에서 체비쇼프 거리 r인 칸들의 점
+    """
+    if r == 0:
+      yield from self._cells.get((cx, cy), ())
+      return
+    for dx in range(-r, r + 1):
+      for dy in (-r, r):
+        yield from self._cells.get((cx + dx, cy + dy), ())
+    for dy in range(-r + 1, r):
+      for dx in (-r, r):
+        yield from self._cells.get((cx + dx, cy + dy), ())
+
+  def _max_ring(self, cx, cy):
+    b = self._bounds
+    if b is None:
+      return -1
+    return max(abs(cx - b[0]), abs(cx - b[2]), abs(cy - b[1]), abs(cy - b[3]))
+
+  def nearest(self, lat, lon, k=1):
+    """
+    가까운 순 [GeoHit] (최대 k개)
+    반지름 r 칸까지 본 뒤에는 r * cell_m보다 가까운 점은 모두 찾은 것이므로, k번째 거리가 그 안이면 멈춘다.
+    """
+    x, y = self.project(lat, lon)
+    cx, cy = self._cell(x, y)
+    best = []  # (-거리, 순번, point) max-heap
+    seq = 0
+    exact = False
+    for r in range(self._max_ring(cx, cy) + 1):
+      # 점들에서 멀리 떨어진 곳이라 빈 칸만 돌게 되면 처음부터 전부 본다. (멀면 투영 오차가 커서 haversine으로)
+      if 8 * r <= len(self._cells):
+        ring = self._ring(cx, cy, r)
+      else:
+        ring, best, exact = self._points, [], True
+      for point in ring:
+        d = haversine_m(lat, lon, point.latitude, point.longitude) if exact else math.hypot(point.x - x, point.y - y)
+        seq += 1
+        if len(best) < k:
+          heapq.heappush(best, (-d, seq, point))
+        elif d < -best[0][0]:
+          heapq.heapreplace(best, (-d, seq, point))
+      if exact or (len(best) == k and -best[0][0] <= r * self.cell_m):
+        break
+    hits = [GeoHit(p, haversine_m(lat, lon, p.latitude, p.longitude)) for _, _, p in best]
+    return sorted(hits, key=lambda hit: hit.distance)
+
+  def stats(self):
+    return {
+      "points": len(self._points),
+      "cells": len(self._cells),
+      "cell_m": self.cell_m,
+      "age_sec": round(time.monotonic() - self.built_at, 1),
+    }
+
+
+def get_index(db):
+  """
+  DATABASE별 GeoGrid. HUB_RESOLVER_CHECK_SEC마다 지문을 확인해서 바뀌었으면 다시 만든다.
+  """
+  path = current_app.config["DATABASE"]
+  with _indexes_lock:
+    index = _indexes.get(path)
+    if index is None:
+      index = _indexes[path] = GeoGrid.from_db(db)
+    elif time.monotonic() - index.built_at >= Config.HUB_RESOLVER_CHECK_SEC:
+      if index.fingerprint != _fingerprint(db):
+        index = _indexes[path] = GeoGrid.from_db(db)
+      else:
+        index.built_at = time.monotonic()
+    return index
+
+def invalidate():
+  """
+  허브를 추가/수정한 뒤 호출하면 다음 조회 때 다시 만든다.
+  """
+  with _indexes_lock:
+    _indexes.clear()
+
+def nearest(db, lat, lon, k=1):
+  return get_index(db).nearest(float(lat), float(lon), k)
+
+def index_stats():
+  with _indexes_lock:
+    return {path: index.stats() for path, index in _indexes.items()}
+
+def init_app(app):
+  if not Config.GEO_INDEX:
+    return
+  from .db import get_read_db
+  with app.app_context():
+    try:
+      get_index(get_read_db())
+    except sqlite3.Error as e:
+      app.logger.warning("geo index를 만들지 못했습니다: %s", e)
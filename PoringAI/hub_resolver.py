@@ -0,0 +1,252 @@
+"""
+hubs 테이블 + 별칭(Config.HUB_ALIASES) + 지역(Config.HUB_REGIONS)으로 만든 허브 이름 해석기.
+
+LLM이 뽑은 허브 이름이나 사용자 발화를 정식 허브 이름으로 바꾼다.
+  1) 정확히 일치  2) 별칭  3) 지역 이름(-> 소속 허브들)  4) 앞부분 일치  5) 자모 단위 편집 거리
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+
+from .config import Config
+from .db import get_read_db
+
+# name: 정식 허브 이름 또는 지역 이름, hub_names: 해당하는 허브 목록 (지역이면 여러 개)
+# kind: exact|alias|region|prefix|fuzzy
+HubMatch = namedtuple("HubMatch", "name hub_names kind query distance")
+
+# "학생회관에서", "무은재 앞" 처럼 허브 이름 뒤에 붙는 조사/위치 표현
+_SUFFIXES = ("에서", "으로", "까지", "근처", "주변", "에", "로", "앞", "쪽", "의", "은", "는", "이", "가")
+
+_resolvers = {}          # DATABASE 경로 -> HubResolver
+_config_resolver = None  # 앱 컨텍스트가 없을 때 (HUB_DESCRIPTION 기준)
+_resolver_lock = threading.Lock()
+
+
+def _key(text):
+  return re.sub(r"\s+", "", (text or "")).lower()
+
+def decompose_jamo(text):
+  """
+  한글 음절을 초성/중성/종성 자모로 풀어 쓴다. ("허브" -> "ㅎㅓㅂㅡ" 에 해당하는 조합용 자모)
+  """
+  out = []
+  for ch in text:
+    code = ord(ch) - 0xAC00
+    if 0 <= code < 11172:
+      out.append(chr(0x1100 + code // 588))
+      out.append(chr(0x1161 + (code % 588) // 28))
+      if code % 28:
+        out.append(chr(0x11A7 + code % 28))
+    else:
+      out.append(ch)
+  return "".join(out)
+
+def edit_distance(a, b, limit=None):
+  """
+  Levenshtein 거리. limit를 넘으면 limit + 1을 돌려주고 일찍 끝낸다.
+  """
+  if abs(len(a) - len(b)) > (limit if limit is not None else len(a) + len(b)):
+    return (limit or 0) + 1
+  prev = list(range(len(b) + 1))
+  for i, ca in enumerate(a, 1):
+    cur = [i]
+    for j, cb in enumerate(b, 1):
+      cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+    if limit is not None and min(cur) > limit:
+      return limit + 1
+    prev = cur
+  return prev[-1]
+
+def description_hub_names():
+  """
+  HUB_DESCRIPTION의 "허브 이름에는 ..., ...가 있어" 부분에서 허브 이름 목록을 뽑는다. (DB가 없을 때 대체용)
+  """
+  m = re.search(r"허브 이름에는\s*(.+?)(?:가|이) 있어", Config.HUB_DESCRIPTION)
+  if not m:
+    return []
+  return [name.strip() for name in m.group(1).split(",") if name.strip()]
+
+def hubs_fingerprint(db):
+  """
+  hubs 테이블이 바뀌었는지 확인하기 위한 값 - (hub_id, hub_name) 전체의 sha256
+  (같은 길이 이름으로 바꾼 경우 "생활관3동" -> "생활관5동"도 잡히도록 내용을 해싱)
+  """
+  row = db.execute(
+    """
+    SELECT COALESCE(group_concat(hub_id || ':' || hub_name, '|'), '')
+    FROM (SELECT hub_id, hub_name FROM hubs ORDER BY hub_id)
+    """
+  ).fetchone()
+  return hashlib.sha256(row[0].encode("utf-8")).hexdigest()
+
+
+class HubResolver:
+
+  def __init__(self, hub_names, aliases=None, regions=None, fingerprint=None):
+    self.hub_names = list(hub_names)
+    self.fingerprint = fingerprint
+    self.built_at = time.monotonic()
+
+    self._hubs = {_key(name): name for name in self.hub_names}
+    self._regions = {}
+    for region, members in (regions or {}).items():
+      members = [name for name in members if _key(name) in self._hubs]
+      if members:
+        self._regions[_key(region)] = (region, members)
+
+    self._aliases = {}
+    for alias, target in (aliases or {}).items():
+      if _key(target) in self._hubs or _key(target) in self._regions:
+        self._aliases[_key(alias)] = _key(target)
+
+    # 부분 문자열 검색은 긴 이름부터 ("생활관21동"이 "생활관"보다 먼저)
+    self._surface = sorted(
+      list(self._hubs) + list(self._aliases) + list(self._regions),
+      key=len,
+      reverse=True,
+    )
+    self._jamo = {key: decompose_jamo(key) for key in self._surface}
+
+  @classmethod
+  def from_db(cls, db):
+    rows = db.execute("SELECT hub_name FROM hubs ORDER BY hub_id").fetchall()
+    return cls(
+      [row["hub_name"] for row in rows],
+      Config.HUB_ALIASES,
+      Config.HUB_REGIONS,
+      fingerprint=hubs_fingerprint(db),
+    )
+
+  @classmethod
+  def from_config(cls):
+    return cls(description_hub_names(), Config.HUB_ALIASES, Config.HUB_REGIONS)
+
+  def _match(self, key, kind, query, distance=0):
+    if key in self._aliases:
+      key = self._aliases[key]
+      kind = "alias" if kind == "exact" else kind
+    if key in self._hubs:
+      return HubMatch(self._hubs[key], (self._hubs[key],), kind, query, distance)
+    region, members = self._regions[key]
+    return HubMatch(region, tuple(members), "region" if kind in ("exact", "alias") else kind, query, distance)
+
+  def resolve(self, name):
+    """
+    허브/별칭/지역 이름 하나를 해석한다. 못 찾거나 애매하면 None
+    """
+    key = _key(name)
+    if not key:
+      return None
+
+    if key in self._hubs or key in self._aliases or key in self._regions:
+      return self._match(key, "exact", name)
+
+    # 앞부분 일치: "박태준" -> "박태준학술정보관", "학생회관앞" -> "학생회관"
+    if len(key) >= 2:
+      prefixed = [s for s in self._surface if s.startswith(key) or key.startswith(s)]
+      targets = {self._match(s, "prefix", name).hub_names for s in prefixed}
+      if len(targets) == 1:
+        return self._match(prefixed[0], "prefix", name)
+
+    return self._fuzzy(key, name)
+
+  def _fuzzy(self, key, query):
+    jamo = decompose_jamo(key)
+    limit = max(1, min(Config.HUB_FUZZY_MAX_DISTANCE, len(jamo) // 4))
+    best, best_dist, tie = None, limit + 1, False
+    for surface in self._surface:
+      dist = edit_distance(jamo, self._jamo[surface], limit)
+      if dist < best_dist:
+        best, best_dist, tie = surface, dist, False
+      elif dist == best_dist and best is not None and \
+          self._match(surface, "fuzzy", query).hub_names != self._match(best, "fuzzy", query).hub_names:
+        tie = True
+    if best is None or best_dist > limit or tie:
+      return None
+    return self._match(best, "fuzzy", query, best_dist)
+
+  def extract(self, text):
+    """
+    자유 발화에서 허브/지역 언급을 찾는다. 부분 문자열 -> 토큰별 resolve 순서
+    """
+    compact = _key(text)
+    for surface in self._surface:
+      if len(surface) >= 2 and surface in compact:
+        return self._match(surface, "exact", text)
+
+    for token in (text or "").split():
+      token = re.sub(r"[^\w&]", "", token)
+      for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+          token = token[:-len(suffix)]
+          break
+      if len(token) >= 3:
+        match = self.resolve(token)
+        if match:
+          return match
+    return None
+
+
+def get_resolver():
+  """
+  앱 컨텍스트(DATABASE 설정 포함)가 있으면 hubs 테이블 기준, 없으면 HUB_DESCRIPTION 기준 해석기를 돌려준다.
+  HUB_RESOLVER_CHECK_SEC마다 hubs 지문을 확인해서 바뀌었으면 다시 만든다. (DATABASE별로 따로 둠)
+  """
+  global _config_resolver
+  if not has_app_context() or "DATABASE" not in current_app.config:
+    if _config_resolver is None:
+      _config_resolver = HubResolver.from_config()
+    return _config_resolver
+
+  path = current_app.config["DATABASE"]
+  with _resolver_lock:
+    resolver = _resolvers.get(path)
+    now = time.monotonic()
+    stale = resolver is None or resolver.fingerprint is None or \
+      now - resolver.built_at >= Config.HUB_RESOLVER_CHECK_SEC
+    if stale:
+      try:
+        db = get_read_db()
+        if resolver is None or resolver.fingerprint != hubs_fingerprint(db):
+          resolver = _resolvers[path] = HubResolver.from_db(db)
+        else:
+          resolver.built_at = now
+      except sqlite3.Error:
+        if resolver is None:
+          resolver = _resolvers[path] = HubResolver.from_config()
+    return resolver
+
+def invalidate():
+  """
+  허브를 추가/수정한 뒤 호출하면 다음 조회 때 다시 만든다.
+  """
+  with _resolver_lock:
+    _resolvers.clear()
+
+def resolve(name):
+  return get_resolver().resolve(name)
+
+def extract(text):
+  return get_resolver().extract(text)
+
+def canonical_hub_name(name):
+  """
+  단일 허브로 해석되면 정식 이름, 아니면 입력 그대로
+  """
+  match = resolve(name)
+  if match and len(match.hub_names) == 1:
+    return match.hub_names[0]
+  return name
+
+def init_app(app):
+  with app.app_context():
+    try:
+      get_resolver()
+    except sqlite3.Error as e:
+      app.logger.warning("hub resolver를 만들지 못했습니다: %s", e)
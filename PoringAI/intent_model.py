@@ -0,0 +1,266 @@
+"""
+chat_log(user_question, inferred_intent)로 학습하는 문자 n-gram 의도 분류기.
+
+- 특징: 정규화된 발화의 문자 1~3-gram을 crc32로 DIM개 버킷에 해싱 -> TF-IDF -> L2 정규화
+- 모델: NumPy로 학습하는 다중 클래스 로지스틱 회귀 (희소 행으로 mini-batch 학습)
+- 산출물: instance/intent_model/ 아래 .npy(mmap으로 로드) + meta.json
+
+확신도가 INTENT_MODEL_THRESHOLD 이상이면 classify_intent.TurnIntents가 LLM 호출 없이 이 결과를 쓰고,
+낮으면 기존 LLM classifier로 넘긴다. (쓰기로 이어지는 라벨은 항상 LLM - classify_intent.LOCAL_LABELS)
+
+학습 데이터: menu1이 LLM으로 의도를 고른 턴마다 log_chat으로 chat_log에 남긴다. (Config.CHAT_LOG)
+
+inferred_intent 라벨 예시:
+  MISSION_PLUG, MISSION_CHECK, RETURN, RENT, get_available_bikes, get_available_nearby_bikes, CHAT
+"""
+import json
+import os
+import shutil
+import time
+import zlib
+from datetime import datetime
+
+import click
+import numpy as np
+from flask import current_app
+
+from .db import get_db
+
+DEFAULT_DIM = 4096
+NGRAM_RANGE = (1, 3)
+
+_model = None
+
+
+def _normalize(text):
+  from .classify_intent import _normalize_utterance
+  return _normalize_utterance(text)
+
+def _ngram_buckets(text, dim, ngram_range=NGRAM_RANGE):
+  """
+  문자 n-gram -> {버킷: 등장 횟수}
+  """
+  text = f" {_normalize(text)} "
+  counts = {}
+  lo, hi = ngram_range
+  for n in range(lo, hi + 1):
+    for i in range(len(text) - n + 1):
+      gram = text[i:i + n]
+      if gram.strip():
+        bucket = zlib.crc32(gram.encode("utf-8")) % dim
+        counts[bucket] = counts.get(bucket, 0) + 1
+  return counts
+
+def _features(text, idf, dim):
+  """
+  희소 TF-IDF 벡터를 (버킷 인덱스, 값) 배열로 돌려준다.
+  """
+  counts = _ngram_buckets(text, dim)
+  if not counts:
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+  idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+  tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+  values = tf * idf[idx]
+  norm = np.linalg.norm(values)
+  if norm > 0:
+    values = values / norm
+  return idx, values.astype(np.float32)
+
+def _gather(rows, batch):
+  """
+  batch 번째 희소 행들을 (버킷 인덱스, 값, batch 안의 행 번호)로 이어 붙인다.
+  """
+  lengths = [len(rows[i][0]) for i in batch]
+  cols = np.concatenate([rows[i][0] for i in batch]) if len(batch) else np.zeros(0, dtype=np.int64)
+  vals = np.concatenate([rows[i][1] for i in batch]) if len(batch) else np.zeros(0, dtype=np.float32)
+  return cols, vals, np.repeat(np.arange(len(batch)), lengths)
+
+def _sparse_scores(w, b, cols, vals, row_ids, n_rows):
+  scores = np.tile(b, (n_rows, 1))
+  np.add.at(scores, row_ids, vals[:, None] * w[cols])
+  return scores
+
+def _softmax(z):
+  z = z - z.max(axis=-1, keepdims=True)
+  e = np.exp(z)
+  return e / e.sum(axis=-1, keepdims=True)
+
+
+class IntentModel:
+
+  def __init__(self, labels, weights, bias, idf, meta=None):
+    self.labels = list(labels)
+    self.weights = weights   # (dim, n_labels)
+    self.bias = bias         # (n_labels,)
+    self.idf = idf           # (dim,)
+    self.dim = int(weights.shape[0])
+    self.meta = meta or {}
+
+  @classmethod
+  def train(cls, texts, labels, dim=DEFAULT_DIM, epochs=300, lr=4.0, l2=1e-4, batch_size=256, seed=0):
+    """
+    (idx, values) 희소 행 그대로 mini-batch로 학습한다. (len(texts) x dim 밀집 행렬을 만들지 않음)
+    """
+    label_names = sorted(set(labels))
+    if len(label_names) < 2:
+      raise ValueError("학습하려면 라벨이 2종류 이상 필요합니다.")
+    y = np.array([label_names.index(label) for label in labels])
+
+    # 문서 빈도 -> IDF
+    bucket_counts = [_ngram_buckets(text, dim) for text in texts]
+    df = np.zeros(dim, dtype=np.float32)
+    for counts in bucket_counts:
+      df[list(counts.keys())] += 1
+    idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+    rows = [_features(text, idf, dim) for text in texts]
+    onehot = np.eye(len(label_names), dtype=np.float32)[y]
+    w = np.zeros((dim, len(label_names)), dtype=np.float32)
+    b = np.zeros(len(label_names), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+      order = rng.permutation(len(texts))
+      for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        cols, vals, row_ids = _gather(rows, batch)
+        grad = (_softmax(_sparse_scores(w, b, cols, vals, row_ids, len(batch))) - onehot[batch]) / len(batch)
+        w_grad = l2 * w
+        np.add.at(w_grad, cols, vals[:, None] * grad[row_ids])
+        w -= lr * w_grad
+        b -= lr * grad.sum(axis=0)
+
+    cols, vals, row_ids = _gather(rows, np.arange(len(texts)))
+    scores = _sparse_scores(w, b, cols, vals, row_ids, len(texts))
+    accuracy = float((np.argmax(scores, axis=1) == y).mean())
+    meta = {
+      "labels": label_names,
+      "dim": dim,
+      "ngram_range": list(NGRAM_RANGE),
+      "n_samples": len(texts),
+      "train_accuracy": accuracy,
+      "trained_at": datetime.now().isoformat(),
+    }
+    return cls(label_names, w, b, idf, meta)
+
+  def predict(self, text):
+    """
+    (라벨, 확률) - 입력이 비어 있으면 (None, 0.0)
+    """
+    idx, values = _features(text, self.idf, self.dim)
+    if len(idx) == 0:
+      return None, 0.0
+    scores = values @ self.weights[idx] + self.bias
+    probs = _softmax(np.asarray(scores, dtype=np.float32))
+    best = int(np.argmax(probs))
+    return self.labels[best], float(probs[best])
+
+  def save(self, path):
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "weights.npy"), np.ascontiguousarray(self.weights, dtype=np.float32))
+    np.save(os.path.join(tmp, "bias.npy"), np.asarray(self.bias, dtype=np.float32))
+    np.save(os.path.join(tmp, "idf.npy"), np.asarray(self.idf, dtype=np.float32))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+      json.dump(self.meta, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+
+  @classmethod
+  def load(cls, path):
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+      meta = json.load(f)
+    return cls(
+      meta["labels"],
+      np.load(os.path.join(path, "weights.npy"), mmap_mode="r"),
+      np.load(os.path.join(path, "bias.npy")),
+      np.load(os.path.join(path, "idf.npy"), mmap_mode="r"),
+      meta,
+    )
+
+
+def log_chat(db, user_id, question, answer, intent, function_called=False):
+  """
+  menu1 한 턴을 chat_log에 남긴다. (run_write로 호출)
+  """
+  db.execute(
+    """
+    INSERT INTO chat_log (user_id, user_question, gpt_answer, inferred_intent, function_called)
+    VALUES (?, ?, ?, ?, ?)
+    """,
+    (user_id, question, answer or "", intent, int(bool(function_called))),
+  )
+  db.commit()
+
+
+def load_model(path):
+  global _model
+  _model = IntentModel.load(path) if os.path.exists(os.path.join(path, "meta.json")) else None
+  return _model
+
+def get_model():
+  return _model
+
+def predict(text):
+  """
+  로드된 모델이 없으면 None, 있으면 (라벨, 확률)
+  """
+  if _model is None:
+    return None
+  return _model.predict(text)
+
+
+@click.command("train-intents")
+@click.option("--dim", default=DEFAULT_DIM, show_default=True, help="n-gram 해시 버킷 수")
+@click.option("--epochs", default=300, show_default=True)
+@click.option("--batch-size", default=256, show_default=True, help="mini-batch 크기")
+@click.option("--min-count", default=2, show_default=True, help="이보다 적게 나온 라벨은 제외")
+def train_intents_command(dim, epochs, batch_size, min_count):
+  """chat_log로 n-gram 의도 분류 모델을 학습한다."""
+  rows = get_db().execute(
+    """
+    SELECT user_question, inferred_intent
+    FROM chat_log
+    WHERE inferred_intent IS NOT NULL
+      AND inferred_intent != ''
+    """
+  ).fetchall()
+
+  counts = {}
+  for row in rows:
+    counts[row["inferred_intent"]] = counts.get(row["inferred_intent"], 0) + 1
+  rows = [row for row in rows if counts[row["inferred_intent"]] >= min_count]
+
+  if not rows:
+    click.echo("학습할 chat_log가 없습니다.")
+    return
+
+  started = time.perf_counter()
+  try:
+    model = IntentModel.train(
+      [row["user_question"] for row in rows],
+      [row["inferred_intent"] for row in rows],
+      dim=dim,
+      epochs=epochs,
+      batch_size=batch_size,
+    )
+  except ValueError as e:
+    click.echo(str(e))
+    return
+
+  path = current_app.config["INTENT_MODEL_PATH"]
+  model.save(path)
+  load_model(path)
+  click.echo(
+    f"Trained intent model: {len(rows)} samples, labels={model.labels}, "
+    f"train_accuracy={model.meta['train_accuracy']:.2%}, {time.perf_counter() - started:.1f}s -> {path}"
+  )
+
+
+def init_app(app):
+  app.cli.add_command(train_intents_command)
+  try:
+    load_model(app.config["INTENT_MODEL_PATH"])
+  except (OSError, ValueError, KeyError) as e:
+    app.logger.warning("intent model을 불러오지 못했습니다: %s", e)
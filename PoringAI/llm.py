@@ -0,0 +1,435 @@
+"""
+앱 전역에서 하나만 쓰는 LLM 클라이언트.
+
+create_app에서 init_app(app)으로 만들고, 모델을 부르는 모듈은 get_client()로 꺼내 쓴다.
+- openai: httpx 연결 풀(keep-alive) + 타임아웃을 맞춘 OpenAI 클라이언트 하나를 재사용
+- stub: llm_stub.StubClient (네트워크 없이 로컬 응답, OPENAI_MOCK=1 이거나 LLM_BACKEND="stub")
+어느 쪽이든 LLM_MAX_CONCURRENCY개 이상 동시에 호출하지 않도록 세마포어로 감싼다.
+LLM_SINGLEFLIGHT이면 인자가 완전히 같은 호출이 동시에 들어올 때 한 번만 보내고 결과를 나눠 쓴다.
+
+호출마다 call_site(이름)별로 토큰 / 지연을 기록하고, turn_usage() 안의 호출은 한 턴으로 합산한다. (usage_stats())
+"""
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from flask import current_app, has_app_context
+
+from .config import Config
+from .prompt import count_tokens, messages_tokens
+
+_client = None
+
+# 지금 호출하는 곳의 이름 / 진행 중인 턴 (스레드 풀로 넘길 때는 contextvars.copy_context()로 같이 넘긴다)
+_call_site = contextvars.ContextVar("llm_call_site", default="unlabeled")
+_turn = contextvars.ContextVar("llm_turn", default=None)
+
+
+def request_key(kwargs):
+  """
+  chat.completions.create 인자의 정렬된 JSON sha256. JSON으로 못 바꾸는 인자가 있으면 None
+  """
+  try:
+    canonical = json.dumps(kwargs, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+  except (TypeError, ValueError):
+    return None
+  return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Call:
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+    self.waiters = 0
+
+
+class SingleFlight:
+  """
+  같은 key로 동시에 들어온 호출은 먼저 온 하나(leader)만 실행하고, 나머지는 그 결과(또는 예외)를 받는다.
+  끝난 결과는 보관하지 않으므로 다음 호출은 다시 실행된다. (캐시가 아님)
+  do()는 (결과, 다른 호출의 결과를 받았는지)를 돌려준다.
+  """
+
+  def __init__(self):
+    self._calls = {}
+    self._lock = threading.Lock()
+    self.leaders = 0
+    self.collapsed = 0
+    self.max_waiters = 0
+
+  def do(self, key, func):
+    with self._lock:
+      call = self._calls.get(key)
+      leader = call is None
+      if leader:
+        call = _Call()
+        self._calls[key] = call
+        self.leaders += 1
+      else:
+        call.waiters += 1
+        self.collapsed += 1
+        self.max_waiters = max(self.max_waiters, call.waiters)
+
+    if not leader:
+      call.done.wait()
+      if call.error is not None:
+        raise call.error
+      return call.result, True
+
+    try:
+      call.result = func()
+      return call.result, False
+    except BaseException as e:
+      call.error = e
+      raise
+    finally:
+      with self._lock:
+        self._calls.pop(key, None)
+      call.done.set()
+
+  def stats(self):
+    with self._lock:
+      in_flight = len(self._calls)
+    total = self.leaders + self.collapsed
+    return {
+      "leaders": self.leaders,
+      "collapsed": self.collapsed,
+      "in_flight": in_flight,
+      "max_waiters": self.max_waiters,
+      "collapsed_ratio": (self.collapsed / total) if total else 0.0,
+    }
+
+
+class _SlotStream:
+  """
+  stream 응답을 감싸서 다 읽거나 close() / GC될 때 BoundedClient 자리를 한 번만 돌려준다.
+  (generator의 finally는 한 번도 next()를 부르지 않으면 돌지 않아서 자리가 새는 것을 막음)
+  """
+
+  def __init__(self, stream, release):
+    self._stream = stream
+    self._release = release
+    self._lock = threading.Lock()
+
+  def __iter__(self):
+    try:
+      for chunk in self._stream:
+        yield chunk
+    finally:
+      self.close()
+
+  def close(self):
+    with self._lock:
+      release, self._release = self._release, None
+    if release is None:
+      return
+    try:
+      close = getattr(self._stream, "close", None)
+      if close is not None:
+        close()
+    finally:
+      release()
+
+  def __del__(self):
+    self.close()
+
+
+class BoundedClient:
+  """
+  client.chat.completions.create를 동시에 max_concurrency개까지만 실행한다.
+  stream=True면 스트림을 다 읽거나 닫을 때까지 자리를 잡고 있는다.
+  singleflight가 있으면 stream이 아닌 같은 호출은 한 번만 보낸다. (기다리는 쪽은 자리를 차지하지 않음)
+  """
+
+  def __init__(self, client, max_concurrency, singleflight=None):
+    self.client = client
+    self.backend = getattr(client, "backend", None)
+    self.singleflight = singleflight
+    self._slots = threading.BoundedSemaphore(max_concurrency)
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **kwargs):
+    site = _call_site.get()
+    started = time.perf_counter()
+    try:
+      if kwargs.get("stream"):
+        return self._measure_stream(self._create(kwargs), kwargs, site, started)
+      shared = False
+      key = request_key(kwargs) if self.singleflight is not None else None
+      if key is not None:
+        response, shared = self.singleflight.do(key, lambda: self._create(kwargs))
+      else:
+        response = self._create(kwargs)
+    except Exception:
+      record_usage(site, kwargs, None, started, error=True)
+      raise
+    record_usage(site, kwargs, response, started, shared=shared)
+    return response
+
+  def _measure_stream(self, stream, kwargs, site, started):
+    """
+    스트림은 usage가 없으므로 다 받은 뒤 내용으로 토큰 수를 추정해 기록한다.
+    """
+    parts = []
+    error = False
+    try:
+      for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+          parts.append(delta)
+        yield chunk
+    except Exception:
+      error = True
+      raise
+    finally:
+      record_usage(site, kwargs, None, started, error=error, completion_text="".join(parts))
+
+  def _create(self, kwargs):
+    self._slots.acquire()
+    try:
+      response = self.client.chat.completions.create(**kwargs)
+    except BaseException:
+      self._slots.release()
+      raise
+    if kwargs.get("stream"):
+      return _SlotStream(response, self._slots.release)
+    self._slots.release()
+    return response
+
+  def __getattr__(self, name):
+    return getattr(self.client, name)
+
+
+class UsageStats:
+  """
+  call site별 호출 수 / 토큰 / 지연(ms)과 턴 단위 합계. 백분위는 최근 window개 기준
+  """
+
+  def __init__(self, window=512):
+    self.window = window
+    self._sites = {}
+    self._turns = {"count": 0, "tokens": deque(maxlen=window), "calls": deque(maxlen=window), "ms": deque(maxlen=window)}
+    self._lock = threading.Lock()
+
+  def record(self, site, prompt_tokens, completion_tokens, elapsed_ms, error=False, shared=False):
+    with self._lock:
+      item = self._sites.get(site)
+      if item is None:
+        item = {"calls": 0, "errors": 0, "collapsed": 0, "prompt_tokens": 0, "completion_tokens": 0, "recent": deque(maxlen=self.window)}
+        self._sites[site] = item
+      item["calls"] += 1
+      item["errors"] += 1 if error else 0
+      item["collapsed"] += 1 if shared else 0
+      item["prompt_tokens"] += prompt_tokens
+      item["completion_tokens"] += completion_tokens
+      item["recent"].append(elapsed_ms)
+
+  def record_turn(self, turn, elapsed_ms):
+    with self._lock:
+      self._turns["count"] += 1
+      self._turns["tokens"].append(turn.prompt_tokens + turn.completion_tokens)
+      self._turns["calls"].append(turn.calls)
+      self._turns["ms"].append(elapsed_ms)
+
+  def reset(self):
+    with self._lock:
+      self._sites.clear()
+      self._turns["count"] = 0
+      for key in ("tokens", "calls", "ms"):
+        self._turns[key].clear()
+
+  @staticmethod
+  def _pct(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+      return 0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+  def stats(self):
+    with self._lock:
+      sites = {}
+      for site, item in self._sites.items():
+        sent = item["calls"] - item["collapsed"]
+        sites[site] = {
+          "calls": item["calls"],
+          "errors": item["errors"],
+          "collapsed": item["collapsed"],
+          "prompt_tokens": item["prompt_tokens"],
+          "completion_tokens": item["completion_tokens"],
+          "avg_prompt_tokens": round(item["prompt_tokens"] / sent, 1) if sent else 0.0,
+          "p50_ms": round(self._pct(item["recent"], 0.5), 2),
+          "p95_ms": round(self._pct(item["recent"], 0.95), 2),
+        }
+      turns = self._turns
+      return {
+        "sites": sites,
+        "turns": {
+          "count": turns["count"],
+          "avg_tokens": round(sum(turns["tokens"]) / len(turns["tokens"]), 1) if turns["tokens"] else 0.0,
+          "p95_tokens": self._pct(turns["tokens"], 0.95),
+          "max_calls": max(turns["calls"], default=0),
+          "p50_ms": round(self._pct(turns["ms"], 0.5), 2),
+          "p95_ms": round(self._pct(turns["ms"], 0.95), 2),
+        },
+      }
+
+
+class TurnUsage:
+  """
+  turn_usage() 안에서 일어난 LLM 호출 합계 (speculative 스레드에서도 더하므로 lock)
+  """
+
+  def __init__(self):
+    self.calls = 0
+    self.prompt_tokens = 0
+    self.completion_tokens = 0
+    self.llm_ms = 0.0
+    self._lock = threading.Lock()
+
+  def add(self, prompt_tokens, completion_tokens, elapsed_ms):
+    with self._lock:
+      self.calls += 1
+      self.prompt_tokens += prompt_tokens
+      self.completion_tokens += completion_tokens
+      self.llm_ms += elapsed_ms
+
+  def as_dict(self):
+    return {
+      "calls": self.calls,
+      "prompt_tokens": self.prompt_tokens,
+      "completion_tokens": self.completion_tokens,
+      "llm_ms": round(self.llm_ms, 2),
+    }
+
+
+usage = UsageStats()
+
+@contextmanager
+def call_site(name):
+  """
+  with llm.call_site("classify.rent"): ... 또는 @llm.call_site("...")로 호출하는 곳 이름을 붙인다.
+  """
+  token = _call_site.set(name)
+  try:
+    yield
+  finally:
+    _call_site.reset(token)
+
+@contextmanager
+def turn_usage():
+  """
+  한 턴(menu1 POST) 동안의 LLM 호출을 합산해서 usage의 턴 통계에 넣는다.
+  """
+  turn = TurnUsage()
+  token = _turn.set(turn)
+  started = time.perf_counter()
+  try:
+    yield turn
+  finally:
+    _turn.reset(token)
+    usage.record_turn(turn, (time.perf_counter() - started) * 1000)
+
+def record_usage(site, kwargs, response, started, error=False, shared=False, completion_text=None):
+  """
+  응답의 usage(없으면 로컬 추정)로 토큰을 기록한다. singleflight로 받은 결과는 토큰을 다시 세지 않는다.
+  """
+  elapsed_ms = (time.perf_counter() - started) * 1000
+  prompt_tokens = completion_tokens = 0
+  if not shared and not error:
+    resp_usage = getattr(response, "usage", None)
+    if resp_usage is not None:
+      prompt_tokens = getattr(resp_usage, "prompt_tokens", 0) or 0
+      completion_tokens = getattr(resp_usage, "completion_tokens", 0) or 0
+    else:
+      prompt_tokens = messages_tokens(kwargs.get("messages"))
+      completion_tokens = count_tokens(completion_text)
+  usage.record(site, prompt_tokens, completion_tokens, elapsed_ms, error=error, shared=shared)
+  turn = _turn.get()
+  if turn is not None:
+    turn.add(prompt_tokens, completion_tokens, elapsed_ms)
+
+def usage_stats():
+  return usage.stats()
+
+
+def _backend():
+  if os.environ.get("OPENAI_MOCK", "0") == "1":
+    return "stub"
+  return Config.LLM_BACKEND
+
+def build_client(backend=None):
+  """
+  backend에 맞는 클라이언트를 만든다. OpenAI 클라이언트를 만들 수 없으면(API 키 없음 등) None
+  """
+  backend = backend or _backend()
+  if backend == "stub":
+    from .llm_stub import StubClient, latency_profile
+    client = StubClient(
+      latency=latency_profile(Config.LLM_STUB_LATENCY_PROFILE or Config.LLM_STUB_LATENCY_MS),
+      error_rate=Config.LLM_STUB_ERROR_RATE,
+    )
+  else:
+    try:
+      import httpx
+      from openai import OpenAI
+      http_client = httpx.Client(
+        limits=httpx.Limits(
+          max_connections=Config.LLM_MAX_CONNECTIONS,
+          max_keepalive_connections=Config.LLM_MAX_KEEPALIVE,
+          keepalive_expiry=Config.LLM_KEEPALIVE_SEC,
+        ),
+        timeout=httpx.Timeout(Config.LLM_TIMEOUT_SEC, connect=Config.LLM_CONNECT_TIMEOUT_SEC),
+      )
+      client = OpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        base_url=Config.LLM_BASE_URL,
+        http_client=http_client,
+        max_retries=Config.LLM_MAX_RETRIES,
+      )
+    except Exception:
+      return None
+  client.backend = backend
+  singleflight = SingleFlight() if Config.LLM_SINGLEFLIGHT else None
+  return BoundedClient(client, Config.LLM_MAX_CONCURRENCY, singleflight)
+
+def get_client():
+  """
+  앱에 등록된 클라이언트 (앱 컨텍스트 밖이면 마지막으로 만든 것)
+  """
+  if has_app_context():
+    return current_app.extensions.get("llm_client", _client)
+  return _client
+
+def set_client(client):
+  """
+  테스트/벤치마크에서 다른 백엔드로 바꿔 끼울 때
+  """
+  global _client
+  _client = client
+  if has_app_context():
+    current_app.extensions["llm_client"] = client
+
+def llm_stats():
+  """
+  현재 클라이언트의 singleflight 지표 (합쳐진 호출 수 등)
+  """
+  client = get_client()
+  singleflight = getattr(client, "singleflight", None)
+  return {
+    "backend": getattr(client, "backend", None),
+    "singleflight": singleflight.stats() if singleflight is not None else None,
+  }
+
+def init_app(app):
+  global _client
+  _client = build_client()
+  app.extensions["llm_client"] = _client
+  if _client is None:
+    app.logger.warning("LLM 클라이언트를 만들지 못했습니다. (OPENAI_API_KEY 확인)")
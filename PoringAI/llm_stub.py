@@ -0,0 +1,297 @@
+"""
+OpenAI chat.completions와 같은 모양으로 응답하는 로컬 대체 클라이언트.
+네트워크 없이 classify_intent / menu1 / generate-sentence 경로를 돌려보거나 벤치마크할 때 쓴다.
+
+system 프롬프트 패턴으로 어떤 classifier의 호출인지 고르고(SCRIPTS),
+사용자 발화는 간단한 키워드 규칙으로 판단한다.
+지연은 latency_profile("lognormal:300,0.5") 같은 분포로, 실패는 error_rate로 흉내 낸다.
+같은 응답을 HTTP로 내보내는 서버는 llm_stub_server.
+"""
+import json
+import math
+import random
+import re
+import time
+import uuid
+from types import SimpleNamespace
+
+from . import hub_resolver
+
+
+def estimate_tokens(text):
+  """
+  토크나이저 없이 대략적인 토큰 수를 센다. (영문 4글자 ~ 1토큰, 한글 1.5글자 ~ 1토큰)
+  """
+  text = text or ""
+  ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+  other_chars = len(text) - ascii_chars
+  return max(1, round(ascii_chars / 4 + other_chars / 1.5))
+
+def latency_profile(spec):
+  """
+  지연 분포 문자열 -> 호출마다 기다릴 시간(초)을 돌려주는 함수 (단위는 ms)
+    "300" 또는 "fixed:300"        항상 300ms
+    "uniform:100,500"             100~500ms 균등
+    "normal:300,50"               평균 300ms, 표준편차 50ms (음수는 0)
+    "lognormal:300,0.5"           중앙값 300ms, sigma 0.5 (꼬리가 긴 실제 API와 비슷)
+  """
+  if spec is None or spec == "":
+    return lambda: 0.0
+  if isinstance(spec, (int, float)):
+    return lambda: spec / 1000
+  kind, _, params = str(spec).partition(":")
+  if not params:
+    kind, params = "fixed", kind
+  values = [float(v) for v in params.split(",")]
+  if kind == "fixed":
+    return lambda: values[0] / 1000
+  if kind == "uniform":
+    return lambda: random.uniform(values[0], values[1]) / 1000
+  if kind == "normal":
+    return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+  if kind == "lognormal":
+    return lambda: random.lognormvariate(math.log(values[0]), values[1]) / 1000
+  raise ValueError(f"알 수 없는 지연 분포: {spec}")
+
+
+class StubError(Exception):
+  """
+  error_rate로 일부러 낸 실패 (status_code: 429 또는 500)
+  """
+
+  def __init__(self, status_code):
+    self.status_code = status_code
+    kind = "rate_limit_error" if status_code == 429 else "server_error"
+    super().__init__(f"[STUB] injected {kind} ({status_code})")
+    self.kind = kind
+
+def injected_error(error_rate):
+  """
+  error_rate 확률로 StubError를 돌려준다. (429와 500을 반씩)
+  """
+  if error_rate and random.random() < error_rate:
+    return StubError(random.choice((429, 500)))
+  return None
+
+
+def _find_hub(text):
+  match = hub_resolver.extract(text)
+  return match.name if match else None
+
+def _has(text, *words):
+  return any(w in text for w in words)
+
+
+# ---- 발화 규칙 ----
+
+def _mission_type(text):
+  if "미션" not in text and "저배터리" not in text:
+    return "NONE"
+  if _has(text, "꽂", "넣었", "완료", "끝냈", "했어"):
+    return "MISSION_PLUG"
+  if _has(text, "뭐", "있어", "확인", "알려", "진행"):
+    return "MISSION_CHECK"
+  return "NONE"
+
+def _return_intent(text):
+  is_return = _has(text, "반납", "다 탔", "다탔", "돌려")
+  return_type = "UNKNOWN"
+  if _has(text, "임시", "바깥", "정식아님", "정식 아님", "잠깐", "존", "zone"):
+    return_type = "ZONE"
+  elif _has(text, "정식", "거치대", "스테이션", "station"):
+    return_type = "STATION"
+  return {"is_return": is_return, "return_type": return_type, "hub_name": _find_hub(text) if is_return else None}
+
+def _rent_intent(text):
+  is_rent = _has(text, "빌리", "빌릴", "대여", "렌트", "탈래", "타고 싶", "타고싶") and not _has(text, "반납")
+  return {"is_rent": is_rent, "hub_name": _find_hub(text) if is_rent else None}
+
+def _tool_intent(text):
+  if not _has(text, "자전거", "대수", "몇 대", "몇대", "허브"):
+    return None, {}
+  if _has(text, "내 ", "내근처", "나 ", "지금", "현재", "여기", "near me", "around me"):
+    return "get_available_nearby_bikes", {}
+  hub = _find_hub(text)
+  if hub:
+    return "get_available_bikes", {"hub_name": hub}
+  return None, {}
+
+def _yes_no(text):
+  # classify_yes_no_local(YES_WORDS / NO_WORDS)과 따로 둔 규칙 - 벤치마크의 llm 전략이 로컬 사전을 자기 자신과 비교하지 않도록
+  text = text.strip().lower()
+  if _has(text, "아니", "아뇨", "싫", "취소", "안 ", "안할", "안 할", "말래", "말게", "ㄴㄴ", "no", "다음에", "괜찮아요"):
+    return "NO"
+  if _has(text, "네", "넵", "예", "응", "좋", "그래", "ㅇㅋ", "ㅇㅇ", "오케이", "ok", "yes", "콜", "진행", "할게", "할래", "해줘", "빌릴"):
+    return "YES"
+  return "UNKNOWN"
+
+
+# ---- system 프롬프트 패턴별 응답 ----
+
+def _reply_yes_no(text, kwargs):
+  return {"content": _yes_no(text)}
+
+def _reply_mission(text, kwargs):
+  return {"content": json.dumps({"type": _mission_type(text)})}
+
+def _reply_return(text, kwargs):
+  return {"content": json.dumps(_return_intent(text), ensure_ascii=False)}
+
+def _reply_rent(text, kwargs):
+  return {"content": json.dumps(_rent_intent(text), ensure_ascii=False)}
+
+def _reply_turn(text, kwargs):
+  ret = _return_intent(text)
+  rent = _rent_intent(text)
+  tool, args = _tool_intent(text)
+  return {"content": json.dumps({
+    "mission": _mission_type(text),
+    "is_return": ret["is_return"],
+    "return_type": ret["return_type"],
+    "is_rent": rent["is_rent"],
+    "tool": tool or "NONE",
+    "hub_name": ret["hub_name"] or rent["hub_name"] or args.get("hub_name"),
+  }, ensure_ascii=False)}
+
+def _reply_sentence(text, kwargs):
+  return {"content": "[STUB] 요청하신 결과를 확인했어요."}
+
+def _reply_chat(text, kwargs):
+  if kwargs.get("tools"):
+    tool, args = _tool_intent(text)
+    if tool:
+      return {"tool_calls": [(tool, args)]}
+  return {"content": "[STUB] 무엇을 도와드릴까요?"}
+
+# (system 프롬프트 정규식, 응답 함수) - 위에서부터 먼저 맞는 것을 사용
+SCRIPTS = [
+  (re.compile(r"응답 의도를 판단"), _reply_yes_no),
+  (re.compile(r"의도를 한 번에 판단"), _reply_turn),
+  (re.compile(r"미션 관련 의도"), _reply_mission),
+  (re.compile(r"반납 의도"), _reply_return),
+  (re.compile(r"대여 의도"), _reply_rent),
+  (re.compile(r"API 응답|Poring-AI"), _reply_sentence),
+]
+
+def scripted_reply(kwargs):
+  """
+  chat.completions.create 인자를 보고 {"content"} 또는 {"tool_calls"}를 돌려준다.
+  classifier 프롬프트는 항상 첫 번째 system 메시지이므로 그것만 패턴과 비교한다.
+  """
+  messages = kwargs.get("messages") or []
+  user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+  if kwargs.get("tools") or not messages or messages[0].get("role") != "system":
+    return _reply_chat(user, kwargs)
+
+  system = messages[0].get("content") or ""
+  for pattern, reply in SCRIPTS:
+    if pattern.search(system):
+      return reply(user, kwargs)
+  return _reply_chat(user, kwargs)
+
+
+def _build_response(kwargs, reply):
+  prompt_tokens = sum(estimate_tokens(m.get("content")) for m in kwargs.get("messages") or [])
+  if kwargs.get("tools"):
+    prompt_tokens += estimate_tokens(json.dumps(kwargs["tools"], ensure_ascii=False))
+
+  tool_calls = None
+  if reply.get("tool_calls"):
+    tool_calls = [
+      SimpleNamespace(
+        id=f"call_{uuid.uuid4().hex[:12]}",
+        type="function",
+        function=SimpleNamespace(name=name, arguments=json.dumps(args, ensure_ascii=False)),
+      )
+      for name, args in reply["tool_calls"]
+    ]
+  content = reply.get("content")
+  completion_tokens = estimate_tokens(content) if content else 8 * len(tool_calls or [])
+
+  message = SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+  return SimpleNamespace(
+    id=f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+    model=kwargs.get("model"),
+    choices=[SimpleNamespace(index=0, message=message, finish_reason="tool_calls" if tool_calls else "stop")],
+    usage=SimpleNamespace(
+      prompt_tokens=prompt_tokens,
+      completion_tokens=completion_tokens,
+      total_tokens=prompt_tokens + completion_tokens,
+    ),
+  )
+
+
+def response_to_dict(response):
+  """
+  _build_response 결과를 chat.completions JSON 모양으로 바꾼다.
+  """
+  message = response.choices[0].message
+  tool_calls = None
+  if message.tool_calls:
+    tool_calls = [
+      {"id": tc.id, "type": tc.type, "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+      for tc in message.tool_calls
+    ]
+  return {
+    "id": response.id,
+    "object": "chat.completion",
+    "created": int(time.time()),
+    "model": response.model,
+    "choices": [{
+      "index": 0,
+      "message": {"role": "assistant", "content": message.content, "tool_calls": tool_calls},
+      "finish_reason": response.choices[0].finish_reason,
+    }],
+    "usage": vars(response.usage),
+  }
+
+def chunk_to_dict(chunk):
+  choice = chunk.choices[0]
+  delta = {k: v for k, v in vars(choice.delta).items() if v is not None}
+  return {
+    "id": chunk.id,
+    "object": "chat.completion.chunk",
+    "created": int(time.time()),
+    "model": chunk.model,
+    "choices": [{"index": 0, "delta": delta, "finish_reason": choice.finish_reason}],
+  }
+
+
+def _stream_chunks(response, size=4):
+  """
+  stream=True 응답처럼 content를 size 글자씩 delta로 나눠 보낸다.
+  """
+  content = response.choices[0].message.content or ""
+  for i in range(0, len(content), size):
+    delta = SimpleNamespace(role="assistant" if i == 0 else None, content=content[i:i + size])
+    yield SimpleNamespace(id=response.id, model=response.model, choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+  yield SimpleNamespace(
+    id=response.id,
+    model=response.model,
+    choices=[SimpleNamespace(index=0, delta=SimpleNamespace(role=None, content=None), finish_reason="stop")],
+  )
+
+
+class StubClient:
+  """
+  client.chat.completions.create(...)를 흉내 내는 로컬 클라이언트
+  - latency: 호출마다 기다릴 시간(초) 또는 시간을 돌려주는 함수 (latency_profile 참고)
+  - error_rate: 이 확률로 StubError(429/500)를 낸다
+  """
+
+  def __init__(self, latency=0.0, error_rate=0.0):
+    self.latency = latency
+    self.error_rate = error_rate
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **kwargs):
+    delay = self.latency() if callable(self.latency) else self.latency
+    if delay:
+      time.sleep(delay)
+    error = injected_error(self.error_rate)
+    if error is not None:
+      raise error
+    response = _build_response(kwargs, scripted_reply(kwargs))
+    if kwargs.get("stream"):
+      return _stream_chunks(response)
+    return response
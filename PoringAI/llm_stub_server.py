@@ -0,0 +1,93 @@
+"""
+llm_stub의 응답을 OpenAI 호환 HTTP(POST /v1/chat/completions)로 내보내는 로컬 서버.
+실제 OpenAI 클라이언트(httpx 연결 풀, 재시도, 타임아웃까지)를 그대로 둔 채 네트워크 없이 부하 테스트할 때 쓴다.
+
+  python -m PoringAI.llm_stub_server --port 8010 --latency lognormal:300,0.5 --error-rate 0.02
+
+앱 쪽은 OPENAI_BASE_URL=http://127.0.0.1:8010/v1 OPENAI_API_KEY=stub (또는 Config.LLM_BASE_URL)로 붙는다.
+- tools가 있으면 tool_calls, classifier 프롬프트면 JSON 문자열을 돌려준다. (llm_stub.SCRIPTS)
+- stream=true면 SSE chunk + [DONE]
+- error_rate 확률로 429 / 500을 OpenAI 에러 형식으로 돌려준다.
+"""
+import argparse
+import json
+import threading
+import time
+
+from flask import Flask, Response, jsonify, request
+
+from .llm_stub import _build_response, _stream_chunks, chunk_to_dict, injected_error, latency_profile, response_to_dict, scripted_reply
+
+
+def create_stub_app(latency=None, error_rate=0.0, database=None):
+  """
+  latency: latency_profile 문자열(ms) 또는 초를 돌려주는 함수
+  database: 허브 이름을 읽을 SQLite 경로 (없으면 Config.HUB_DESCRIPTION 기준)
+  """
+  app = Flask(__name__)
+  if database:
+    app.config["DATABASE"] = database
+    from . import db
+    app.teardown_appcontext(db.close_db)
+  delay = latency if callable(latency) else latency_profile(latency)
+  stats = {"requests": 0, "errors": 0, "streams": 0}
+  lock = threading.Lock()
+
+  def count(key):
+    with lock:
+      stats[key] += 1
+
+  @app.post("/v1/chat/completions")
+  def chat_completions():
+    count("requests")
+    kwargs = request.get_json(silent=True) or {}
+    if not isinstance(kwargs.get("messages"), list):
+      return jsonify({"error": {"message": "messages is required", "type": "invalid_request_error"}}), 400
+
+    seconds = delay()
+    if seconds:
+      time.sleep(seconds)
+
+    error = injected_error(error_rate)
+    if error is not None:
+      count("errors")
+      return jsonify({"error": {"message": str(error), "type": error.kind}}), error.status_code
+
+    response = _build_response(kwargs, scripted_reply(kwargs))
+    if not kwargs.get("stream"):
+      return jsonify(response_to_dict(response))
+
+    count("streams")
+    def generate():
+      for chunk in _stream_chunks(response):
+        yield f"data: {json.dumps(chunk_to_dict(chunk), ensure_ascii=False)}\n\n"
+      yield "data: [DONE]\n\n"
+    return Response(generate(), mimetype="text/event-stream")
+
+  @app.get("/v1/models")
+  def models():
+    return jsonify({"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "stub"}]})
+
+  @app.get("/stats")
+  def stub_stats():
+    with lock:
+      return jsonify(dict(stats))
+
+  return app
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 stub 서버")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8010)
+  parser.add_argument("--latency", default=None, help='지연 분포 (예: "300", "uniform:100,500", "lognormal:300,0.5")')
+  parser.add_argument("--error-rate", type=float, default=0.0, help="429/500을 낼 확률 (0~1)")
+  parser.add_argument("--database", default=None, help="허브 이름을 읽을 SQLite 경로 (예: instance/flask.db)")
+  args = parser.parse_args(argv)
+
+  app = create_stub_app(args.latency, args.error_rate, args.database)
+  app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+  main()
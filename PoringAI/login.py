@@ -1,6 +1,6 @@
 # login.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from .db import get_db
+from .db import get_read_db
 
 bp = Blueprint('login', __name__, url_prefix='/login')
 
@@ -12,7 +12,7 @@ def login():
         if not user_id:
             flash("user_id를 입력해주세요.")
         else:
-            db = get_db()
+            db = get_read_db()
 
             # users_id인지 user_id인지 확인해서 맞춰줘
             row = db.execute(
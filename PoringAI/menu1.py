@@ -1,7 +1,7 @@
-from flask import Blueprint, render_template, request, url_for, session, redirect
-from collections import deque
-import time
-import os, json, requests
+from flask import Blueprint, Response, current_app, jsonify, render_template, request, url_for, session, redirect, stream_with_context
+from types import GeneratorType
+import time, uuid
+import os, json, sqlite3
 from .api import (
     fetch_available_bikes, 
     fetch_available_nearby_bikes, 
@@ -15,12 +15,16 @@ from .api import (
 )
 from datetime import datetime
 from .classify_intent import (
-  classify_return_intent,
   classify_yes_no,
-  classify_rent_intent,
-  classify_mission_intent,
+  TOOL_NAMES,
+  TurnIntents,
 )
 from .config import Config
+from .cache import LRUCache
+from . import intent_model, llm
+from .db_writer import run_write
+from .api.services.sentence import sentence_status
+from .prompt import build_messages
 
 # 캐시 세팅
 HIST_KEY = Config.HIST_KEY
@@ -34,18 +38,12 @@ RETURN_CTX_KEY = Config.RETURN_CTX_KEY
 HUB_DESCRIPTION = Config.HUB_DESCRIPTION
 WAITING_MISSION_CONFIRM = Config.WAITING_MISSION_CONFIRM
 PENDING_MISSION = Config.PENDING_MISSION
+PENDING_STREAM = Config.PENDING_STREAM
 
 bp = Blueprint('menu1', __name__, url_prefix='/menu1')
 
-USE_MOCK = os.environ.get("OPENAI_MOCK", "0") == "1"
-
-client = None
-if not USE_MOCK:
-  try:
-    from openai import OpenAI
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-  except Exception:
-    client = None
+# stream_id -> 스트리밍이 끝난 답 (commit 전까지 보관)
+pending_streams = LRUCache(maxsize=1024, ttl=600)
 
 # OpenAI tools 정의
 tools = [
@@ -98,394 +96,475 @@ def hm(ts):
     except Exception:
         return ''
 
-@bp.route('/', methods=["GET", "POST"])
-def menu1():
+def _log_chat(intents, question, answer):
+  """
+  LLM이 의도를 고른 턴만 chat_log에 남긴다. (intent_model이 고른 턴은 자기 예측을 다시 학습하지 않도록 뺌)
+  """
+  if not Config.CHAT_LOG or intents.label is None or intents.local_label is not None:
+    return
+  try:
+    run_write(
+      intent_model.log_chat, session.get("user_id"), question, answer, intents.label, intents.label in TOOL_NAMES
+    )
+  except sqlite3.Error as e:
+    current_app.logger.warning("chat_log를 남기지 못했습니다: %s", e)
+
+def _process_turn(question, latitude, longitude, stream=False):
+  """
+  menu1 POST 한 턴을 처리한다.
+  반환: True(처리 후 history에 기록됨), False(처리할 내용 없음),
+        stream=True이고 일반 대화 응답이면 SSE 이벤트를 내보내는 generator
+  """
   answer = None
-  question = None
   structured = None
+  client = llm.get_client()
 
-  if request.method == "POST":
-    question = (request.form.get("question") or "").strip()
-    latitude = request.form.get("latitude")
-    longitude = request.form.get("longitude")
-
-    if session.get(WAITING_MISSION_CONFIRM):
-      intent = classify_yes_no(question, client)
+  if session.get(WAITING_MISSION_CONFIRM):
+    intent = classify_yes_no(question, client)
 
-      mission = session.get(PENDING_MISSION)
+    mission = session.get(PENDING_MISSION)
 
-      if intent == "YES" and mission:
-        res, status = fetch_mission_prepare(mission)
+    if intent == "YES" and mission:
+      res, status = fetch_mission_prepare(mission)
 
-        if status >= 400 or not res.get("success"):
-          answer = res.get('error') or "미션을 등록하지 못했어요. 잠시 후 다시 시도해 주세요."
-        elif res.get("created") is False:
-          answer = "이미 진행 중인 미션이 있어요. 기존 미션을 완료해 주세요!"
+      if status >= 400 or not res.get("success"):
+        answer = res.get('error') or "미션을 등록하지 못했어요. 잠시 후 다시 시도해 주세요."
+      elif res.get("created") is False:
+        answer = "이미 진행 중인 미션이 있어요. 기존 미션을 완료해 주세요!"
+      else:
+        answer = (
+          "미션을 수락했어요!\n"
+          "해당 자전거를 Station에 꽂으면 자동으로 보상이 지급돼요 🚲"
+        )
+
+    else:
+      answer = "미션을 진행하지 않을게요. 필요하면 다음에 다시 제안할게요!"
+
+    session.pop(WAITING_MISSION_CONFIRM, None)
+    session.pop(PENDING_MISSION, None)
+    session.modified = True
+
+    _append("user", question)
+    _append("system", answer)
+    return True
+
+  if session.get(WAITING_RENT_CONFORM):
+    intent = classify_yes_no(question, client)
+    if intent == 'YES':
+        rec, _ = fetch_rent_recommand(session.get('last_nearby_hub_name'))
+
+        if not rec or rec.get("success") is False:
+          answer = (rec.get("error") if isinstance(rec, dict) else None) or \
+                   "추천 정보를 가져오지 못했어요. 잠시 후 다시 시도해주세요."
         else:
-          answer = (
-            "미션을 수락했어요!\n"
-            "해당 자전거를 Station에 꽂으면 자동으로 보상이 지급돼요 🚲"
-          )
+          bike_id = rec.get("rent_bike_id", [])
+          if not bike_id:
+            answer = rec.get('error') or (
+              "지금 이 허브에는 바로 대여할 수 있는 자전거가 없어요.\n"
+              "조금 뒤 다시 시도하거나 다른 허브를 이용해 주세요."
+            )
 
-      else:
-        answer = "미션을 진행하지 않을게요. 필요하면 다음에 다시 제안할게요!"
+          else:
+            structured = fetch_rent_bike_normal(bike_id)[0]
+            answer = structured.get('content') or structured.get('error') or "대여 처리 결과를 확인할 수 없어요."
+
+            # 3) 미션 안내 + 세션 저장
+            mission = rec.get("mission") or {}
+            if mission and mission.get("enabled"):
+              session[PENDING_MISSION] = mission
+              session[WAITING_MISSION_CONFIRM] = True
+              session.modified = True
 
-      session.pop(WAITING_MISSION_CONFIRM, None)
-      session.pop(PENDING_MISSION, None)
-      session.modified = True
+              answer += (
+                f"\n\n💡 추가 미션 제안!\n"
+                f"존에 있는 저배터리 자전거({mission['low_battery_bike_id']})를\n"
+                f"Station({mission['target_station_id']})에 꽂으면 "
+                f"{mission['incentive']['amount']}P 적립!\n"
+                f"미션을 수락할까요? (네 / 아니요)"
+              )
 
-      _append("user", question)
-      _append("system", answer)
-      return redirect(url_for("menu1.menu1"))
+        # 상태 종료
+        session.pop(WAITING_RENT_CONFORM, None)
+        session.modified = True
 
-    if session.get(WAITING_RENT_CONFORM):
-      intent = classify_yes_no(question, client)
-      if intent == 'YES':
-          rec, _ = fetch_rent_recommand(session.get('last_nearby_hub_name'))
+        _append("user", question)
+        _append("system", answer, sentence_id=(structured or {}).get("sentence_id"))
+        return True
 
-          if not rec or rec.get("success") is False:
-            answer = (rec.get("error") if isinstance(rec, dict) else None) or \
-                     "추천 정보를 가져오지 못했어요. 잠시 후 다시 시도해주세요."
-          else:
-            bike_id = rec.get("rent_bike_id", [])
-            if not bike_id:
-              answer = rec.get('error') or (
-                "지금 이 허브에는 바로 대여할 수 있는 자전거가 없어요.\n"
-                "조금 뒤 다시 시도하거나 다른 허브를 이용해 주세요."
-              )
+    elif intent == 'NO':
+        answer = "알겠습니다. 필요하시면 다시 말씀해주세요."
 
-            else:
-              structured = fetch_rent_bike_normal(bike_id)[0]
-              answer = structured.get('content') or structured.get('error') or "대여 처리 결과를 확인할 수 없어요."
-
-              # 3) 미션 안내 + 세션 저장
-              mission = rec.get("mission") or {}
-              if mission and mission.get("enabled"):
-                session[PENDING_MISSION] = mission
-                session[WAITING_MISSION_CONFIRM] = True
-                session.modified = True
-
-                answer += (
-                  f"\n\n💡 추가 미션 제안!\n"
-                  f"존에 있는 저배터리 자전거({mission['low_battery_bike_id']})를\n"
-                  f"Station({mission['target_station_id']})에 꽂으면 "
-                  f"{mission['incentive']['amount']}P 적립!\n"
-                  f"미션을 수락할까요? (네 / 아니요)"
-                )
+        session.pop(WAITING_RENT_CONFORM, None)
+        session.modified = True
 
-          # 상태 종료
-          session.pop(WAITING_RENT_CONFORM, None)
-          session.modified = True
+        _append("user", question)
+        _append("system", answer)
+        return True
+
+    else:
+      print('둘 중 아무것도 아닙니다')
+      session.pop(WAITING_RENT_CONFORM, None)
+      session.modified = True
 
+  if question:
+    if client is None:
+      # LLM 클라이언트가 없을 때: 허브 이름 고정 예시
+      structured = {"hub_name": "정문 앞", "found": True, "available_bikes": 5}
+      answer = f"[MOCK] '{structured['hub_name']}' 허브 이용가능 대수: {structured['available_bikes']}대"
+      return False
+    else:
+      intents = None
+      try:
+        # INTENT_MODE가 잘못돼 있으면 여기서 ValueError -> 아래 except에서 [ERROR] 답변으로
+        intents = TurnIntents(question, client)
+        # 미션수행 의도 확인
+        mission_intent = intents.mission()
+        if mission_intent.get("type") == "MISSION_CHECK":
           _append("user", question)
-          _append("system", answer)
-          return redirect(url_for("menu1.menu1"))
 
-      elif intent == 'NO':
-          answer = "알겠습니다. 필요하시면 다시 말씀해주세요."
+          res, status = fetch_active_mission()
+          if status >= 400 or not res.get("success"):
+            answer = res.get("error") or "미션 정보를 가져오지 못했어요."
+            _append("system", answer)
+            return True
 
-          session.pop(WAITING_RENT_CONFORM, None)
-          session.modified = True
+          mission = res.get("mission")
+          if not mission:
+            answer = "현재 진행 중인 미션이 없어요."
+            _append("system", answer)
+            return True
 
-          _append("user", question)
+          answer = (
+            "📌 진행 중인 미션이 있어요!\n"
+            f"- 저배터리 자전거: {mission['low_battery_bike_id']}\n"
+            f"- 목표 스테이션: {mission['target_station_id']}\n"
+            f"- 보상: {mission['reward']}P\n\n"
+            "자전거를 목표 스테이션에 꽂은 뒤 “미션 완료했어”라고 말해주세요!"
+          )
           _append("system", answer)
-          return redirect(url_for("menu1.menu1"))
+          return True
 
-      else:
-        print('둘 중 아무것도 아닙니다')
-        session.pop(WAITING_RENT_CONFORM, None)
-        session.modified = True
+        if mission_intent.get("type") == "MISSION_PLUG":
+          _append("user", question)
 
-    if question:
-      if USE_MOCK or client is None:
-        # MOCK 모드: 허브 이름 고정 예시
-        structured = {"hub_name": "정문 앞", "found": True, "available_bikes": 5}
-        answer = f"[MOCK] '{structured['hub_name']}' 허브 이용가능 대수: {structured['available_bikes']}대"
-      else:
-        try:
-          # 미션수행 의도 확인
-          mission_intent = classify_mission_intent(question, client)
-          if mission_intent.get("type") == "MISSION_CHECK":
-            _append("user", question)
-
-            res, status = fetch_active_mission()
-            if status >= 400 or not res.get("success"):
-              answer = res.get("error") or "미션 정보를 가져오지 못했어요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          res, _ = fetch_active_mission()
+          mission = res.get("mission")
 
-            mission = res.get("mission")
-            if not mission:
-              answer = "현재 진행 중인 미션이 없어요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          if not mission:
+            answer = "진행 중인 미션이 없어요."
+            _append("system", answer)
+            return True
 
-            answer = (
-              "📌 진행 중인 미션이 있어요!\n"
-              f"- 저배터리 자전거: {mission['low_battery_bike_id']}\n"
-              f"- 목표 스테이션: {mission['target_station_id']}\n"
-              f"- 보상: {mission['reward']}P\n\n"
-              "자전거를 목표 스테이션에 꽂은 뒤 “미션 완료했어”라고 말해주세요!"
-            )
+          if not latitude or not longitude:
+            answer = "미션 수행을 확인하려면 현재 위치 정보가 필요해요."
             _append("system", answer)
-            return redirect(url_for("menu1.menu1"))
-  
-          if mission_intent.get("type") == "MISSION_PLUG":
-            _append("user", question)
+            return True
 
-            res, _ = fetch_active_mission()
-            mission = res.get("mission")
+          res, _ = fetch_mission_plug(
+            bike_id=mission["low_battery_bike_id"],
+            station_id=mission["target_station_id"],
+            latitude=latitude,
+            longitude=longitude
+          )
 
-            if not mission:
-              answer = "진행 중인 미션이 없어요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          if res.get("success"):
+            answer = f"🎉 미션 완료! {res['reward']}P가 적립됐어요!"
+            session.pop("ACTIVE_MISSION", None)
+          else:
+            if not res.get("success"):
+              if res.get("error") == "NO_ACTIVE_MISSION":
+                answer = "현재 수행 중인 미션이 없어요."
+              elif res.get("error") == "WRONG_STATION":
+                answer = "지정된 스테이션이 아니에요."
+              else:
+                answer = res.get('error') or '오류가 발생했습니다.'
 
-            if not latitude or not longitude:
-              answer = "미션 수행을 확인하려면 현재 위치 정보가 필요해요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          _append("system", answer)
+          return True
 
-            res, _ = fetch_mission_plug(
-              bike_id=mission["low_battery_bike_id"],
-              station_id=mission["target_station_id"],
-              latitude=latitude,
-              longitude=longitude
-            )
+        # 반납의도 확인
+        ret = intents.ret()
 
-            if res.get("success"):
-              answer = f"🎉 미션 완료! {res['reward']}P가 적립됐어요!"
-              session.pop("ACTIVE_MISSION", None)
-            else:
-              if not res.get("success"):
-                if res.get("error") == "NO_ACTIVE_MISSION":
-                  answer = "현재 수행 중인 미션이 없어요."
-                elif res.get("error") == "WRONG_STATION":
-                  answer = "지정된 스테이션이 아니에요."
-                else:
-                  answer = res.get('error') or '오류가 발생했습니다.'
+        if ret.get("is_return"):
+          rtype = ret.get("return_type", "UNKNOWN")
+          hub_name = ret.get("hub_name")
+          _append("user", question)
 
+          if not latitude or not longitude:
+            answer = "반납하려면 현재 위치 정보가 필요해요."
             _append("system", answer)
-            return redirect(url_for("menu1.menu1"))
+            return True
 
-          # 반납의도 확인
-          ret = classify_return_intent(question, client)
+          # 허브를 지정한 경우
+          if hub_name:
+            check = fetch_available_bikes(hub_name, latitude, longitude)[0]
+            dist = check.get("distance")
 
-          if ret.get("is_return"):
-            rtype = ret.get("return_type", "UNKNOWN")
-            hub_name = ret.get("hub_name")
-            _append("user", question)
+            if dist is None:
+              answer = "반납 위치를 확인할 수 없어요."
+              _append("system", answer)
+              return True
 
-            if not latitude or not longitude:
-              answer = "반납하려면 현재 위치 정보가 필요해요."
+            if dist > RETURN_DISTANCE:
+              answer = (
+                f"'{hub_name}' 허브까지 거리가 약 {dist}m예요.\n"
+                "허브 근처로 이동한 뒤 다시 반납해주세요."
+              )
               _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+              return True
 
-            # 허브를 지정한 경우
-            if hub_name:
-              check = fetch_available_bikes(hub_name, latitude, longitude)[0]
-              dist = check.get("distance")
+          # 허브가 없으면 위치 기반 탐색
+          else:
+            nearby = fetch_available_nearby_bikes(latitude, longitude)[0]
+            dist = nearby.get("distance")
+            hub_name = nearby.get("hub_name")
 
-              if dist is None:
-                answer = "반납 위치를 확인할 수 없어요."
-                _append("system", answer)
-                return redirect(url_for("menu1.menu1"))
+            if dist is None or dist > RETURN_DISTANCE or not hub_name:
+              answer = "근처에 반납 가능한 허브가 없어요."
+              _append("system", answer)
+              return True
+
+          # Zone / Station 선택 안 했으면 질문
+          if rtype == "UNKNOWN":
+            session[WAITING_RETURN_TYPE] = True
+            session[RETURN_CTX_KEY] = {
+              "hub_name": hub_name,
+              "lat": latitude,
+              "lon": longitude
+            }
+            session.modified = True
 
-              if dist > RETURN_DISTANCE:
-                answer = (
-                  f"'{hub_name}' 허브까지 거리가 약 {dist}m예요.\n"
-                  "허브 근처로 이동한 뒤 다시 반납해주세요."
-                )
-                _append("system", answer)
-                return redirect(url_for("menu1.menu1"))
+            answer = (
+              f"'{hub_name}' 허브로 반납할 수 있어요.\n"
+              "Zone으로 반납할까요, Station으로 반납할까요?"
+            )
+            _append("system", answer)
+            return True
+
+          # Zone 반납
+          if rtype == "ZONE":
+            structured = fetch_bike_return_zone(
+              hub_name=hub_name,
+              lat=latitude,
+              lon=longitude
+            )[0]
+            answer = structured.get("content") or structured.get("error")
+            _append("system", answer, sentence_id=structured.get("sentence_id"))
+            return True
+
+          # Station 반납 (TODO)
+          if rtype == "STATION":
+            print('STATION - 196line')
+            structured, _ = fetch_bike_return_station(
+              hub_name=hub_name,
+              lat=latitude,
+              lon=longitude
+            )
+            answer = structured.get("content") or structured.get("error") or "Station 반납 처리 결과를 확인할 수 없어요."
+            _append("system", answer, sentence_id=structured.get("sentence_id"))
+            return True
+          
+        # 대여의도 확인
+        rent = intents.rent()
+        if rent.get("is_rent"):
+          _append("user", question)
 
-            # 허브가 없으면 위치 기반 탐색
-            else:
-              nearby = fetch_available_nearby_bikes(latitude, longitude)[0]
-              dist = nearby.get("distance")
-              hub_name = nearby.get("hub_name")
+          hub_name = rent.get("hub_name")
 
-              if dist is None or dist > RETURN_DISTANCE or not hub_name:
-                answer = "근처에 반납 가능한 허브가 없어요."
+          # 허브 이름이 명시된 경우
+          if hub_name:
+            structured = fetch_available_bikes(hub_name, latitude, longitude)[0]
+
+          # 허브 이름이 없으면 -> nearby
+          else:
+              if not latitude or not longitude:
+                answer = "현재 위치 정보가 필요해요. 위치 권한을 켜고 다시 말해주세요."
                 _append("system", answer)
-                return redirect(url_for("menu1.menu1"))
-
-            # Zone / Station 선택 안 했으면 질문
-            if rtype == "UNKNOWN":
-              session[WAITING_RETURN_TYPE] = True
-              session[RETURN_CTX_KEY] = {
-                "hub_name": hub_name,
-                "lat": latitude,
-                "lon": longitude
-              }
-              session.modified = True
+                return True
 
-              answer = (
-                f"'{hub_name}' 허브로 반납할 수 있어요.\n"
-                "Zone으로 반납할까요, Station으로 반납할까요?"
-              )
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
-
-            # Zone 반납
-            if rtype == "ZONE":
-              structured = fetch_bike_return_zone(
-                hub_name=hub_name,
-                lat=latitude,
-                lon=longitude
-              )[0]
-              answer = structured.get("content") or structured.get("error")
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
-
-            # Station 반납 (TODO)
-            if rtype == "STATION":
-              print('STATION - 196line')
-              structured, _ = fetch_bike_return_station(
-                hub_name=hub_name,
-                lat=latitude,
-                lon=longitude
-              )
-              answer = structured.get("content") or structured.get("error") or "Station 반납 처리 결과를 확인할 수 없어요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
-            
-          # 대여의도 확인
-          rent = classify_rent_intent(question, client)
-          if rent.get("is_rent"):
-            _append("user", question)
+              structured = fetch_available_nearby_bikes(latitude, longitude)[0]
 
-            hub_name = rent.get("hub_name")
+          if structured.get("error"):
+            answer = structured.get("error") or "자전거 정보를 가져오지 못했어요."
+            _append("system", answer)
+            return True
 
-            # 허브 이름이 명시된 경우
-            if hub_name:
-              structured = fetch_available_bikes(hub_name, latitude, longitude)[0]
+          # nearby인 경우만 거리 체크
+          distance = structured.get("distance")
+          if not hub_name and (distance is None or distance > RECOMMAND_DISTANCE):
+            answer = structured.get("content") or "근처에 바로 대여할 수 있는 허브가 없어요."
+            answer += "\n조금 더 가까운 곳으로 이동한 뒤 다시 말해주세요."
+            _append("system", answer)
+            return True
 
-            # 허브 이름이 없으면 -> nearby
+          # 지역 이름이면 한 허브를 골라야 대여할 수 있으므로 확인 상태로 가지 않음
+          if structured.get("is_region"):
+            hubs = [h for h in structured.get("hubs") or [] if h.get("available_bikes")]
+            if hubs:
+              answer = (
+                f"{structured.get('hub_name')}에서 대여 가능한 허브예요.\n"
+                + "\n".join(f"- {h['hub_name']}: {h['available_bikes']}대" for h in hubs)
+                + "\n어느 허브에서 빌릴지 허브 이름과 함께 다시 말해주세요."
+              )
             else:
-                if not latitude or not longitude:
-                  answer = "현재 위치 정보가 필요해요. 위치 권한을 켜고 다시 말해주세요."
-                  _append("system", answer)
-                  return redirect(url_for("menu1.menu1"))
+              answer = f"{structured.get('hub_name')}에는 지금 대여 가능한 자전거가 없어요."
+            _append("system", answer)
+            return True
 
-                structured = fetch_available_nearby_bikes(latitude, longitude)[0]
+          # 대여 확인
+          answer = structured.get("content") or "대여 가능한 자전거를 찾았어요."
+          answer += "\n대여하시겠습니까? (네 / 아니요)"
 
-            if structured.get("error"):
-              answer = structured.get("error") or "자전거 정보를 가져오지 못했어요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          session["last_nearby_hub_name"] = structured.get("hub_name")
+          session[WAITING_RENT_CONFORM] = True
+          session.modified = True
 
-            # nearby인 경우만 거리 체크
-            distance = structured.get("distance")
-            if not hub_name and (distance is None or distance > RECOMMAND_DISTANCE):
-              answer = structured.get("content") or "근처에 바로 대여할 수 있는 허브가 없어요."
-              answer += "\n조금 더 가까운 곳으로 이동한 뒤 다시 말해주세요."
-              _append("system", answer)
-              return redirect(url_for("menu1.menu1"))
+          _append("system", answer)
+          return True
 
-            # 대여 확인
-            answer = structured.get("content") or "대여 가능한 자전거를 찾았어요."
-            answer += "\n대여하시겠습니까? (네 / 아니요)"
+        # 토큰 예산 안에서 최근 대화만 (tools는 매번 같은 내용으로 앞에 붙음)
+        messages_for_model, prompt_info = build_messages(_get_history(), question, tools=tools)
+        current_app.logger.debug('prompt : %s', prompt_info)
 
-            session["last_nearby_hub_name"] = structured.get("hub_name")
-            session[WAITING_RENT_CONFORM] = True
-            session.modified = True
+        resp = None
+        tool_called, name, args = False, None, {}
+        tool_intent = intents.tool()
 
-            _append("system", answer)
-            return redirect(url_for("menu1.menu1"))
+        if tool_intent is not None:
+          # 통합 라우터가 tool 의도까지 판단했으므로 tool 호출 유도 단계는 건너뜀
+          if tool_intent["name"]:
+            tool_called = True
+            name = tool_intent["name"]
+            args = {"hub_name": tool_intent["hub_name"]} if tool_intent["hub_name"] else {}
+            current_app.logger.debug('function : %s', name)
 
-          hist = _get_history()
-          messages_for_model = hist + [{"role" : "user", "content":question}]
-          
+        else:
           # GPT에게 질문 보내고 tool 호출 유도
-          resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages_for_model,
-            tools=tools,
-            tool_choice="auto"
-          )
+          with llm.call_site("menu1.tool"):
+            resp = client.chat.completions.create(
+              model="gpt-4o-mini",
+              messages=messages_for_model,
+              tools=tools,
+              tool_choice="auto"
+            )
 
           # tool call 추출
-          tool_call = None
           tool_calls = resp.choices[0].message.tool_calls
           if tool_calls:
-            tool_call = tool_calls[0]
-
-          if tool_call:
+            tool_called = True
             try:
-              name = tool_call.function.name
-              args = json.loads(tool_call.function.arguments)
+              name = tool_calls[0].function.name
+              args = json.loads(tool_calls[0].function.arguments)
 
-              print(f'function : {name}')
+              current_app.logger.debug('function : %s', name)
 
             except Exception:
               name, args = None, {}
+          intents.label = name if tool_called and name else "CHAT"
 
-            if name == "get_available_bikes" and "hub_name" in args:
-              # 0번째 : 실질적인 정보, 1번째 : status 코드
-              structured = fetch_available_bikes(args["hub_name"])[0]
-              
-              # For Log
-              print(structured)
-              
-              if not structured.get("error"):
-                # answer = f"'{structured['hub_name']}' 허브 이용가능 대수: {structured['available_bikes']}대"
-                answer = structured['content']
-              else:
-                msg = structured.get("error")
-                answer = f"'{structured['hub_name']}' 허브를 찾을 수 없어요." + (f"\n[API ERROR] {msg}" if msg else "")
+        if tool_called:
+          if name == "get_available_bikes" and "hub_name" in args:
+            # 0번째 : 실질적인 정보, 1번째 : status 코드
+            structured = fetch_available_bikes(args["hub_name"])[0]
+            
+            # For Log
+            current_app.logger.debug('structured : %s', structured)
+            
+            if not structured.get("error"):
+              # answer = f"'{structured['hub_name']}' 허브 이용가능 대수: {structured['available_bikes']}대"
+              answer = structured['content']
+            else:
+              msg = structured.get("error")
+              answer = f"'{structured['hub_name']}' 허브를 찾을 수 없어요." + (f"\n[API ERROR] {msg}" if msg else "")
 
-            elif name == "get_available_nearby_bikes":
-                structured = fetch_available_nearby_bikes(latitude, longitude)[0]
+          elif name == "get_available_nearby_bikes":
+              structured = fetch_available_nearby_bikes(latitude, longitude)[0]
 
-                print(structured)
+              current_app.logger.debug('structured : %s', structured)
 
-                if not structured.get("error"):
-                  answer = structured['content']
+              if not structured.get("error"):
+                answer = structured['content']
 
-                  distance = structured.get("distance")  # recommend API에서 내려준다고 가정
+                distance = structured.get("distance")  # recommend API에서 내려준다고 가정
 
-                  if distance is not None and distance <= RECOMMAND_DISTANCE:
-                      answer += "\n대여하시겠습니까? (네 / 아니요)"
+                if distance is not None and distance <= RECOMMAND_DISTANCE:
+                    answer += "\n대여하시겠습니까? (네 / 아니요)"
 
-                      # 상태 저장
-                      session["last_nearby_hub_name"] = structured.get('hub_name')
-                      session[WAITING_RENT_CONFORM] = True
-                      session.modified = True
-                else:
-                  msg = structured.get("error")
-                  answer = f"'{structured['hub_name']}' 허브를 찾을 수 없어요." + (f"\n[API ERROR] {msg}" if msg else "")
+                    # 상태 저장
+                    session["last_nearby_hub_name"] = structured.get('hub_name')
+                    session[WAITING_RENT_CONFORM] = True
+                    session.modified = True
+              else:
+                msg = structured.get("error")
+                answer = f"'{structured['hub_name']}' 허브를 찾을 수 없어요." + (f"\n[API ERROR] {msg}" if msg else "")
 
-            # elif name == "rent_bike_normal_with_id" and "bike_id" in args:
-            #   print(args["bike_id"])
-            #   structured = fetch_rent_bike_normal(args["bike_id"])[0]
+          # elif name == "rent_bike_normal_with_id" and "bike_id" in args:
+          #   print(args["bike_id"])
+          #   structured = fetch_rent_bike_normal(args["bike_id"])[0]
 
-            #   print(structured)
+          #   print(structured)
 
-            #   if not structured.get("error"):
-            #     answer = structured['content']
-              
-            #   else:
-            #     msg = structured.get("error")
-            #     answer = f"\n[API ERROR] {msg}" if msg else ""
+          #   if not structured.get("error"):
+          #     answer = structured['content']
             
-            else:
-              answer = "(허브 이름을 추출하지 못했습니다)"
-          else:
-              # 함수 호출이 없으면 일반 텍스트 응답 출력
-              answer = resp.choices[0].message.content or "(응답이 없습니다)"
-              
-          
-          
-          # For Log
-          _append("user", question)
-          _append("system", answer)
-          print(_get_history())
+          #   else:
+          #     msg = structured.get("error")
+          #     answer = f"\n[API ERROR] {msg}" if msg else ""
           
-        except Exception as e:
-          answer = f"[ERROR] {type(e).__name__}: {e}"
+          else:
+            answer = "(허브 이름을 추출하지 못했습니다)"
+        else:
+            # 함수 호출이 없으면 일반 텍스트 응답 출력
+            if resp is None:
+              # tools 없이 보내므로 그만큼 대화 기록을 더 넣을 수 있음
+              messages_for_model, prompt_info = build_messages(_get_history(), question)
+              current_app.logger.debug('prompt : %s', prompt_info)
+              if stream:
+                # 토큰이 오는 대로 SSE로 보내고, 끝나면 pending_streams에 남겨 commit 때 history에 넣음
+                _append("user", question)
+                return _stream_answer(client, messages_for_model)
+              with llm.call_site("menu1.chat"):
+                resp = client.chat.completions.create(
+                  model="gpt-4o-mini",
+                  messages=messages_for_model
+                )
+            answer = resp.choices[0].message.content or "(응답이 없습니다)"
+            
+        
+        
+        # For Log
+        _append("user", question)
+        _append("system", answer)
+        print(_get_history())
+        
+      except Exception as e:
+        answer = f"[ERROR] {type(e).__name__}: {e}"
+        if intents is not None:
+          intents.label = None  # 실패한 턴은 학습 데이터로 남기지 않음
+      finally:
+        if intents is not None:
+          intents.close()
+          _log_chat(intents, question, answer)
+
+      return True
+
+  return False
 
-        return redirect(url_for('menu1.menu1'))
+
+@bp.route('/', methods=["GET", "POST"])
+def menu1():
+  structured = None
+  _commit_pending_stream()
+
+  if request.method == "POST":
+    with llm.turn_usage():
+      handled = _process_turn(
+        (request.form.get("question") or "").strip(),
+        request.form.get("latitude"),
+        request.form.get("longitude"),
+      )
+    if handled:
+      return redirect(url_for('menu1.menu1'))
 
   # return render_template("menu1.html", question=question, answer=answer, structured=structured)
   history = _get_history()
@@ -494,7 +573,89 @@ def menu1():
       structured=structured,
       history=history,
   )
-  
+
+
+@bp.post('/stream')
+def menu1_stream():
+  """
+  menu1 POST와 같은 처리를 하되, 일반 대화 응답은 토큰 단위로 SSE(text/event-stream)로 보낸다.
+  이벤트: token {"text"} ... -> done {"stream_id"} (stream_id가 있으면 /menu1/stream/commit 호출)
+  다른 응답(대여/반납/미션 등)은 바로 history에 기록하고 done 이벤트만 보낸다.
+  """
+  _commit_pending_stream()
+  # 스트리밍 답변 자체는 응답을 보내면서 호출되므로 턴 합계에는 들어가지 않고 menu1.stream으로만 기록됨
+  with llm.turn_usage():
+    result = _process_turn(
+      (request.form.get("question") or "").strip(),
+      request.form.get("latitude"),
+      request.form.get("longitude"),
+      stream=True,
+    )
+  events = result if isinstance(result, GeneratorType) else iter([_sse("done", {"stream_id": None})])
+  return Response(
+    stream_with_context(events),
+    mimetype="text/event-stream",
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+  )
+
+
+@bp.post('/stream/commit')
+def menu1_stream_commit():
+  """
+  스트리밍이 끝난 응답을 history에 기록한다. (스트리밍 중에는 쿠키 세션을 바꿀 수 없으므로 별도 요청)
+  """
+  return jsonify({"committed": _commit_pending_stream()})
+
+
+def _sse(event, data):
+  return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _stream_answer(client, messages_for_model):
+  """
+  일반 대화 응답을 stream=True로 받아 token 이벤트로 흘려보낸다.
+  완성된 답은 pending_streams[stream_id]에 두고, 세션에는 stream_id만 남긴다.
+  """
+  stream_id = uuid.uuid4().hex
+  session[PENDING_STREAM] = stream_id
+  session.modified = True
+
+  def generate():
+    parts = []
+    try:
+      with llm.call_site("menu1.stream"):
+        chunks = client.chat.completions.create(
+          model="gpt-4o-mini",
+          messages=messages_for_model,
+          stream=True,
+        )
+      for chunk in chunks:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+          parts.append(delta)
+          yield _sse("token", {"text": delta})
+      answer = "".join(parts) or "(응답이 없습니다)"
+    except Exception as e:
+      answer = f"[ERROR] {type(e).__name__}: {e}"
+      yield _sse("error", {"text": answer})
+    pending_streams.set(stream_id, answer)
+    yield _sse("done", {"stream_id": stream_id})
+
+  return generate()
+
+def _commit_pending_stream():
+  """
+  세션에 남은 stream_id의 완성된 답을 history에 넣는다. 아직 스트리밍 중이거나 없으면 False
+  """
+  stream_id = session.get(PENDING_STREAM)
+  if not stream_id:
+    return False
+  answer = pending_streams.pop(stream_id)
+  if answer is None:
+    return False
+  session.pop(PENDING_STREAM, None)
+  _append("system", answer)
+  return True
+
 
 # 현재 시간 반환
 def _now_ts():
@@ -511,17 +672,36 @@ def _prune(hist_list):
     hist_list = hist_list[-MAX_MSGS : ]
   return hist_list
 
+def _resolve_sentences(hist_list):
+  """
+  NLG_DEFERRED로 요약만 먼저 넣어 둔 메시지를, 백그라운드 문장이 끝났으면 그 문장으로 바꾼다.
+  """
+  for m in hist_list:
+    sentence_id = m.get("sentence_id")
+    if not sentence_id:
+      continue
+    status = sentence_status(sentence_id)
+    if status["status"] == "pending":
+      continue
+    if status["status"] == "done":
+      m["content"] = m["content"].replace(status["summary"], status["content"], 1)
+    m.pop("sentence_id", None)
+  return hist_list
+
 def _get_history():
   hist = session.get(HIST_KEY, [])
-  hist = _prune(hist)
+  hist = _resolve_sentences(_prune(hist))
   session[HIST_KEY] = hist
   session.modified = True
   return hist
 
-def _append(role, content):
+def _append(role, content, sentence_id=None):
   content = (content or "").strip()
   hist = _get_history()
-  hist.append({"role":role, "content":content, "ts" : _now_ts()})
+  message = {"role":role, "content":content, "ts" : _now_ts()}
+  if sentence_id:
+    message["sentence_id"] = sentence_id
+  hist.append(message)
   session[HIST_KEY] = _prune(hist)
   session.modified = True 
   
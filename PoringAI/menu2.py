@@ -2,21 +2,45 @@
 from flask import(
   Blueprint, redirect, render_template, request, url_for, session
 )
-from .db import get_db
+from .db import get_read_db
+from . import availability_snapshot
 
 bp = Blueprint('menu2', __name__, url_prefix='/menu2')
 
 @bp.route('/')
 def menu2():
-  db = get_db()
-
-  sql = '''
-  SELECT
-    h.hub_id,
-    h.hub_name,
-    h.latitude,
-    h.longitude,
+  db = get_read_db()
 
+  from .config import Config
+  snapshot = availability_snapshot.all_hubs(db)
+  if snapshot is not None:
+    hubs = [
+      {
+        "hub_id": entry.hub_id,
+        "hub_name": entry.hub_name,
+        "latitude": entry.latitude,
+        "longitude": entry.longitude,
+        "parked_sum": entry.available,
+        "total_sum": entry.total_slots,
+        "top_bikes": entry.top_bikes,
+        "full_battery_threshold": Config.FULL_BATTERY,
+      }
+      for entry in snapshot
+    ]
+    flash_msg = session.pop("menu2_flash", None)
+    return render_template("menu2.html", hubs=hubs, flash_msg=flash_msg)
+
+  if Config.AVAILABILITY_ROLLUP:
+    # bikes 트리거가 유지하는 허브별 대수 (migrations/0003)
+    parked_sum = '''
+    COALESCE((
+      SELECT a.available
+      FROM hub_availability a
+      WHERE a.hub_id = h.hub_id
+    ), 0) AS parked_sum,
+'''
+  else:
+    parked_sum = '''
     (
       SELECT COUNT(*)
       FROM bikes b
@@ -26,6 +50,15 @@ def menu2():
         AND b.is_retired      = 0
         AND b.status          = 'Returned'
     ) AS parked_sum,
+'''
+
+  sql = '''
+  SELECT
+    h.hub_id,
+    h.hub_name,
+    h.latitude,
+    h.longitude,
+''' + parked_sum + '''
 
     (
       SELECT COALESCE(SUM(s.total_slots), 0)
@@ -40,7 +73,6 @@ def menu2():
   hubs = [dict(row) for row in rows]
 
   # 완충 기준
-  from .config import Config
   FULL_BATTERY = Config.FULL_BATTERY
 
   # 허브마다 top5 추천 자전거 붙이기
@@ -1,6 +1,6 @@
 # menu3.py
 from flask import Blueprint, render_template, session, redirect, url_for
-from .db import get_db
+from .db import get_read_db
 
 bp = Blueprint('menu3', __name__, url_prefix='/menu3')
 
@@ -12,7 +12,7 @@ def menu3():
     if not user_id:
         return redirect(url_for('login.login'))
 
-    db = get_db()
+    db = get_read_db()
 
     # 1) 내 기본 정보(users)
     user = db.execute(
@@ -0,0 +1,97 @@
+-- 코드(api/services, menu2/3, login, intent_model)가 실제로 조회하는 테이블
+-- 이미 만들어 둔 DB도 그대로 받아들이도록 IF NOT EXISTS
+
+-- 1) 사용자
+CREATE TABLE IF NOT EXISTS users (
+  user_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_type          TEXT,                          -- 학생/교직원/…
+  nationality_type   TEXT,
+  position_type      TEXT,
+  division           TEXT,
+  join_date          TEXT,                          -- ISO8601
+  verify_date        TEXT,
+  total_usage_count  INTEGER NOT NULL DEFAULT 0,
+  avg_usage_minutes  REAL    NOT NULL DEFAULT 0,
+  final_paid_amount  INTEGER NOT NULL DEFAULT 0,
+  points             INTEGER NOT NULL DEFAULT 0
+);
+
+-- 2) 허브
+CREATE TABLE IF NOT EXISTS hubs (
+  hub_id             INTEGER PRIMARY KEY AUTOINCREMENT,
+  hub_name           TEXT NOT NULL,
+  latitude           REAL NOT NULL,
+  longitude          REAL NOT NULL
+);
+
+-- 3) 정식 거치대(Station) / 임시 주차 구역(Zone) - 허브마다 여러 개
+CREATE TABLE IF NOT EXISTS stations (
+  station_id         INTEGER PRIMARY KEY AUTOINCREMENT,
+  hub_id             INTEGER NOT NULL REFERENCES hubs(hub_id),
+  total_slots        INTEGER NOT NULL DEFAULT 0 CHECK (total_slots >= 0),
+  parked_slots       INTEGER NOT NULL DEFAULT 0 CHECK (parked_slots >= 0),
+  is_active          INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS zones (
+  zone_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  hub_id             INTEGER NOT NULL REFERENCES hubs(hub_id),
+  parked_slots       INTEGER NOT NULL DEFAULT 0 CHECK (parked_slots >= 0),
+  is_active          INTEGER NOT NULL DEFAULT 1
+);
+
+-- 4) 자전거
+CREATE TABLE IF NOT EXISTS bikes (
+  bike_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  serial_number      TEXT,
+  assigned_hub_id    INTEGER REFERENCES hubs(hub_id),  -- 대여 중이면 NULL
+  assigned_sz_id     INTEGER,                          -- where_parked에 따라 station_id 또는 zone_id
+  where_parked       TEXT,                             -- 'Station' | 'Zone' | NULL(대여 중)
+  status             TEXT NOT NULL DEFAULT 'Returned', -- 'Returned' | 'Using'
+  battery_level_int  INTEGER NOT NULL DEFAULT 100 CHECK (battery_level_int BETWEEN 0 AND 100),
+  is_active          INTEGER NOT NULL DEFAULT 1,
+  is_under_repair    INTEGER NOT NULL DEFAULT 0,
+  is_retired         INTEGER NOT NULL DEFAULT 0,
+  last_rental_time   TEXT                              -- ISO8601
+);
+
+-- 5) 대여 기록
+CREATE TABLE IF NOT EXISTS rentals (
+  rental_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  rental_code        TEXT,
+  bike_id            INTEGER NOT NULL REFERENCES bikes(bike_id),
+  user_id            INTEGER NOT NULL REFERENCES users(user_id),
+  rental_start_date  TEXT NOT NULL,                    -- ISO8601
+  rental_end_date    TEXT,                             -- 진행 중이면 NULL
+  start_hub_id       INTEGER REFERENCES hubs(hub_id),
+  end_hub_id         INTEGER REFERENCES hubs(hub_id),
+  duration_minutes   INTEGER,
+  charged_amount     INTEGER,
+  used_point         INTEGER DEFAULT 0,
+  earned_point       INTEGER DEFAULT 0,
+  canceled_amount    INTEGER DEFAULT 0,
+  final_paid_amount  INTEGER,
+  payment_method     TEXT,
+  payment_status     TEXT                              -- 'Pending' | 'Paid' | 'Failed'
+);
+
+-- 6) 저배터리 자전거 옮기기 미션
+CREATE TABLE IF NOT EXISTS missions (
+  mission_id           INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id              INTEGER NOT NULL REFERENCES users(user_id),
+  low_battery_bike_id  INTEGER NOT NULL REFERENCES bikes(bike_id),
+  target_station_id    INTEGER REFERENCES stations(station_id),
+  reward               INTEGER NOT NULL DEFAULT 0,
+  status               TEXT NOT NULL DEFAULT 'ACTIVE'  -- 'ACTIVE' | 'DONE'
+);
+
+-- 7) 챗봇 상호작용 로그 (intent_model 학습 데이터)
+CREATE TABLE IF NOT EXISTS chat_log (
+  chat_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id            INTEGER REFERENCES users(user_id),
+  user_question      TEXT NOT NULL,
+  gpt_answer         TEXT NOT NULL,
+  inferred_intent    TEXT,
+  function_called    INTEGER NOT NULL DEFAULT 0,
+  logged_at          TEXT NOT NULL DEFAULT (datetime('now'))
+);
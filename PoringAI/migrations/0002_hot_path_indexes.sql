@@ -0,0 +1,27 @@
+-- 자주 도는 조회의 WHERE / ORDER BY에 맞춘 인덱스
+
+-- 허브별 대여 가능 대수, 추천 자전거 (availability / recommend / menu2)
+CREATE INDEX IF NOT EXISTS idx_bikes_hub_available
+  ON bikes(assigned_hub_id, status, is_active, is_under_repair, is_retired);
+
+-- 진행 중인 대여 (rental / bike_return): 반납되면 인덱스에서 빠지는 partial index
+CREATE INDEX IF NOT EXISTS idx_rentals_user_open
+  ON rentals(user_id, rental_start_date)
+  WHERE rental_end_date IS NULL;
+
+-- 대여 내역 (menu3)
+CREATE INDEX IF NOT EXISTS idx_rentals_user_start
+  ON rentals(user_id, rental_start_date);
+
+-- 진행 중인 미션 (missions)
+CREATE INDEX IF NOT EXISTS idx_missions_user_status
+  ON missions(user_id, status);
+CREATE INDEX IF NOT EXISTS idx_missions_bike_status
+  ON missions(low_battery_bike_id, status);
+
+-- 허브 -> station / zone
+CREATE INDEX IF NOT EXISTS idx_stations_hub ON stations(hub_id);
+CREATE INDEX IF NOT EXISTS idx_zones_hub ON zones(hub_id);
+
+-- 허브 이름 -> hub_id
+CREATE INDEX IF NOT EXISTS idx_hubs_name ON hubs(hub_name);
@@ -0,0 +1,99 @@
+-- 허브별 대여 가능 대수 rollup (availability / menu2가 COUNT(*) 대신 hub_id로 한 행만 읽음)
+-- bikes가 바뀌는 같은 트랜잭션 안에서 트리거가 +1 / -1 한다. (rent / return / mission 모두)
+-- 어긋났다고 의심되면: flask reconcile-availability
+--
+-- 대여 가능: assigned_hub_id가 있고 status = 'Returned', is_active = 1, is_under_repair = 0, is_retired = 0
+-- low_battery: 대여 가능한 것 중 battery_level_int < 50 (Config.FULL_BATTERY와 같은 값)
+
+CREATE TABLE IF NOT EXISTS hub_availability (
+  hub_id             INTEGER PRIMARY KEY REFERENCES hubs(hub_id),
+  available          INTEGER NOT NULL DEFAULT 0,
+  station_available  INTEGER NOT NULL DEFAULT 0,
+  zone_available     INTEGER NOT NULL DEFAULT 0,
+  low_battery        INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR REPLACE INTO hub_availability (hub_id, available, station_available, zone_available, low_battery)
+SELECT
+  h.hub_id,
+  COUNT(b.bike_id),
+  COALESCE(SUM(b.where_parked = 'Station'), 0),
+  COALESCE(SUM(b.where_parked = 'Zone'), 0),
+  COALESCE(SUM(b.battery_level_int < 50), 0)
+FROM hubs h
+LEFT JOIN bikes b
+  ON b.assigned_hub_id = h.hub_id
+ AND b.status = 'Returned'
+ AND b.is_active = 1
+ AND b.is_under_repair = 0
+ AND b.is_retired = 0
+GROUP BY h.hub_id;
+
+-- 허브가 생기면 0으로 시작하는 행을 같이 만든다. (읽을 때 행이 없으면 0으로 봄)
+CREATE TRIGGER IF NOT EXISTS trg_hubs_availability_insert
+AFTER INSERT ON hubs
+BEGIN
+  INSERT OR IGNORE INTO hub_availability (hub_id) VALUES (NEW.hub_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_hubs_availability_delete
+AFTER DELETE ON hubs
+BEGIN
+  DELETE FROM hub_availability WHERE hub_id = OLD.hub_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_bikes_availability_insert
+AFTER INSERT ON bikes
+WHEN NEW.assigned_hub_id IS NOT NULL AND NEW.status = 'Returned'
+ AND NEW.is_active = 1 AND NEW.is_under_repair = 0 AND NEW.is_retired = 0
+BEGIN
+  INSERT OR IGNORE INTO hub_availability (hub_id) VALUES (NEW.assigned_hub_id);
+  UPDATE hub_availability
+     SET available         = available + 1,
+         station_available = station_available + (NEW.where_parked = 'Station'),
+         zone_available    = zone_available + (NEW.where_parked = 'Zone'),
+         low_battery       = low_battery + (NEW.battery_level_int < 50)
+   WHERE hub_id = NEW.assigned_hub_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_bikes_availability_delete
+AFTER DELETE ON bikes
+WHEN OLD.assigned_hub_id IS NOT NULL AND OLD.status = 'Returned'
+ AND OLD.is_active = 1 AND OLD.is_under_repair = 0 AND OLD.is_retired = 0
+BEGIN
+  UPDATE hub_availability
+     SET available         = available - 1,
+         station_available = station_available - (OLD.where_parked = 'Station'),
+         zone_available    = zone_available - (OLD.where_parked = 'Zone'),
+         low_battery       = low_battery - (OLD.battery_level_int < 50)
+   WHERE hub_id = OLD.assigned_hub_id;
+END;
+
+-- 대여(Returned -> Using), 반납(Using -> Returned), 미션 plug(Zone -> Station), 충전 등
+-- 이전 상태가 대여 가능이었으면 빼고, 새 상태가 대여 가능이면 더한다.
+CREATE TRIGGER IF NOT EXISTS trg_bikes_availability_update
+AFTER UPDATE OF assigned_hub_id, where_parked, status, battery_level_int, is_active, is_under_repair, is_retired ON bikes
+BEGIN
+  UPDATE hub_availability
+     SET available         = available - 1,
+         station_available = station_available - (OLD.where_parked = 'Station'),
+         zone_available    = zone_available - (OLD.where_parked = 'Zone'),
+         low_battery       = low_battery - (OLD.battery_level_int < 50)
+   WHERE hub_id = OLD.assigned_hub_id
+     AND OLD.status = 'Returned' AND OLD.is_active = 1
+     AND OLD.is_under_repair = 0 AND OLD.is_retired = 0;
+
+  INSERT OR IGNORE INTO hub_availability (hub_id)
+  SELECT NEW.assigned_hub_id
+   WHERE NEW.assigned_hub_id IS NOT NULL AND NEW.status = 'Returned'
+     AND NEW.is_active = 1 AND NEW.is_under_repair = 0 AND NEW.is_retired = 0;
+
+  UPDATE hub_availability
+     SET available         = available + 1,
+         station_available = station_available + (NEW.where_parked = 'Station'),
+         zone_available    = zone_available + (NEW.where_parked = 'Zone'),
+         low_battery       = low_battery + (NEW.battery_level_int < 50)
+   WHERE hub_id = NEW.assigned_hub_id
+     AND NEW.status = 'Returned' AND NEW.is_active = 1
+     AND NEW.is_under_repair = 0 AND NEW.is_retired = 0;
+END;
@@ -0,0 +1,72 @@
+-- hub_availability.low_battery 기준을 트리거에 박아 두지 않고 DB에 저장한다.
+-- 0003 트리거는 battery_level_int < 50을 직접 썼기 때문에 Config.FULL_BATTERY를 바꾸면 rollup / snapshot / reconcile이 서로 어긋났다.
+-- 앱 시작과 flask reconcile-availability가 이 값을 Config.FULL_BATTERY로 맞추고 low_battery를 다시 센다. (rollup.sync_full_battery)
+
+CREATE TABLE IF NOT EXISTS hub_availability_config (
+  name   TEXT PRIMARY KEY,
+  value  INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO hub_availability_config (name, value) VALUES ('full_battery', 50);
+
+DROP TRIGGER IF EXISTS trg_bikes_availability_insert;
+DROP TRIGGER IF EXISTS trg_bikes_availability_delete;
+DROP TRIGGER IF EXISTS trg_bikes_availability_update;
+
+CREATE TRIGGER trg_bikes_availability_insert
+AFTER INSERT ON bikes
+WHEN NEW.assigned_hub_id IS NOT NULL AND NEW.status = 'Returned'
+ AND NEW.is_active = 1 AND NEW.is_under_repair = 0 AND NEW.is_retired = 0
+BEGIN
+  INSERT OR IGNORE INTO hub_availability (hub_id) VALUES (NEW.assigned_hub_id);
+  UPDATE hub_availability
+     SET available         = available + 1,
+         station_available = station_available + (NEW.where_parked = 'Station'),
+         zone_available    = zone_available + (NEW.where_parked = 'Zone'),
+         low_battery       = low_battery + (NEW.battery_level_int <
+                               (SELECT value FROM hub_availability_config WHERE name = 'full_battery'))
+   WHERE hub_id = NEW.assigned_hub_id;
+END;
+
+CREATE TRIGGER trg_bikes_availability_delete
+AFTER DELETE ON bikes
+WHEN OLD.assigned_hub_id IS NOT NULL AND OLD.status = 'Returned'
+ AND OLD.is_active = 1 AND OLD.is_under_repair = 0 AND OLD.is_retired = 0
+BEGIN
+  UPDATE hub_availability
+     SET available         = available - 1,
+         station_available = station_available - (OLD.where_parked = 'Station'),
+         zone_available    = zone_available - (OLD.where_parked = 'Zone'),
+         low_battery       = low_battery - (OLD.battery_level_int <
+                               (SELECT value FROM hub_availability_config WHERE name = 'full_battery'))
+   WHERE hub_id = OLD.assigned_hub_id;
+END;
+
+CREATE TRIGGER trg_bikes_availability_update
+AFTER UPDATE OF assigned_hub_id, where_parked, status, battery_level_int, is_active, is_under_repair, is_retired ON bikes
+BEGIN
+  UPDATE hub_availability
+     SET available         = available - 1,
+         station_available = station_available - (OLD.where_parked = 'Station'),
+         zone_available    = zone_available - (OLD.where_parked = 'Zone'),
+         low_battery       = low_battery - (OLD.battery_level_int <
+                               (SELECT value FROM hub_availability_config WHERE name = 'full_battery'))
+   WHERE hub_id = OLD.assigned_hub_id
+     AND OLD.status = 'Returned' AND OLD.is_active = 1
+     AND OLD.is_under_repair = 0 AND OLD.is_retired = 0;
+
+  INSERT OR IGNORE INTO hub_availability (hub_id)
+  SELECT NEW.assigned_hub_id
+   WHERE NEW.assigned_hub_id IS NOT NULL AND NEW.status = 'Returned'
+     AND NEW.is_active = 1 AND NEW.is_under_repair = 0 AND NEW.is_retired = 0;
+
+  UPDATE hub_availability
+     SET available         = available + 1,
+         station_available = station_available + (NEW.where_parked = 'Station'),
+         zone_available    = zone_available + (NEW.where_parked = 'Zone'),
+         low_battery       = low_battery + (NEW.battery_level_int <
+                               (SELECT value FROM hub_availability_config WHERE name = 'full_battery'))
+   WHERE hub_id = NEW.assigned_hub_id
+     AND NEW.status = 'Returned' AND NEW.is_active = 1
+     AND NEW.is_under_repair = 0 AND NEW.is_retired = 0;
+END;
@@ -0,0 +1,89 @@
+"""
+LLM에 보낼 messages를 토큰 예산(Config.PROMPT_TOKEN_BUDGET) 안에서 만든다.
+
+- 순서: (고정 system 프롬프트) -> 대화 기록 -> 이번 질문. tools는 요청마다 같은 내용으로 맨 앞에 붙는다.
+  고정된 앞부분이 매번 똑같아야 provider의 prompt caching이 맞으므로 system/tools는 절대 자르지 않는다.
+- 예산이 모자라면 오래된 대화 기록부터 뺀다. 이번 질문은 항상 넣는다.
+- 대화 기록의 ts / sentence_id 같은 내부 키는 빼고 role / content만 보낸다.
+토큰 수는 tiktoken이 있으면 그것으로, 없으면 llm_stub.estimate_tokens로 대략 센다.
+"""
+import json
+
+from .config import Config
+from .llm_stub import estimate_tokens
+
+# chat 형식에서 메시지 하나마다 붙는 role/구분자 토큰 (OpenAI cookbook 기준 대략값)
+MESSAGE_OVERHEAD = 4
+REPLY_OVERHEAD = 3
+
+_encoding = None
+_encoding_loaded = False
+_tools_tokens = {}
+
+
+def _get_encoding():
+  global _encoding, _encoding_loaded
+  if not _encoding_loaded:
+    _encoding_loaded = True
+    try:
+      import tiktoken
+      _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+      _encoding = None
+  return _encoding
+
+def count_tokens(text):
+  if not text:
+    return 0
+  encoding = _get_encoding()
+  if encoding is not None:
+    return len(encoding.encode(text))
+  return estimate_tokens(text)
+
+def message_tokens(message):
+  return MESSAGE_OVERHEAD + count_tokens(message.get("content"))
+
+def messages_tokens(messages):
+  return sum(message_tokens(m) for m in messages or []) + REPLY_OVERHEAD
+
+def tools_tokens(tools):
+  """
+  tools 정의의 토큰 수 (모듈 상수로 재사용되므로 id 기준으로 한 번만 센다)
+  """
+  if not tools:
+    return 0
+  key = id(tools)
+  if key not in _tools_tokens:
+    _tools_tokens[key] = count_tokens(json.dumps(tools, ensure_ascii=False))
+  return _tools_tokens[key]
+
+def _clean(message):
+  return {"role": message["role"], "content": message.get("content") or ""}
+
+
+def build_messages(history, question, system=None, tools=None, budget=None):
+  """
+  반환: (messages, info)
+    info = {"prompt_tokens", "budget", "history_used", "history_dropped"}
+  """
+  budget = budget or Config.PROMPT_TOKEN_BUDGET
+  prefix = [{"role": "system", "content": system}] if system else []
+  current = {"role": "user", "content": question}
+
+  used = messages_tokens(prefix + [current]) + tools_tokens(tools)
+  kept = []
+  for message in reversed(history or []):
+    cost = message_tokens(message)
+    if used + cost > budget:
+      break
+    kept.append(_clean(message))
+    used += cost
+  kept.reverse()
+
+  info = {
+    "prompt_tokens": used,
+    "budget": budget,
+    "history_used": len(kept),
+    "history_dropped": len(history or []) - len(kept),
+  }
+  return prefix + kept + [current], info
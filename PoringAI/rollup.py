@@ -0,0 +1,134 @@
+"""
+hub_availability rollup 점검 / 재계산 (flask reconcile-availability)
+
+평소에는 bikes 트리거(migrations/0003, 0004)가 같은 트랜잭션 안에서 맞춰 두므로 필요 없다.
+트리거를 거치지 않고 DB를 고쳤거나(sqlite3 셸에서 트리거를 지웠다가 되살린 경우 등) 값이 의심될 때 쓴다.
+
+low_battery 기준은 hub_availability_config('full_battery')에 있고 트리거가 그 값을 읽는다.
+Config.FULL_BATTERY와 다르면 앱 시작 / reconcile 때 맞추고 low_battery를 다시 센다. (sync_full_battery)
+"""
+import sqlite3
+
+import click
+
+from .config import Config
+from .db import get_db
+
+ACTUAL_SQL = '''
+  SELECT
+    h.hub_id,
+    COUNT(b.bike_id) AS available,
+    COALESCE(SUM(b.where_parked = 'Station'), 0) AS station_available,
+    COALESCE(SUM(b.where_parked = 'Zone'), 0) AS zone_available,
+    COALESCE(SUM(b.battery_level_int < ?), 0) AS low_battery
+  FROM hubs h
+  LEFT JOIN bikes b
+    ON b.assigned_hub_id = h.hub_id
+   AND b.status = 'Returned'
+   AND b.is_active = 1
+   AND b.is_under_repair = 0
+   AND b.is_retired = 0
+  GROUP BY h.hub_id
+'''
+
+COLUMNS = ("available", "station_available", "zone_available", "low_battery")
+
+THRESHOLD_SQL = "SELECT value FROM hub_availability_config WHERE name = 'full_battery'"
+
+
+def stored_full_battery(db):
+  """
+  트리거가 쓰는 low_battery 기준 (0004 전이면 None)
+  """
+  try:
+    row = db.execute(THRESHOLD_SQL).fetchone()
+  except sqlite3.OperationalError:
+    return None
+  return row[0] if row else None
+
+
+def sync_full_battery(db):
+  """
+  트리거 기준을 Config.FULL_BATTERY로 바꾸고 hub_availability를 다시 센다. (commit은 호출한 쪽에서)
+  반환: (이전 기준, drift) - 이미 같으면 (기준, [])
+  """
+  stored = stored_full_battery(db)
+  if stored is None or stored == Config.FULL_BATTERY:
+    return stored, []
+  db.execute(
+    "UPDATE hub_availability_config SET value = ? WHERE name = 'full_battery'", (Config.FULL_BATTERY,)
+  )
+  return stored, reconcile_hub_availability(db, fix=True)
+
+
+def reconcile_hub_availability(db, fix=True):
+  """
+  bikes에서 다시 센 값과 hub_availability를 비교한다. fix면 다른 행을 고친다. (commit은 호출한 쪽에서)
+  반환: [(hub_id, 저장된 값 dict 또는 None, 실제 값 dict)] - 달랐던 허브만
+  """
+  actual = {row["hub_id"]: dict(row) for row in db.execute(ACTUAL_SQL, (Config.FULL_BATTERY,))}
+  stored = {row["hub_id"]: dict(row) for row in db.execute("SELECT * FROM hub_availability")}
+
+  drift = []
+  for hub_id, row in actual.items():
+    current = stored.get(hub_id)
+    if current is None or any(current[col] != row[col] for col in COLUMNS):
+      drift.append((hub_id, current, row))
+  orphans = [hub_id for hub_id in stored if hub_id not in actual]
+
+  if fix:
+    db.executemany(
+      """
+      INSERT OR REPLACE INTO hub_availability (hub_id, available, station_available, zone_available, low_battery)
+      VALUES (:hub_id, :available, :station_available, :zone_available, :low_battery)
+      """,
+      [row for _, _, row in drift],
+    )
+    db.executemany("DELETE FROM hub_availability WHERE hub_id = ?", [(hub_id,) for hub_id in orphans])
+
+  return drift + [(hub_id, stored[hub_id], None) for hub_id in orphans]
+
+
+@click.command("reconcile-availability")
+@click.option("--check", is_flag=True, help="고치지 않고 다른 허브만 보여준다 (다르면 exit code 1)")
+def reconcile_availability_command(check):
+  """hub_availability를 bikes 기준으로 다시 계산한다."""
+  db = get_db()
+  threshold = stored_full_battery(db)
+  try:
+    if not check:
+      sync_full_battery(db)
+    drift = reconcile_hub_availability(db, fix=not check)
+    db.commit()
+  except Exception:
+    db.rollback()
+    raise
+
+  if threshold is not None and threshold != Config.FULL_BATTERY:
+    click.echo(f"full_battery: {threshold} -> {Config.FULL_BATTERY}")
+  for hub_id, stored, actual in drift:
+    click.echo(f"hub {hub_id}: {stored} -> {actual}")
+  if check:
+    click.echo(f"{len(drift)} hub(s) out of sync.")
+    if drift or (threshold is not None and threshold != Config.FULL_BATTERY):
+      raise SystemExit(1)
+  else:
+    click.echo(f"{len(drift)} hub(s) fixed.")
+
+
+def init_app(app):
+  app.cli.add_command(reconcile_availability_command)
+  with app.app_context():
+    db = get_db()
+    try:
+      previous, drift = sync_full_battery(db)
+      db.commit()
+    except sqlite3.Error as e:
+      db.rollback()
+      app.logger.warning("hub_availability 기준을 맞추지 못했습니다: %s", e)
+      return
+    if drift:
+      app.logger.warning(
+        "FULL_BATTERY가 %s -> %s로 바뀌어 hub_availability %d개 허브를 다시 셌습니다.",
+        previous, Config.FULL_BATTERY, len(drift),
+      )
@@ -0,0 +1,288 @@
+"""
+부하 테스트용 가짜 캠퍼스 데이터 (flask seed-synthetic)
+
+  flask --app PoringAI seed-synthetic --scale 10 --seed 42 --reset
+
+- scale 1 = 실제 캠퍼스 규모: 허브 12개(Config.HUB_REGIONS), 허브당 자전거 25대, 사용자 3000명, 연 7000건 정도 대여
+- scale N이면 허브 / 자전거 / 사용자 / 대여가 모두 N배 (허브는 원래 허브 주변에 "이름 2", "이름 3" ...으로 복제)
+- seed와 --until이 같으면 항상 같은 데이터가 나온다. (지금 시각을 쓰지 않음)
+- 전부 executemany로 한 트랜잭션 안에서 넣는다. (중간에 실패하면 아무것도 남지 않음)
+"""
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+
+import click
+
+from .api.services.fee import calculate_bike_fee
+from .config import Config
+from .db import get_db
+from . import geo_index
+
+# 허브 대략 위치 (위도, 경도)
+HUB_COORDS = {
+  "무은재기념관": (36.0106, 129.3217),
+  "학생회관": (36.0129, 129.3226),
+  "환경공학동": (36.0097, 129.3242),
+  "생활관21동": (36.0162, 129.3196),
+  "생활관3동": (36.0151, 129.3231),
+  "생활관12동": (36.0171, 129.3214),
+  "생활관15동": (36.0180, 129.3236),
+  "박태준학술정보관": (36.0118, 129.3259),
+  "친환경소재대학원": (36.0082, 129.3273),
+  "제1실험동": (36.0075, 129.3198),
+  "기계실험동": (36.0063, 129.3221),
+  "가속기IBS": (36.0041, 129.3180),
+}
+
+BIKES_PER_HUB = 25
+USERS_PER_HUB = 250
+RENTALS_PER_HUB_PER_YEAR = 600
+DEFAULT_UNTIL = "2025-12-01"
+
+SEED_TABLES = ("missions", "rentals", "bikes", "zones", "stations", "users", "hubs")
+
+# 시간대별 대여 비중 (0~23시) - 수업 시작 / 점심 / 저녁에 몰림
+HOUR_WEIGHTS = [
+  1, 1, 0.5, 0.3, 0.3, 0.5, 1, 3, 8, 10, 7, 6,
+  9, 8, 6, 6, 7, 9, 10, 8, 6, 5, 3, 2,
+]
+
+
+def _battery(rng):
+  """
+  대부분은 충전된 상태, 일부는 중간, 10% 정도는 저배터리
+  """
+  r = rng.random()
+  if r < 0.7:
+    level = rng.betavariate(5, 1.5) * 100
+  elif r < 0.9:
+    level = rng.uniform(20, 70)
+  else:
+    level = rng.uniform(0, 20)
+  return max(0, min(100, int(level)))
+
+
+def _hubs(rng, scale):
+  """
+  [(hub_id, hub_name, lat, lon)] - 복제 허브는 원래 허브에서 최대 2km 안쪽
+  """
+  rows = []
+  hub_id = 0
+  names = [name for hubs in Config.HUB_REGIONS.values() for name in hubs]
+  for copy in range(1, scale + 1):
+    for name in names:
+      lat, lon = HUB_COORDS.get(name, (36.0120, 129.3220))
+      if copy > 1:
+        distance = rng.uniform(100, 2000)
+        angle = rng.uniform(0, 2 * math.pi)
+        lat += distance * math.cos(angle) / 111_320
+        lon += distance * math.sin(angle) / (111_320 * math.cos(math.radians(lat)))
+      hub_id += 1
+      rows.append((hub_id, name if copy == 1 else f"{name} {copy}", round(lat, 6), round(lon, 6)))
+  return rows
+
+
+def _users(rng, count, until, years):
+  rows = []
+  for user_id in range(1, count + 1):
+    r = rng.random()
+    user_type = "학생" if r < 0.8 else "교직원" if r < 0.95 else "외부인"
+    joined = until - timedelta(days=rng.uniform(0, 365 * years))
+    rows.append((
+      user_id,
+      user_type,
+      "외국인" if rng.random() < 0.1 else "내국인",
+      rng.choice(("학부생", "대학원생")) if user_type == "학생" else user_type,
+      joined.isoformat(timespec="seconds"),
+      (joined + timedelta(hours=rng.uniform(0, 48))).isoformat(timespec="seconds"),
+      rng.choice((0, 0, 0, 100, 500, 1000)),
+    ))
+  return rows
+
+
+def _fleet(rng, hubs, user_count, until):
+  """
+  stations, zones, bikes, 진행 중인 대여(Using 자전거)를 만든다.
+  station / zone의 parked_slots는 실제로 그 자리에 있는 자전거 수와 맞춘다.
+  """
+  stations, zones, bikes, open_rentals = [], [], [], []
+  riders = rng.sample(range(1, user_count + 1), k=min(user_count, len(hubs) * BIKES_PER_HUB))
+  bike_id = 0
+
+  for hub_id, _, _, _ in hubs:
+    hub_stations = []
+    for _ in range(rng.randint(1, 3)):
+      stations.append([len(stations) + 1, hub_id, rng.randint(10, 20), 0])
+      hub_stations.append(stations[-1])
+    zone = [len(zones) + 1, hub_id, 0]
+    zones.append(zone)
+
+    for _ in range(BIKES_PER_HUB):
+      bike_id += 1
+      battery = _battery(rng)
+      last_rental = until - timedelta(minutes=rng.uniform(10, 60 * 24 * 30))
+      r = rng.random()
+      if r < 0.05 and riders:
+        # 대여 중: 위치 없음, is_active = 0 (rental.rent_bike와 같음)
+        start = until - timedelta(minutes=rng.uniform(1, 90))
+        bikes.append((bike_id, f"PB-{bike_id:06d}", None, None, None, "Using", battery, 0, 0, 0,
+                      start.isoformat(timespec="seconds")))
+        open_rentals.append((bike_id, riders.pop(), start.isoformat(timespec="seconds"), hub_id, "Pending"))
+        continue
+
+      station = rng.choice(hub_stations)
+      if rng.random() < 0.75 and station[3] < station[2]:
+        where, sz_id = "Station", station[0]
+        station[3] += 1
+      else:
+        where, sz_id = "Zone", zone[0]
+        zone[2] += 1
+      under_repair = 1 if r > 0.98 else 0
+      retired = 1 if 0.97 < r <= 0.98 else 0
+      bikes.append((bike_id, f"PB-{bike_id:06d}", hub_id, sz_id, where, "Returned", battery, 1,
+                    under_repair, retired, last_rental.isoformat(timespec="seconds")))
+
+  return stations, zones, bikes, open_rentals
+
+
+def _rentals(rng, count, hub_ids, bike_ids, user_count, until, years, usage):
+  """
+  끝난 대여 기록을 하나씩 만든다. (generator - 큰 scale에서도 메모리에 다 올리지 않음)
+  usage[user_id] = [횟수, 총 이용 분, 총 결제액]
+  """
+  span_days = 365 * years
+  hours = range(24)
+  cum_weights = list(itertools.accumulate(HOUR_WEIGHTS))
+  for _ in range(count):
+    day = until - timedelta(days=rng.randint(1, span_days))
+    hour = rng.choices(hours, cum_weights=cum_weights)[0]
+    start = day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59))
+    minutes = min(24 * 60, max(1, rng.lognormvariate(math.log(15), 0.6)))
+    end = start + timedelta(minutes=minutes)
+    fee = calculate_bike_fee(start, end)
+    user_id = rng.randint(1, user_count)
+    used_point = rng.choice((0, 0, 0, 0, 100)) if fee["charged_amount"] >= 100 else 0
+    final_paid = fee["charged_amount"] - used_point
+
+    item = usage.setdefault(user_id, [0, 0, 0])
+    item[0] += 1
+    item[1] += fee["duration_minutes"]
+    item[2] += final_paid
+
+    yield (
+      rng.choice(bike_ids),
+      user_id,
+      start.isoformat(),
+      end.isoformat(),
+      rng.choice(hub_ids),
+      rng.choice(hub_ids),
+      fee["duration_minutes"],
+      fee["charged_amount"],
+      used_point,
+      final_paid,
+      rng.choice(("Mobile", "Mobile", "Mobile", "Card")),
+      "Paid",
+    )
+
+
+def seed_synthetic(db, scale=1, seed=42, years=3, until=DEFAULT_UNTIL, reset=False):
+  """
+  반환: 테이블별로 넣은 행 수
+  """
+  rng = random.Random(seed)
+  until = datetime.fromisoformat(until)
+
+  if reset:
+    for table in SEED_TABLES:
+      db.execute(f"DELETE FROM {table}")
+    db.execute(
+      f"DELETE FROM sqlite_sequence WHERE name IN ({','.join('?' for _ in SEED_TABLES)})", SEED_TABLES
+    )
+  elif db.execute("SELECT 1 FROM hubs LIMIT 1").fetchone():
+    raise click.ClickException("hubs에 이미 데이터가 있습니다. --reset으로 지우고 다시 넣으세요.")
+
+  hubs = _hubs(rng, scale)
+  user_count = USERS_PER_HUB * len(hubs)
+  users = _users(rng, user_count, until, years)
+  stations, zones, bikes, open_rentals = _fleet(rng, hubs, user_count, until)
+  usage = {}
+
+  db.executemany("INSERT INTO hubs (hub_id, hub_name, latitude, longitude) VALUES (?, ?, ?, ?)", hubs)
+  db.executemany(
+    """
+    INSERT INTO users (user_id, user_type, nationality_type, position_type, join_date, verify_date, points)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    users,
+  )
+  db.executemany("INSERT INTO stations (station_id, hub_id, total_slots, parked_slots) VALUES (?, ?, ?, ?)", stations)
+  db.executemany("INSERT INTO zones (zone_id, hub_id, parked_slots) VALUES (?, ?, ?)", zones)
+  db.executemany(
+    """
+    INSERT INTO bikes (
+      bike_id, serial_number, assigned_hub_id, assigned_sz_id, where_parked, status,
+      battery_level_int, is_active, is_under_repair, is_retired, last_rental_time
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    bikes,
+  )
+
+  rental_count = RENTALS_PER_HUB_PER_YEAR * len(hubs) * years
+  db.executemany(
+    """
+    INSERT INTO rentals (
+      bike_id, user_id, rental_start_date, rental_end_date, start_hub_id, end_hub_id,
+      duration_minutes, charged_amount, used_point, final_paid_amount, payment_method, payment_status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    _rentals(rng, rental_count, [hub[0] for hub in hubs], [bike[0] for bike in bikes], user_count, until, years, usage),
+  )
+  db.executemany(
+    "INSERT INTO rentals (bike_id, user_id, rental_start_date, start_hub_id, payment_status) VALUES (?, ?, ?, ?, ?)",
+    open_rentals,
+  )
+  db.executemany(
+    """
+    UPDATE users
+       SET total_usage_count = ?,
+           avg_usage_minutes = ?,
+           final_paid_amount = ?
+     WHERE user_id = ?
+    """,
+    ((count, round(minutes / count, 1), paid, user_id) for user_id, (count, minutes, paid) in usage.items()),
+  )
+
+  return {
+    "hubs": len(hubs),
+    "stations": len(stations),
+    "zones": len(zones),
+    "bikes": len(bikes),
+    "users": len(users),
+    "rentals": rental_count + len(open_rentals),
+  }
+
+
+@click.command("seed-synthetic")
+@click.option("--scale", default=1, show_default=True, type=click.IntRange(min=1), help="캠퍼스 규모 배수 (1, 10, 100 ...)")
+@click.option("--seed", default=42, show_default=True, help="같은 seed면 같은 데이터")
+@click.option("--years", default=3, show_default=True, type=click.IntRange(min=1), help="대여 기록 기간(년)")
+@click.option("--until", default=DEFAULT_UNTIL, show_default=True, help="데이터 기준 시각 (ISO8601)")
+@click.option("--reset", is_flag=True, help="기존 hubs/users/bikes/rentals 등을 지우고 넣는다")
+def seed_synthetic_command(scale, seed, years, until, reset):
+  """부하 테스트용 가짜 캠퍼스 데이터를 넣는다."""
+  db = get_db()
+  try:
+    counts = seed_synthetic(db, scale, seed, years, until, reset)
+    db.commit()
+  except Exception:
+    db.rollback()
+    raise
+  geo_index.invalidate()  # hubs를 새로 넣었으므로 (다른 프로세스는 지문으로 다시 만듦)
+  for table, count in counts.items():
+    click.echo(f"{table}: {count}")
+
+
+def init_app(app):
+  app.cli.add_command(seed_synthetic_command)
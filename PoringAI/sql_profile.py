@@ -0,0 +1,218 @@
+"""
+get_db 연결의 SQL 실행 시간을 잰다. (Config.SQL_PROFILE)
+
+- 문장마다 execute + fetch(`for row in cursor` 반복 포함) 시간을 정규화한 SQL(리터럴 -> ?, IN (?, ?, ...) -> IN (?...)) 기준으로 모은다.
+- 요청마다 g.sql_profile에 {count, total_ms}를 남기고 Server-Timing 헤더로 내보낸다. (디버그 모드 / DEBUG_METRICS일 때만)
+- db_writer 스레드에서 실행된 쓰기도 그 작업을 넘긴 요청의 g.sql_profile에 더한다. (BEGIN / COMMIT은 빠짐)
+- SQL_SLOW_MS 이상 걸린 문장은 EXPLAIN QUERY PLAN과 함께 로그에 남긴다.
+- top_queries(n)로 누적 상위 N개 (/api/debug/queries)
+"""
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g, has_app_context
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+def normalize_sql(sql):
+  sql = _STRING_RE.sub("?", sql)
+  sql = _NUMBER_RE.sub("?", sql)
+  sql = _IN_LIST_RE.sub("(?...)", sql)
+  return _SPACE_RE.sub(" ", sql).strip().rstrip(";")
+
+
+class QueryStats:
+  """
+  정규화한 SQL별 실행 횟수 / 시간(ms) / 돌려준 행 수
+  """
+
+  def __init__(self):
+    self._data = {}
+    self._lock = threading.Lock()
+
+  def record(self, key, elapsed_ms, executed=True, rows=0):
+    with self._lock:
+      item = self._data.get(key)
+      if item is None:
+        item = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "slow": 0}
+        self._data[key] = item
+      if executed:
+        item["count"] += 1
+        item["max_ms"] = max(item["max_ms"], elapsed_ms)
+      item["total_ms"] += elapsed_ms
+      item["rows"] += rows
+
+  def mark_slow(self, key):
+    with self._lock:
+      if key in self._data:
+        self._data[key]["slow"] += 1
+
+  def top(self, n=20, sort="total_ms"):
+    with self._lock:
+      items = [
+        {
+          "sql": key,
+          "count": item["count"],
+          "total_ms": round(item["total_ms"], 3),
+          "avg_ms": round(item["total_ms"] / item["count"], 3) if item["count"] else 0.0,
+          "max_ms": round(item["max_ms"], 3),
+          "rows": item["rows"],
+          "slow": item["slow"],
+        }
+        for key, item in self._data.items()
+      ]
+    items.sort(key=lambda item: item.get(sort, 0), reverse=True)
+    return items[:n]
+
+  def reset(self):
+    with self._lock:
+      self._data.clear()
+
+
+stats = QueryStats()
+
+def request_totals():
+  """
+  이번 요청의 {count, total_ms} (db_writer가 작업과 같이 넘겨서 writer 스레드의 SQL도 여기에 더함)
+  """
+  current = g.get("sql_profile")
+  if current is None:
+    current = g.sql_profile = {"count": 0, "total_ms": 0.0}
+  return current
+
+def _record(key, elapsed_ms, executed=True, rows=0):
+  stats.record(key, elapsed_ms, executed, rows)
+  if has_app_context():
+    current = request_totals()
+    current["count"] += 1 if executed else 0
+    current["total_ms"] += elapsed_ms
+
+def _log_slow(conn, sql, params, key, elapsed_ms):
+  stats.mark_slow(key)
+  plan = None
+  if sql.lstrip().upper().startswith(_EXPLAINABLE):
+    try:
+      rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+      plan = " / ".join(row[3] for row in rows)
+    except sqlite3.Error as e:
+      plan = f"(plan 실패: {e})"
+  logger.warning("slow query %.1fms: %s | plan: %s", elapsed_ms, key, plan)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+  """
+  execute / executemany와 fetch*, `for row in cursor` 반복까지 잰다.
+  반복은 행마다 전역 lock을 잡지 않도록 cursor에 모아 두었다가 끝날 때(또는 다음 execute / GC 때) 한 번 기록한다.
+  """
+
+  _key = None
+  _iter_ms = 0.0
+  _iter_rows = 0
+
+  def execute(self, sql, parameters=()):
+    self._flush_iter()
+    started = time.perf_counter()
+    try:
+      return super().execute(sql, parameters)
+    finally:
+      self._finish_execute(sql, parameters, started)
+
+  def executemany(self, sql, seq_of_parameters):
+    self._flush_iter()
+    started = time.perf_counter()
+    try:
+      return super().executemany(sql, seq_of_parameters)
+    finally:
+      self._finish_execute(sql, None, started)
+
+  def _finish_execute(self, sql, parameters, started):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    self._key = normalize_sql(sql)
+    _record(self._key, elapsed_ms)
+    if parameters is not None and elapsed_ms >= Config.SQL_SLOW_MS:
+      _log_slow(self.connection, sql, parameters, self._key, elapsed_ms)
+
+  def _timed_fetch(self, fetch, *args):
+    started = time.perf_counter()
+    result = fetch(*args)
+    if self._key is not None:
+      rows = len(result) if isinstance(result, list) else int(result is not None)
+      _record(self._key, (time.perf_counter() - started) * 1000, executed=False, rows=rows)
+    return result
+
+  def __next__(self):
+    started = time.perf_counter()
+    try:
+      row = super().__next__()
+    except StopIteration:
+      self._iter_ms += (time.perf_counter() - started) * 1000
+      self._flush_iter()
+      raise
+    self._iter_ms += (time.perf_counter() - started) * 1000
+    self._iter_rows += 1
+    return row
+
+  def _flush_iter(self):
+    if self._key is not None and (self._iter_rows or self._iter_ms):
+      _record(self._key, self._iter_ms, executed=False, rows=self._iter_rows)
+    self._iter_ms, self._iter_rows = 0.0, 0
+
+  def __del__(self):
+    self._flush_iter()
+
+  def fetchone(self):
+    return self._timed_fetch(super().fetchone)
+
+  def fetchmany(self, size=None):
+    return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+  def fetchall(self):
+    return self._timed_fetch(super().fetchall)
+
+
+class ProfiledConnection(sqlite3.Connection):
+  """
+  sqlite3.connect(..., factory=ProfiledConnection)
+  db.execute(...)도 ProfiledCursor를 거치도록 한다.
+  """
+
+  def cursor(self, factory=ProfiledCursor):
+    return super().cursor(factory)
+
+  def execute(self, sql, parameters=()):
+    return self.cursor().execute(sql, parameters)
+
+  def executemany(self, sql, seq_of_parameters):
+    return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def server_timing(response):
+  """
+  after_request: 이번 요청의 SQL 합계를 Server-Timing 헤더로 (쿼리 시간이 밖으로 보이므로 디버그 모드 / DEBUG_METRICS일 때만)
+  """
+  if not (current_app.debug or Config.DEBUG_METRICS):
+    return response
+  current = g.get("sql_profile")
+  if current:
+    response.headers.add(
+      "Server-Timing", f'sql;dur={current["total_ms"]:.2f};desc="{current["count"]} queries"'
+    )
+  return response
+
+def top_queries(n=20, sort="total_ms"):
+  return stats.top(n, sort)
+
+def reset():
+  stats.reset()
@@ -0,0 +1,322 @@
+"""
+classify_intent / menu1 tool 선택의 속도와 정확도를 오프라인으로 측정한다.
+
+  python -m benchmarks.intent_bench                               # 로컬 stub 클라이언트
+  python -m benchmarks.intent_bench --latency 300                 # 호출마다 300ms 네트워크 지연 흉내
+  python -m benchmarks.intent_bench --latency lognormal:300,0.5   # 꼬리가 긴 지연 분포
+  python -m benchmarks.intent_bench --client openai               # OPENAI_BASE_URL을 llm_stub_server로 두면 네트워크 없이 HTTP 경로까지
+  python -m benchmarks.intent_bench --client record --recording rec.jsonl   # 실제 OpenAI 응답 녹화
+  python -m benchmarks.intent_bench --client replay --recording rec.jsonl   # 녹화본으로 재생
+
+턴 전략(INTENT_MODE: sequential / unified / speculative)과
+yes/no 전략(local: 로컬 사전 우선, llm: 항상 LLM)을 같은 코퍼스로 비교한다.
+stub 클라이언트의 yes/no 답은 로컬 사전(classify_yes_no_local)과 따로 만든 llm_stub 규칙이라 llm 정확도는 그 규칙의 정확도다.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from PoringAI import classify_intent, llm
+from PoringAI.classify_intent import TurnIntents, classify_yes_no, _classify_yes_no_llm
+from PoringAI.llm_stub import StubClient, latency_profile
+
+CORPUS_PATH = Path(__file__).with_name("intent_corpus.jsonl")
+TURN_STRATEGIES = TurnIntents.MODES
+YES_NO_STRATEGIES = ("local", "llm")
+
+
+def request_key(kwargs):
+  """
+  chat.completions.create 인자의 정규화된 해시 (녹화/재생 키)
+  """
+  canonical = json.dumps(kwargs, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+  return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _dump_response(resp):
+  message = resp.choices[0].message
+  usage = getattr(resp, "usage", None)
+  return {
+    "content": message.content,
+    "tool_calls": [
+      {"name": tc.function.name, "arguments": tc.function.arguments}
+      for tc in (message.tool_calls or [])
+    ],
+    "usage": {
+      "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+      "completion_tokens": getattr(usage, "completion_tokens", 0),
+    },
+  }
+
+def _load_response(record):
+  tool_calls = [
+    SimpleNamespace(id=f"call_{i}", type="function", function=SimpleNamespace(**tc))
+    for i, tc in enumerate(record["tool_calls"])
+  ] or None
+  usage = record["usage"]
+  return SimpleNamespace(
+    choices=[SimpleNamespace(message=SimpleNamespace(content=record["content"], tool_calls=tool_calls))],
+    usage=SimpleNamespace(
+      prompt_tokens=usage["prompt_tokens"],
+      completion_tokens=usage["completion_tokens"],
+      total_tokens=usage["prompt_tokens"] + usage["completion_tokens"],
+    ),
+  )
+
+
+class RecordingClient:
+  """
+  실제 클라이언트를 감싸 요청/응답/지연 시간을 JSONL로 녹화한다.
+  """
+
+  def __init__(self, inner, path):
+    self.inner = inner
+    self.path = path
+    self._lock = threading.Lock()
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **kwargs):
+    started = time.perf_counter()
+    resp = self.inner.chat.completions.create(**kwargs)
+    record = {"key": request_key(kwargs), "latency": time.perf_counter() - started, **_dump_response(resp)}
+    with self._lock, open(self.path, "a", encoding="utf-8") as f:
+      f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return resp
+
+
+class ReplayClient:
+  """
+  RecordingClient로 녹화한 응답을 그대로 돌려준다. (replay_latency=True면 녹화된 지연도 재현)
+  """
+
+  def __init__(self, path, replay_latency=False):
+    self.replay_latency = replay_latency
+    self.records = {}
+    with open(path, encoding="utf-8") as f:
+      for line in f:
+        if line.strip():
+          record = json.loads(line)
+          self.records[record["key"]] = record
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **kwargs):
+    record = self.records.get(request_key(kwargs))
+    if record is None:
+      raise KeyError("녹화본에 없는 요청입니다. --client record로 다시 녹화하세요.")
+    if self.replay_latency:
+      time.sleep(record["latency"])
+    return _load_response(record)
+
+
+class MeteredClient:
+  """
+  호출 수 / 지연 / 토큰을 턴 단위로 집계한다.
+  speculative 모드에서는 여러 스레드가 동시에 부르므로 lock으로 보호하고,
+  호출이 시작된 시점의 턴에 기록한다.
+  """
+
+  def __init__(self, inner):
+    self.inner = inner
+    self.turn = 0
+    self.calls = {}
+    self._lock = threading.Lock()
+    self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+  def create(self, **kwargs):
+    turn = self.turn
+    started = time.perf_counter()
+    resp = self.inner.chat.completions.create(**kwargs)
+    elapsed = time.perf_counter() - started
+    usage = getattr(resp, "usage", None)
+    tokens = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+    with self._lock:
+      self.calls.setdefault(turn, []).append((elapsed, tokens))
+    return resp
+
+
+def _tools():
+  from PoringAI.menu1 import tools
+  return tools
+
+def run_turn(text, client, strategy):
+  """
+  menu1.menu1과 같은 우선순위(미션 > 반납 > 대여 > tool > 일반 대화)로 한 턴의 경로를 정한다.
+  """
+  intents = TurnIntents(text, client, mode=strategy)
+  try:
+    mission = intents.mission()
+    if mission.get("type") in ("MISSION_CHECK", "MISSION_PLUG"):
+      return {"route": mission["type"]}
+
+    ret = intents.ret()
+    if ret.get("is_return"):
+      return {"route": "RETURN", "return_type": ret.get("return_type", "UNKNOWN"), "hub_name": ret.get("hub_name")}
+
+    rent = intents.rent()
+    if rent.get("is_rent"):
+      return {"route": "RENT", "hub_name": rent.get("hub_name")}
+
+    messages = [{"role": "user", "content": text}]
+    tool = intents.tool()
+    if tool is None:
+      resp = client.chat.completions.create(
+        model="gpt-4o-mini", messages=messages, tools=_tools(), tool_choice="auto"
+      )
+      tool_calls = resp.choices[0].message.tool_calls
+      if tool_calls:
+        args = json.loads(tool_calls[0].function.arguments or "{}")
+        return {"route": tool_calls[0].function.name, "hub_name": args.get("hub_name")}
+      return {"route": "CHAT"}
+
+    if tool["name"]:
+      return {"route": tool["name"], "hub_name": tool["hub_name"]}
+    client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    return {"route": "CHAT"}
+  finally:
+    intents.close()
+
+def run_yes_no(text, client, strategy):
+  if strategy == "local":
+    return {"yes_no": classify_yes_no(text, client)}
+  return {"yes_no": _classify_yes_no_llm(text, client)}
+
+
+def _percentile(values, pct):
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+  return ordered[idx]
+
+def _score(expect, got):
+  """
+  라벨에 있는 항목만 비교한다. (route / yes_no / return_type / hub_name)
+  """
+  checks = {}
+  for field in ("route", "yes_no", "return_type"):
+    if field in expect:
+      checks[field] = expect[field] == got.get(field)
+  if expect.get("route") in ("RETURN", "RENT", "get_available_bikes") or "hub_name" in expect:
+    checks["hub_name"] = expect.get("hub_name") == got.get("hub_name")
+  return checks
+
+def run_strategy(corpus, client_factory, strategy, runner, repeat=1, keep_cache=False):
+  client = MeteredClient(client_factory())
+  if not keep_cache:
+    classify_intent.intent_cache.invalidate()
+
+  latencies, correct, total, failures = [], {}, {}, []
+  saved_maxsize = classify_intent.intent_cache.maxsize
+  if not keep_cache:
+    classify_intent.intent_cache.maxsize = 0
+  try:
+    for _ in range(repeat):
+      for item in corpus:
+        client.turn += 1
+        started = time.perf_counter()
+        try:
+          got = runner(item["text"], client, strategy)
+        except Exception as e:
+          got = {"error": f"{type(e).__name__}: {e}"}
+        latencies.append(time.perf_counter() - started)
+
+        for field, ok in _score(item["expect"], got).items():
+          total[field] = total.get(field, 0) + 1
+          correct[field] = correct.get(field, 0) + int(ok)
+          if not ok:
+            failures.append({"text": item["text"], "field": field, "expect": item["expect"], "got": got})
+  finally:
+    classify_intent.intent_cache.maxsize = saved_maxsize
+
+  turns = max(1, client.turn)
+  calls = [c for per_turn in client.calls.values() for c in per_turn]
+  return {
+    "strategy": strategy,
+    "turns": client.turn,
+    "latency_p50_ms": _percentile(latencies, 50) * 1000,
+    "latency_p95_ms": _percentile(latencies, 95) * 1000,
+    "calls_per_turn": len(calls) / turns,
+    "tokens_per_turn": sum(tokens for _, tokens in calls) / turns,
+    "accuracy": {field: correct[field] / total[field] for field in total},
+    "failures": failures,
+  }
+
+
+def load_corpus(path=CORPUS_PATH, categories=None):
+  with open(path, encoding="utf-8") as f:
+    items = [json.loads(line) for line in f if line.strip()]
+  if categories:
+    items = [item for item in items if item["category"] in categories]
+  return items
+
+def make_client_factory(args):
+  if args.client == "stub":
+    latency = latency_profile(args.latency)
+    return lambda: StubClient(latency=latency)
+  if args.client == "replay":
+    return lambda: ReplayClient(args.recording, replay_latency=args.replay_latency)
+
+  real = llm.build_client("openai")
+  if real is None:
+    raise SystemExit("OpenAI 클라이언트를 만들 수 없습니다. OPENAI_API_KEY를 확인하세요.")
+  if args.client == "record":
+    return lambda: RecordingClient(real, args.recording)
+  return lambda: real
+
+def print_report(title, results):
+  print(f"\n== {title} ==")
+  print(f"{'strategy':<12}{'turns':>6}{'p50 ms':>10}{'p95 ms':>10}{'calls/turn':>12}{'tokens/turn':>13}  accuracy")
+  for r in results:
+    acc = ", ".join(f"{k}={v:.0%}" for k, v in sorted(r["accuracy"].items()))
+    print(
+      f"{r['strategy']:<12}{r['turns']:>6}{r['latency_p50_ms']:>10.1f}{r['latency_p95_ms']:>10.1f}"
+      f"{r['calls_per_turn']:>12.2f}{r['tokens_per_turn']:>13.1f}  {acc}"
+    )
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="의도 분류 벤치마크")
+  parser.add_argument("--client", choices=("stub", "replay", "record", "openai"), default="stub")
+  parser.add_argument("--recording", help="record/replay에 쓸 JSONL 파일")
+  parser.add_argument("--replay-latency", action="store_true", help="replay 시 녹화된 지연 시간 재현")
+  parser.add_argument("--latency", default=None, help='stub 호출당 지연(ms) 또는 분포 (예: "300", "lognormal:300,0.5")')
+  parser.add_argument("--strategies", nargs="+", default=list(TURN_STRATEGIES), choices=TURN_STRATEGIES)
+  parser.add_argument("--yes-no-strategies", nargs="+", default=list(YES_NO_STRATEGIES), choices=YES_NO_STRATEGIES)
+  parser.add_argument("--corpus", default=str(CORPUS_PATH))
+  parser.add_argument("--repeat", type=int, default=1)
+  parser.add_argument("--keep-cache", action="store_true", help="의도 캐시를 켠 채로 측정")
+  parser.add_argument("--failures", action="store_true", help="틀린 항목 출력")
+  parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+  args = parser.parse_args(argv)
+
+  if args.client in ("record", "replay") and not args.recording:
+    parser.error("--client record/replay에는 --recording이 필요합니다.")
+
+  factory = make_client_factory(args)
+  turn_corpus = load_corpus(args.corpus, categories={"mission", "return", "rent", "tool", "chat"})
+  yes_no_corpus = load_corpus(args.corpus, categories={"yes_no"})
+
+  turn_results = [
+    run_strategy(turn_corpus, factory, s, run_turn, args.repeat, args.keep_cache) for s in args.strategies
+  ]
+  yes_no_results = [
+    run_strategy(yes_no_corpus, factory, s, run_yes_no, args.repeat, args.keep_cache) for s in args.yes_no_strategies
+  ]
+
+  print_report("turn intent", turn_results)
+  print_report("yes / no", yes_no_results)
+
+  if args.failures:
+    for r in turn_results + yes_no_results:
+      for f in r["failures"]:
+        print(f"[{r['strategy']}] {f['field']}: {f['text']!r} expect={f['expect']} got={f['got']}")
+
+  if args.json:
+    with open(args.json, "w", encoding="utf-8") as f:
+      json.dump({"turn": turn_results, "yes_no": yes_no_results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+  main()
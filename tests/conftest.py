@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_MOCK", "1")
+
+from PoringAI import create_app, db
+
+
+@pytest.fixture
+def app(tmp_path):
+  app = create_app({
+    "TESTING": True,
+    "SECRET_KEY": "test",
+    "DATABASE": str(tmp_path / "test.db"),
+    "INTENT_MODEL_PATH": str(tmp_path / "intent_model"),
+    "SENTENCE_CACHE_PATH": str(tmp_path / "sentence_cache.db"),
+  })
+  with app.app_context():
+    db.init_db()
+  return app
@@ -0,0 +1,61 @@
+from PoringAI import cache
+from PoringAI.cache import LRUCache
+
+
+class FakeClock:
+
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def test_evicts_least_recently_used():
+  lru = LRUCache(maxsize=2)
+  lru.set("a", 1)
+  lru.set("b", 2)
+  assert lru.get("a") == 1  # a를 최근에 씀 -> b가 밀려남
+  lru.set("c", 3)
+  assert lru.get("b") is None
+  assert lru.get("a") == 1
+  assert lru.get("c") == 3
+  stats = lru.stats()
+  assert stats["size"] == 2
+  assert stats["evictions"] == 1
+  assert stats["hits"] == 3
+  assert stats["misses"] == 1
+
+def test_expires_after_ttl(monkeypatch):
+  clock = FakeClock()
+  monkeypatch.setattr(cache.time, "monotonic", clock)
+  lru = LRUCache(maxsize=4, ttl=60)
+  lru.set("a", 1)
+  clock.now += 59
+  assert lru.get("a") == 1
+  clock.now += 2
+  assert lru.get("a", "miss") == "miss"
+  assert len(lru) == 0
+  assert lru.stats()["expirations"] == 1
+
+def test_zero_ttl_never_expires(monkeypatch):
+  clock = FakeClock()
+  monkeypatch.setattr(cache.time, "monotonic", clock)
+  lru = LRUCache(maxsize=4, ttl=0)
+  lru.set("a", 1)
+  clock.now += 10 ** 6
+  assert lru.get("a") == 1
+
+def test_zero_maxsize_disables_cache():
+  lru = LRUCache(maxsize=0)
+  lru.set("a", 1)
+  assert lru.get("a") is None
+  assert len(lru) == 0
+
+def test_invalidate_clears_everything():
+  lru = LRUCache(maxsize=4)
+  lru.set("a", 1)
+  lru.set("b", 2)
+  lru.invalidate()
+  assert lru.get("a") is None
+  assert lru.stats()["invalidations"] == 1
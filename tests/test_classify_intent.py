@@ -0,0 +1,23 @@
+import pytest
+
+from PoringAI.classify_intent import classify_yes_no_local
+
+
+@pytest.mark.parametrize("text", ["네", "응", "좋아요", "ㅇㅋ", "네 빌릴게요!", "진행해줘 ㅋㅋ"])
+def test_yes(text):
+  assert classify_yes_no_local(text) == "YES"
+
+
+@pytest.mark.parametrize("text", ["아니요", "ㄴㄴ", "취소해줘", "다음에요"])
+def test_no(text):
+  assert classify_yes_no_local(text) == "NO"
+
+
+@pytest.mark.parametrize("text", ["어?", "응?", "그럼?", "네?", "좋아？ "])
+def test_question_is_unknown(text):
+  assert classify_yes_no_local(text) == "UNKNOWN"
+
+
+@pytest.mark.parametrize("text", ["어", "그럼", "네 아니요", "안 빌릴게", "", "학생회관에 자전거 몇 대 있어"])
+def test_ambiguous_is_unknown(text):
+  assert classify_yes_no_local(text) == "UNKNOWN"
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+from PoringAI import db_writer
+from PoringAI.config import Config
+from PoringAI.db_writer import _Job, get_writer, run_write
+
+
+def _add_hub(db, name):
+  cur = db.execute(
+    "INSERT INTO hubs (hub_name, latitude, longitude) VALUES (?, 36.01, 129.32)", (name,)
+  )
+  db.commit()
+  return cur.lastrowid
+
+def _add_bike(db, hub_id):
+  cur = db.execute(
+    "INSERT INTO bikes (assigned_hub_id, where_parked, status) VALUES (?, 'Station', 'Returned')",
+    (hub_id,),
+  )
+  db.commit()
+  return cur.lastrowid
+
+def _fail_after_insert(db, name):
+  db.execute("INSERT INTO hubs (hub_name, latitude, longitude) VALUES (?, 0, 0)", (name,))
+  raise RuntimeError("boom")
+
+def _hub_names(app):
+  # writer와 별개인 연결로 실제로 COMMIT된 것만 본다
+  conn = sqlite3.connect(app.config["DATABASE"])
+  try:
+    return [row[0] for row in conn.execute("SELECT hub_name FROM hubs ORDER BY hub_id")]
+  finally:
+    conn.close()
+
+
+@pytest.fixture
+def split_rw(monkeypatch):
+  monkeypatch.setattr(Config, "SQLITE_SPLIT_RW", True)
+
+@pytest.fixture
+def commits(monkeypatch):
+  seen = []
+  monkeypatch.setattr(db_writer, "_listeners", [lambda path, hub_ids: seen.append(sorted(hub_ids))])
+  return seen
+
+
+def test_run_write_returns_result(app, split_rw):
+  with app.app_context():
+    hub_id = run_write(_add_hub, "학생회관")
+  assert hub_id == 1
+  assert _hub_names(app) == ["학생회관"]
+
+def test_batch_is_one_commit_and_failing_job_rolls_back_alone(app, split_rw):
+  with app.app_context():
+    writer = get_writer()
+    batch = [
+      _Job(_add_hub, ("A",), {}),
+      _Job(_fail_after_insert, ("X",), {}),
+      _Job(_add_hub, ("B",), {}),
+    ]
+    # 큐를 거치지 않고 한 묶음으로 직접 실행 (writer 스레드는 빈 큐에서 기다리는 중)
+    writer._apply(batch)
+
+  assert batch[0].future.result() == 1
+  with pytest.raises(RuntimeError):
+    batch[1].future.result()
+  assert batch[2].future.result() == 2
+  assert _hub_names(app) == ["A", "B"]
+  stats = writer.stats()
+  assert stats["batches"] == 1
+  assert stats["jobs"] == 3
+  assert stats["max_batch"] == 3
+
+def test_uncommitted_work_is_rolled_back(app, split_rw):
+  def _no_commit(db):
+    db.execute("INSERT INTO hubs (hub_name, latitude, longitude) VALUES ('Y', 0, 0)")
+    return "done"
+
+  with app.app_context():
+    assert run_write(_no_commit) == "done"
+  assert _hub_names(app) == []
+
+def test_on_commit_gets_changed_hubs(app, split_rw, commits):
+  with app.app_context():
+    hub_id = run_write(_add_hub, "학생회관")  # 허브를 만들면 hub_availability 행도 생김 (0003 트리거)
+    other = run_write(_add_hub, "무은재")
+    run_write(_add_bike, hub_id)
+  assert commits == [[hub_id], [other], [hub_id]]
+
+def test_on_commit_skips_rolled_back_hubs(app, split_rw, commits):
+  def _bike_then_fail(db, hub_id):
+    db.execute("INSERT INTO bikes (assigned_hub_id, where_parked, status) VALUES (?, 'Station', 'Returned')", (hub_id,))
+    raise RuntimeError("boom")
+
+  with app.app_context():
+    first = run_write(_add_hub, "A")
+    second = run_write(_add_hub, "B")
+    del commits[:]
+    get_writer()._apply([_Job(_add_bike, (first,), {}), _Job(_bike_then_fail, (second,), {})])
+  # 되돌린 작업의 허브(second)는 알리지 않음
+  assert commits == [[first]]
+
+def test_split_rw_off_runs_on_request_connection(app, monkeypatch, commits):
+  monkeypatch.setattr(Config, "SQLITE_SPLIT_RW", False)
+  with app.app_context():
+    hub_id = run_write(_add_hub, "학생회관")
+    run_write(_add_bike, hub_id)
+    assert db_writer._writers.get(app.config["DATABASE"]) is None
+  assert _hub_names(app) == ["학생회관"]
+  assert commits == [[hub_id], [hub_id]]
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from PoringAI.api.services.geo import haversine_m
+from PoringAI.geo_index import GeoGrid
+
+
+def _hubs(rng, count):
+  return [
+    {"hub_id": i, "hub_name": f"허브{i}", "latitude": 36.01 + rng.uniform(-0.02, 0.02),
+     "longitude": 129.32 + rng.uniform(-0.02, 0.02)}
+    for i in range(1, count + 1)
+  ]
+
+
+def test_nearest_matches_brute_force():
+  rng = random.Random(7)
+  hubs = _hubs(rng, 80)
+  grid = GeoGrid(hubs, cell_m=200)
+  for _ in range(300):
+    lat, lon = 36.01 + rng.uniform(-0.05, 0.05), 129.32 + rng.uniform(-0.05, 0.05)
+    expect = sorted(haversine_m(lat, lon, h["latitude"], h["longitude"]) for h in hubs)[:3]
+    got = [hit.distance for hit in grid.nearest(lat, lon, k=3)]
+    assert got == pytest.approx(expect, rel=1e-3)  # 거의 같은 거리끼리는 투영 오차로 순서가 바뀔 수 있음
+
+
+def test_nearest_far_away_and_empty():
+  rng = random.Random(1)
+  hubs = _hubs(rng, 10)
+  grid = GeoGrid(hubs, cell_m=200)
+  hit = grid.nearest(0.0, 0.0)[0]
+  assert hit.distance == min(haversine_m(0.0, 0.0, h["latitude"], h["longitude"]) for h in hubs)
+  assert GeoGrid([], cell_m=200).nearest(36.0, 129.0) == []
@@ -0,0 +1,38 @@
+from PoringAI import hub_resolver
+from PoringAI.config import Config
+from PoringAI.db import get_db
+
+
+def _add_hubs(names):
+  conn = get_db()
+  conn.executemany(
+    "INSERT INTO hubs (hub_name, latitude, longitude) VALUES (?, 36.0, 129.3)", [(name,) for name in names]
+  )
+  conn.commit()
+
+
+def test_same_length_rename_is_detected(app, monkeypatch):
+  monkeypatch.setattr(Config, "HUB_RESOLVER_CHECK_SEC", 0)
+  with app.app_context():
+    _add_hubs(["학생회관", "생활관3동"])
+    assert hub_resolver.resolve("생활관3동").name == "생활관3동"
+
+    get_db().execute("UPDATE hubs SET hub_name = '생활관5동' WHERE hub_name = '생활관3동'")
+    get_db().commit()
+    assert hub_resolver.resolve("생활관5동").name == "생활관5동"
+    assert hub_resolver.resolve("생활관3동").name != "생활관3동"
+
+
+def test_resolver_is_kept_per_database(app, tmp_path):
+  from PoringAI import create_app, db
+
+  other = create_app({"TESTING": True, "SECRET_KEY": "test", "DATABASE": str(tmp_path / "other.db")})
+  with other.app_context():
+    db.init_db()
+    _add_hubs(["다른허브"])
+  with app.app_context():
+    _add_hubs(["학생회관"])
+    hub_resolver.invalidate()
+    assert hub_resolver.get_resolver().hub_names == ["학생회관"]
+  with other.app_context():
+    assert hub_resolver.get_resolver().hub_names == ["다른허브"]
@@ -0,0 +1,44 @@
+import gc
+
+from PoringAI.llm import BoundedClient
+from PoringAI.llm_stub import StubClient
+
+MESSAGES = [{"role": "user", "content": "안녕"}]
+
+
+def _stream(client):
+  return client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, stream=True)
+
+
+def _free_slot(client):
+  if not client._slots.acquire(blocking=False):
+    return False
+  client._slots.release()
+  return True
+
+
+def test_stream_releases_slot_after_reading():
+  client = BoundedClient(StubClient(), max_concurrency=1)
+  stream = _stream(client)
+  assert not _free_slot(client)
+  assert list(stream)
+  assert _free_slot(client)
+
+
+def test_unread_stream_releases_slot_when_dropped():
+  client = BoundedClient(StubClient(), max_concurrency=1)
+  stream = _stream(client)
+  assert not _free_slot(client)
+  del stream
+  gc.collect()
+  assert _free_slot(client)
+
+
+def test_closed_stream_releases_slot_once():
+  client = BoundedClient(StubClient(), max_concurrency=2)
+  stream = _stream(client)
+  next(iter(stream))
+  stream.close()
+  gc.collect()
+  assert _free_slot(client)
+  assert client._slots.acquire(blocking=False) and client._slots.acquire(blocking=False)
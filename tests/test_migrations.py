@@ -0,0 +1,41 @@
+from PoringAI import db
+
+
+def _versions(app):
+  with app.app_context():
+    return [row[0] for row in db.get_db().execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+def _cli(app, *args):
+  # app.cli에 add_command로 붙인 명령이라 app context는 직접 띄움 (flask 실행 파일은 FlaskGroup이 띄워 줌)
+  with app.app_context():
+    return app.test_cli_runner().invoke(args=list(args))
+
+
+def test_all_migrations_applied(app):
+  with app.app_context():
+    expected = [version for version, _, _ in db.migration_files()]
+  assert _versions(app) == expected
+
+def test_upgrade_is_idempotent(app):
+  with app.app_context():
+    assert db.upgrade_db() == []
+    assert db.init_db() == []
+
+def test_db_upgrade_command_second_run_applies_nothing(app):
+  result = _cli(app, "db-upgrade")
+  assert result.exit_code == 0
+  assert "0 migration(s) applied." in result.output
+
+def test_upgrade_to_target_then_rest(app, tmp_path):
+  app.config["DATABASE"] = str(tmp_path / "partial.db")
+  result = _cli(app, "db-upgrade", "--to", "2")
+  assert result.exit_code == 0
+  assert "applied 0001_runtime_schema.sql" in result.output
+  assert "2 migration(s) applied." in result.output
+  assert _versions(app) == [1, 2]
+
+  with app.app_context():
+    rest = db.upgrade_db()
+  assert rest and all(int(name[:4]) > 2 for name in rest)
+  with app.app_context():
+    assert db.upgrade_db() == []
@@ -0,0 +1,35 @@
+import sqlite3
+
+from PoringAI import sql_profile
+from PoringAI.sql_profile import ProfiledConnection
+
+
+def _conn():
+  conn = sqlite3.connect(":memory:", factory=ProfiledConnection)
+  conn.execute("CREATE TABLE t (n INTEGER)")
+  conn.executemany("INSERT INTO t (n) VALUES (?)", [(i,) for i in range(5)])
+  return conn
+
+def _stats(key):
+  return next(item for item in sql_profile.top_queries(100) if item["sql"] == key)
+
+
+def test_iterating_cursor_counts_rows():
+  sql_profile.reset()
+  conn = _conn()
+  rows = [row for row in conn.execute("SELECT n FROM t WHERE n < 3")]
+  assert len(rows) == 3
+  item = _stats("SELECT n FROM t WHERE n < ?")
+  assert item["count"] == 1
+  assert item["rows"] == 3
+
+def test_partial_iteration_is_flushed_on_next_execute():
+  sql_profile.reset()
+  conn = _conn()
+  cur = conn.cursor()
+  cur.execute("SELECT n FROM t")
+  next(cur)
+  next(cur)
+  cur.execute("SELECT n FROM t WHERE n = 1").fetchall()
+  assert _stats("SELECT n FROM t")["rows"] == 2
+  assert _stats("SELECT n FROM t WHERE n = ?")["rows"] == 1
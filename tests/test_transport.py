@@ -0,0 +1,84 @@
+from PoringAI.api import transport
+from PoringAI.api.transport import CircuitBreaker
+
+
+class FakeClock:
+
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def _breaker(monkeypatch, failures=2, reset_sec=30):
+  clock = FakeClock()
+  monkeypatch.setattr(transport.time, "monotonic", clock)
+  return CircuitBreaker(failures, reset_sec), clock
+
+
+def _open(breaker):
+  for _ in range(breaker.failure_threshold):
+    assert breaker.allow()
+    breaker.record_failure()
+  assert breaker.state == "open"
+
+
+def test_opens_after_consecutive_failures(monkeypatch):
+  breaker, _ = _breaker(monkeypatch)
+  assert breaker.allow()
+  breaker.record_failure()
+  assert breaker.state == "closed"
+  breaker.record_failure()
+  assert breaker.state == "open"
+  assert not breaker.allow()
+  assert breaker.rejected == 1
+
+
+def test_half_open_admits_one_probe_then_closes(monkeypatch):
+  breaker, clock = _breaker(monkeypatch)
+  _open(breaker)
+  clock.now += 30
+  assert breaker.allow()
+  assert breaker.state == "half_open"
+  assert not breaker.allow()
+  breaker.record_success()
+  assert breaker.state == "closed"
+  assert breaker.allow()
+
+
+def test_failed_probe_reopens(monkeypatch):
+  breaker, clock = _breaker(monkeypatch)
+  _open(breaker)
+  clock.now += 30
+  assert breaker.allow()
+  breaker.record_failure()
+  assert breaker.state == "open"
+  assert not breaker.allow()
+
+
+def test_stale_success_does_not_close_open_breaker(monkeypatch):
+  breaker, clock = _breaker(monkeypatch)
+  _open(breaker)
+  breaker.record_success()  # 열리기 전에 보낸 느린 요청
+  assert breaker.state == "open"
+  assert not breaker.allow()
+  clock.now += 30
+  assert breaker.allow()
+  assert not breaker.allow()
+
+
+def test_success_while_closed_resets_failures(monkeypatch):
+  breaker, _ = _breaker(monkeypatch, failures=3)
+  breaker.record_failure()
+  breaker.record_failure()
+  breaker.record_success()
+  breaker.record_failure()
+  assert breaker.state == "closed"
+
+
+def test_breakers_are_per_endpoint():
+  api = transport.ApiTransport(breaker_failures=1)
+  api.breaker_for("api.rent").record_failure()
+  assert not api.breaker_for("api.rent").allow()
+  assert api.breaker_for("api.available_bikes").allow()
@@ -0,0 +1,25 @@
+import pytest
+
+from PoringAI import classify_intent, intent_model
+from PoringAI.llm_stub import StubClient
+
+
+@pytest.mark.parametrize("label", ["RENT", "RETURN", "MISSION_PLUG"])
+def test_write_intents_are_not_taken_from_local_model(monkeypatch, label):
+  monkeypatch.setattr(intent_model, "predict", lambda text: (label, 0.999))
+  intents = classify_intent.TurnIntents("아무 말", StubClient(), mode="sequential")
+  assert intents.local_label is None
+
+
+def test_read_intent_is_taken_from_local_model(monkeypatch):
+  monkeypatch.setattr(intent_model, "predict", lambda text: ("MISSION_CHECK", 0.999))
+  intents = classify_intent.TurnIntents("미션", StubClient(), mode="sequential")
+  assert intents.local_label == "MISSION_CHECK"
+  assert intents.mission() == {"type": "MISSION_CHECK"}
+
+
+def test_label_follows_routed_intent():
+  intents = classify_intent.TurnIntents("자전거 반납할게", StubClient(), mode="sequential")
+  assert intents.mission()["type"] == "NONE"
+  assert intents.ret()["is_return"]
+  assert intents.label == "RETURN"